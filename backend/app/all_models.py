@@ -10,3 +10,4 @@ from .modules.oneshot import models as oneshot_models
 from .modules.factions import models as faction_models
 from .modules.ship import models as ship_models
 from .modules.ledger import models as ledger_models
+from .modules.search import models as search_models
@@ -25,11 +25,35 @@ class Settings(BaseSettings):
     DISCORD_CLIENT_SECRET: str = ""
     DISCORD_BOT_TOKEN: str = ""
     DISCORD_REDIRECT_URI: str = "http://localhost:5173/api/auth/discord/callback"
+    # REST API root; point at a local stand-in server for tests or load testing.
+    DISCORD_API_BASE: str = "https://discord.com/api"
+    # Seconds to cache guild lists / member objects fetched from Discord, and 404s for unknown members.
+    DISCORD_GUILDS_CACHE_TTL: float = 60.0
+    DISCORD_MEMBER_CACHE_TTL: float = 30.0
+    DISCORD_NEGATIVE_CACHE_TTL: float = 10.0
+    # Seconds between background re-checks of every campaign member's Discord roles. 0 disables.
+    DISCORD_ROLE_SYNC_INTERVAL: int = 900
 
     # LLM Configuration
     LLM_API_BASE: str = "https://openrouter.ai/api/v1"
     LLM_API_KEY: str = ""
     LLM_MODEL: str = "deepseek/deepseek-chat"
+    # Negotiate HTTP/2 with the LLM endpoint (requires the optional `h2` package).
+    LLM_HTTP2: bool = False
+    # Extra providers tried in order after LLM_MODEL, comma-separated: "model" (same endpoint)
+    # or "model@base_url". Used on failure, and for hedging when the current one is slow.
+    LLM_FALLBACK_MODELS: str = ""
+    # Hedging: start the next provider when no first byte has arrived within the p95 TTFB of
+    # recent calls (LLM_HEDGE_DELAY until there are enough samples, never below LLM_HEDGE_MIN_DELAY).
+    LLM_HEDGE_ENABLED: bool = True
+    LLM_HEDGE_DELAY: float = 30.0
+    LLM_HEDGE_MIN_DELAY: float = 2.0
+    # Circuit breaker: consecutive failures before a provider is skipped, and for how many seconds.
+    LLM_BREAKER_FAILURES: int = 5
+    LLM_BREAKER_COOLDOWN: float = 60.0
+    # Prices (USD per million tokens) used for the cost estimate in /api/oneshot/llm-stats.
+    LLM_PROMPT_PRICE_PER_MTOK: float = 0.0
+    LLM_COMPLETION_PRICE_PER_MTOK: float = 0.0
 
     # ComfyUI Configuration
     COMFYUI_URL: str = "http://localhost:8188"
@@ -38,6 +62,28 @@ class Settings(BaseSettings):
     # One-Shot Generator Configuration
     ONESHOT_OUTPUT_DIR: str = "/app/data/oneshots"
     ONESHOT_MAX_CONCURRENT: int = 2
+    # Job queue: run the worker pool in this process, how often idle workers poll for jobs,
+    # when a job with no heartbeat counts as orphaned, and how many tries a job gets.
+    ONESHOT_WORKER_ENABLED: bool = True
+    ONESHOT_POLL_INTERVAL: float = 2.0
+    ONESHOT_STALE_AFTER: int = 300
+    ONESHOT_MAX_ATTEMPTS: int = 3
+    # LLM calls a single job may have in flight during the per-act / NPC / pregen stage.
+    ONESHOT_PARALLEL_CALLS: int = 3
+    # Invalid or missing items (acts, scenes, NPCs, pregens) regenerated one by one per stage;
+    # past this the stage fails and the job is requeued whole (see ONESHOT_MAX_ATTEMPTS).
+    ONESHOT_MAX_REPAIRS: int = 3
+    # Estimated tokens of campaign context (hexes, field reports, ...) sent with each prompt.
+    ONESHOT_CONTEXT_TOKEN_BUDGET: int = 1500
+
+    # LLM response cache (files under ONESHOT_OUTPUT_DIR/llm_cache). Age is time since last use.
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    LLM_CACHE_MAX_AGE: int = 7 * 24 * 3600
+
+    # Warn when one SQL statement template runs this many times in a single request
+    # (the signature of an N+1 query). 0 disables the warning.
+    SQL_REPEAT_WARN_THRESHOLD: int = 10
 
     # Comma-separated list of Discord User IDs allowed to setup campaigns
     ADMIN_DISCORD_IDS: str = ""
@@ -45,6 +91,10 @@ class Settings(BaseSettings):
     # Debug token for the /api/debug/* endpoints. Leave empty to disable those endpoints.
     DEBUG_TOKEN: str = ""
 
+    # Bearer token Prometheus must send to scrape /metrics. Leave empty to serve /metrics
+    # without auth, and keep it off the public internet at the reverse proxy instead.
+    METRICS_TOKEN: str = ""
+
     # Environment name — set to "production" to disable dev-only endpoints like /api/auth/dev-token.
     APP_ENV: str = "development"
 
@@ -73,6 +123,11 @@ class Settings(BaseSettings):
                 "SECRET_KEY is using the insecure default value — set SECRET_KEY in your .env"
             )
 
+        if self.APP_ENV == "production" and not self.METRICS_TOKEN:
+            logger.warning(
+                "METRICS_TOKEN is not set — /metrics is served without auth; block it at the reverse proxy"
+            )
+
         # Effective redirect URI — this is the most common source of Discord OAuth failures.
         # Compare this value against what is registered in the Discord Developer Portal.
         if not self.DISCORD_REDIRECT_URI:
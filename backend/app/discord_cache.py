@@ -0,0 +1,125 @@
+"""
+Short-lived cache in front of the Discord lookups made during login.
+
+`/api/campaigns/available` needs the user's guild list and `/api/campaigns/join`
+needs their member object in the campaign's guild. When a whole table logs in
+at session time those lookups repeat within seconds, so responses are kept for
+a short TTL (404s for unknown members too, on a shorter one) and concurrent
+identical lookups share a single in-flight request.
+
+Only 200 and 404 responses are cached; anything else (401, 429, 5xx) is
+returned to the caller and the next lookup goes back to Discord.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Hashable, Optional
+
+import httpx
+
+from . import metrics
+from .config import get_settings
+from .discord_client import DiscordClient, discord_client
+
+
+@dataclass
+class _Entry:
+    response: httpx.Response
+    expires_at: float
+
+
+class DiscordCache:
+    def __init__(
+        self,
+        client: Optional[DiscordClient] = None,
+        guilds_ttl: Optional[float] = None,
+        member_ttl: Optional[float] = None,
+        negative_ttl: Optional[float] = None,
+        max_entries: int = 10_000,
+    ):
+        settings = get_settings()
+        self.client = client or discord_client
+        self.guilds_ttl = settings.DISCORD_GUILDS_CACHE_TTL if guilds_ttl is None else guilds_ttl
+        self.member_ttl = settings.DISCORD_MEMBER_CACHE_TTL if member_ttl is None else member_ttl
+        self.negative_ttl = settings.DISCORD_NEGATIVE_CACHE_TTL if negative_ttl is None else negative_ttl
+        self.max_entries = max_entries
+
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _ttl_for(self, response: httpx.Response, ttl: float) -> float:
+        if response.status_code == 200:
+            return ttl
+        if response.status_code == 404:
+            return self.negative_ttl
+        return 0.0
+
+    def _store(self, key: Hashable, response: httpx.Response, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        self._entries[key] = _Entry(response, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _fetch(self, key: Hashable, fetch: Callable[[], Awaitable[httpx.Response]], ttl: float) -> httpx.Response:
+        response = await fetch()
+        self._store(key, response, self._ttl_for(response, ttl))
+        return response
+
+    async def _get(self, key: Hashable, fetch: Callable[[], Awaitable[httpx.Response]], ttl: float) -> httpx.Response:
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires_at > time.monotonic():
+                self.hits += 1
+                metrics.CACHE_LOOKUPS.labels("discord", "hit").inc()
+                self._entries.move_to_end(key)
+                return entry.response
+            del self._entries[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            metrics.CACHE_LOOKUPS.labels("discord", "miss").inc()
+            task = asyncio.ensure_future(self._fetch(key, fetch, ttl))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._inflight.pop(key, None) if self._inflight.get(key) is done else None)
+        else:
+            self.coalesced += 1
+            metrics.CACHE_LOOKUPS.labels("discord", "coalesced").inc()
+        # Shield so one caller disconnecting doesn't cancel the lookup for everyone waiting on it.
+        return await asyncio.shield(task)
+
+    async def get_user_guilds(self, discord_id: str, access_token: str) -> httpx.Response:
+        return await self._get(
+            ("guilds", discord_id),
+            lambda: self.client.get_current_user_guilds(access_token),
+            self.guilds_ttl,
+        )
+
+    async def get_guild_member(self, guild_id: str, user_id: str) -> httpx.Response:
+        return await self._get(
+            ("member", str(guild_id), str(user_id)),
+            lambda: self.client.get_guild_member(guild_id, user_id),
+            self.member_ttl,
+        )
+
+    def invalidate_member(self, guild_id: str, user_id: str) -> None:
+        self._entries.pop(("member", str(guild_id), str(user_id)), None)
+
+    def invalidate_user(self, discord_id: str) -> None:
+        self._entries.pop(("guilds", discord_id), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "coalesced": self.coalesced}
+
+
+# Singleton instance
+discord_cache = DiscordCache()
@@ -0,0 +1,237 @@
+"""
+Shared Discord REST client.
+
+One `httpx.AsyncClient` per worker process, kept alive for the app's lifetime so
+calls to discord.com reuse pooled keep-alive connections instead of paying a TLS
+handshake each time. Requests are throttled per Discord rate-limit bucket using
+the `X-RateLimit-*` response headers, and 429s are retried after `Retry-After`.
+
+`base_url` and `transport` can be overridden to point the client at a local
+stand-in server (see tests/fake_discord.py).
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from . import metrics
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Path parameters Discord uses to split one route into independent buckets.
+_MAJOR_PARAMS = ("guild_id", "channel_id", "webhook_id")
+
+# Every user token gets its own buckets; past this many, expired ones are dropped.
+_MAX_TRACKED_BUCKETS = 1024
+
+
+@dataclass
+class _Bucket:
+    remaining: Optional[int] = None  # None = unknown, let the request through
+    reset_at: float = 0.0            # time.monotonic() when the window resets
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class DiscordClient:
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        timeout: Optional[httpx.Timeout] = None,
+        max_retries: int = 3,
+        max_retry_after: float = 30.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = (base_url or get_settings().DISCORD_API_BASE).rstrip("/")
+        self.timeout = timeout or httpx.Timeout(10.0, connect=5.0)
+        self.max_retries = max_retries
+        # A 429 asking us to wait longer than this is returned to the caller rather than slept on.
+        self.max_retry_after = max_retry_after
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+        # (method, route) -> Discord's bucket hash, learned from X-RateLimit-Bucket
+        self._bucket_ids: Dict[Tuple[str, str], str] = {}
+        self._buckets: Dict[Tuple[str, str, str], _Bucket] = {}
+        self._global_reset_at = 0.0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=60.0),
+                transport=self._transport,
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        # Locks are bound to the event loop that used them; start fresh on the next loop.
+        self._buckets.clear()
+        self._global_reset_at = 0.0
+
+    # --- Rate limiting ---------------------------------------------------------
+
+    def _bucket_key(self, method: str, route: str, path_params: Dict[str, Any], auth: str) -> Tuple[str, str, str]:
+        bucket_id = self._bucket_ids.get((method, route), f"{method} {route}")
+        major = ":".join(str(path_params[p]) for p in _MAJOR_PARAMS if p in path_params)
+        # User-token routes (e.g. /users/@me/guilds) are limited per token, bot routes per bot.
+        auth_id = hashlib.sha1(auth.encode()).hexdigest()[:16]
+        return (bucket_id, major, auth_id)
+
+    def _bucket_for(self, method: str, route: str, path_params: Dict[str, Any], auth: str) -> _Bucket:
+        key = self._bucket_key(method, route, path_params, auth)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= _MAX_TRACKED_BUCKETS:
+                self._prune_buckets()
+            bucket = self._buckets[key] = _Bucket()
+        return bucket
+
+    def _prune_buckets(self) -> None:
+        """Forget per-token buckets whose window has already reset."""
+        now = time.monotonic()
+        for key in [k for k, b in self._buckets.items() if b.reset_at <= now and not b.lock.locked()]:
+            del self._buckets[key]
+
+    async def _acquire(self, bucket: _Bucket) -> None:
+        while True:
+            now = time.monotonic()
+            if self._global_reset_at > now:
+                await asyncio.sleep(self._global_reset_at - now)
+                continue
+            async with bucket.lock:
+                now = time.monotonic()
+                if bucket.reset_at <= now:
+                    bucket.remaining = None
+                if bucket.remaining is None or bucket.remaining > 0:
+                    if bucket.remaining is not None:
+                        bucket.remaining -= 1
+                    return
+                delay = bucket.reset_at - now
+            logger.info("Discord bucket exhausted, waiting", extra={"wait_seconds": round(delay, 3)})
+            await asyncio.sleep(delay)
+
+    def _update_bucket(
+        self, method: str, route: str, path_params: Dict[str, Any], auth: str, bucket: _Bucket, response: httpx.Response
+    ) -> None:
+        headers = response.headers
+        bucket_hash = headers.get("X-RateLimit-Bucket")
+        if bucket_hash and self._bucket_ids.get((method, route)) != bucket_hash:
+            # First sighting of the hash: carry this bucket's state over to its new key.
+            self._bucket_ids[(method, route)] = bucket_hash
+            self._buckets.setdefault(self._bucket_key(method, route, path_params, auth), bucket)
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset_after = headers.get("X-RateLimit-Reset-After")
+        if remaining is not None and reset_after is not None:
+            bucket.remaining = int(remaining)
+            bucket.reset_at = time.monotonic() + float(reset_after)
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> float:
+        header = response.headers.get("Retry-After")
+        if header is not None:
+            return float(header)
+        try:
+            return float(response.json().get("retry_after", 1.0))
+        except (ValueError, AttributeError):
+            return 1.0
+
+    # --- Requests --------------------------------------------------------------
+
+    async def request(
+        self,
+        method: str,
+        route: str,
+        *,
+        auth: str,
+        path_params: Optional[Dict[str, Any]] = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """
+        Send a request to `route` (a path template such as "/guilds/{guild_id}/members")
+        with `auth` as the Authorization header (omitted when empty). Returns the final
+        response; a 429 is only returned once retries are exhausted or Discord asks for
+        a long wait.
+        """
+        path_params = path_params or {}
+        path = route.format(**path_params)
+        headers = dict(kwargs.pop("headers", {}))
+        if auth:
+            headers["Authorization"] = auth
+        bucket = self._bucket_for(method, route, path_params, auth)
+
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(bucket)
+            started = time.perf_counter()
+            try:
+                response = await self.client.request(method, path, headers=headers, **kwargs)
+            except httpx.HTTPError:
+                metrics.DISCORD_LATENCY.labels(method, route, "error").observe(time.perf_counter() - started)
+                raise
+            metrics.DISCORD_LATENCY.labels(method, route, str(response.status_code)).observe(time.perf_counter() - started)
+            self._update_bucket(method, route, path_params, auth, bucket, response)
+            if response.status_code != 429:
+                return response
+
+            retry_after = self._retry_after(response)
+            is_global = response.headers.get("X-RateLimit-Global", "").lower() == "true"
+            logger.warning(
+                "Discord rate limited",
+                extra={"route": f"{method} {route}", "retry_after": retry_after, "global": is_global, "attempt": attempt},
+            )
+            if attempt == self.max_retries or retry_after > self.max_retry_after:
+                return response
+            if is_global:
+                self._global_reset_at = time.monotonic() + retry_after
+            else:
+                bucket.remaining = 0
+                bucket.reset_at = time.monotonic() + retry_after
+        return response
+
+    # --- Endpoints used by the app ---------------------------------------------
+
+    async def exchange_code(self, data: Dict[str, str]) -> httpx.Response:
+        return await self.request(
+            "POST", "/oauth2/token",
+            auth="",
+            data=data,
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+        )
+
+    async def get_current_user(self, access_token: str) -> httpx.Response:
+        return await self.request("GET", "/users/@me", auth=f"Bearer {access_token}")
+
+    async def get_current_user_guilds(self, access_token: str) -> httpx.Response:
+        return await self.request("GET", "/users/@me/guilds", auth=f"Bearer {access_token}")
+
+    async def get_guild_member(self, guild_id: str, user_id: str) -> httpx.Response:
+        return await self.request(
+            "GET", "/guilds/{guild_id}/members/{user_id}",
+            auth=f"Bot {get_settings().DISCORD_BOT_TOKEN}",
+            path_params={"guild_id": guild_id, "user_id": user_id},
+        )
+
+    async def list_guild_members(self, guild_id: str, limit: int = 1000, after: str = "0") -> httpx.Response:
+        """One page of guild members, ordered by user id. Needs the Server Members intent."""
+        return await self.request(
+            "GET", "/guilds/{guild_id}/members",
+            auth=f"Bot {get_settings().DISCORD_BOT_TOKEN}",
+            path_params={"guild_id": guild_id},
+            params={"limit": limit, "after": after},
+        )
+
+    async def get_gateway(self) -> httpx.Response:
+        return await self.request("GET", "/v10/gateway", auth="")
+
+
+# Singleton instance
+discord_client = DiscordClient()
@@ -0,0 +1,204 @@
+"""
+Incremental JSON parsing for streamed LLM output.
+
+`JSONStreamParser` is fed text as it arrives and reports each value near the
+top of the document (a top-level field, or an item of a top-level array) as
+soon as that value is complete, so callers can validate one act or scene while
+the rest is still streaming.
+
+It only tracks structure (strings, brackets, commas); each reported value is
+decoded on its own with `json.loads`. A broken item (a missing comma, an
+unescaped quote) therefore comes back as a `MalformedValue` without spoiling
+its neighbours, and output that stops mid-way still yields everything that was
+finished. Text before the first `{` or `[` (a markdown fence, a preamble) is
+skipped.
+
+    parser = JSONStreamParser()
+    for delta in stream:
+        for path, value in parser.feed(delta):
+            ...                      # path is ("acts", 0), ("title",), ...
+    adventure = parser.result()      # best-effort object from what arrived
+"""
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+Path = Tuple[Union[str, int], ...]
+
+_WHITESPACE = " \t\r\n"
+_SCALAR_END = _WHITESPACE + ",]}"
+
+
+@dataclass
+class MalformedValue:
+    """A complete value whose text is not valid JSON."""
+    text: str
+    error: str
+
+
+@dataclass
+class _Frame:
+    kind: str  # "object" | "array"
+    path: Path
+    start: int
+    expect: str  # object: key | colon | value | comma; array: value | comma
+    key: Optional[str] = None
+    index: int = 0
+
+
+class JSONStreamParser:
+    def __init__(self, max_depth: int = 2):
+        self.max_depth = max_depth
+        self.done = False
+        self._text = ""
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._started = False
+        self._string: Optional[Tuple[int, bool]] = None  # (start, is_key) while inside a string
+        self._escape = False
+        self._scalar: Optional[Tuple[int, Path]] = None  # (start, path) while inside a bare scalar
+        self._top: Dict[str, Any] = {}
+        self._top_items: Dict[str, List[Any]] = {}
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    def feed(self, chunk: str) -> List[Tuple[Path, Any]]:
+        """Consume `chunk`; return the values (at depth 1..max_depth) it completed, in order."""
+        self._text += chunk
+        events: List[Tuple[Path, Any]] = []
+        text = self._text
+        while self._pos < len(text) and not self.done:
+            self._step(text, self._pos, events)
+            self._pos += 1
+        return events
+
+    def _step(self, text: str, i: int, events: List[Tuple[Path, Any]]) -> None:
+        c = text[i]
+        if self._string is not None:
+            if self._escape:
+                self._escape = False
+            elif c == "\\":
+                self._escape = True
+            elif c == '"':
+                start, is_key = self._string
+                self._string = None
+                frame = self._stack[-1]
+                if is_key:
+                    try:
+                        frame.key = json.loads(text[start:i + 1])
+                    except ValueError:
+                        frame.key = text[start + 1:i]
+                    frame.expect = "colon"
+                else:
+                    self._emit(_frame_path(frame), start, i + 1, events)
+            return
+
+        if self._scalar is not None:
+            if c not in _SCALAR_END:
+                return
+            start, path = self._scalar
+            self._scalar = None
+            self._emit(path, start, i, events)
+            # fall through: `c` is also a delimiter
+
+        if not self._started:
+            if c in "{[":
+                self._started = True
+                self._push(c, i, ())
+            return
+        if c in _WHITESPACE:
+            return
+
+        frame = self._stack[-1]
+        closer = "}" if frame.kind == "object" else "]"
+        if c == closer and frame.expect in ("comma", "key", "value"):
+            # Also accepts a trailing comma; the item's own json.loads decides validity.
+            self._close(i, events)
+        elif c == ",":
+            if frame.kind == "array":
+                if frame.expect == "comma":
+                    frame.index += 1
+                frame.expect = "value"
+            else:
+                frame.expect = "key"
+        elif frame.kind == "object" and frame.expect in ("key", "comma") and c == '"':
+            # A missing comma between members is tolerated the same way.
+            self._string = (i, True)
+        elif frame.kind == "object" and frame.expect == "colon":
+            if c == ":":
+                frame.expect = "value"
+        elif frame.expect == "value" or (frame.kind == "array" and frame.expect == "comma"):
+            if frame.kind == "array" and frame.expect == "comma":
+                frame.index += 1
+            self._start_value(c, i, frame)
+        # anything else is stray text; skip it
+
+    def _start_value(self, c: str, i: int, parent: _Frame) -> None:
+        path = _frame_path(parent)
+        parent.expect = "comma"
+        if c in "{[":
+            self._push(c, i, path)
+        elif c == '"':
+            self._string = (i, False)
+        else:
+            self._scalar = (i, path)
+
+    def _push(self, c: str, i: int, path: Path) -> None:
+        kind = "object" if c == "{" else "array"
+        self._stack.append(_Frame(kind, path, i, expect="key" if kind == "object" else "value"))
+
+    def _close(self, i: int, events: List[Tuple[Path, Any]]) -> None:
+        frame = self._stack.pop()
+        if not self._stack:
+            self.done = True
+            return
+        self._emit(frame.path, frame.start, i + 1, events)
+
+    def _emit(self, path: Path, start: int, end: int, events: List[Tuple[Path, Any]]) -> None:
+        if not 1 <= len(path) <= self.max_depth:
+            return
+        raw = self._text[start:end]
+        try:
+            value = json.loads(raw)
+        except ValueError as e:
+            value = MalformedValue(raw, str(e))
+        events.append((path, value))
+        if len(path) == 1:
+            self._top[path[0]] = value
+        elif len(path) == 2 and isinstance(path[1], int):
+            items = self._top_items.setdefault(path[0], [])
+            items.extend([None] * (path[1] + 1 - len(items)))
+            items[path[1]] = value
+
+    def result(self) -> Dict[str, Any]:
+        """
+        The top-level object as far as it can be recovered: complete fields as
+        parsed, arrays as the items that were finished (a malformed item as its
+        raw text), unfinished fields left out.
+        """
+        out: Dict[str, Any] = {}
+        keys = list(dict.fromkeys([*self._top, *self._top_items]))
+        for key in keys:
+            value = self._top.get(key)
+            if value is not None and not isinstance(value, MalformedValue):
+                out[key] = value
+            elif key in self._top_items:
+                out[key] = [v.text if isinstance(v, MalformedValue) else v for v in self._top_items[key] if v is not None]
+            elif isinstance(value, MalformedValue):
+                out[key] = value.text
+            else:
+                out[key] = value
+        return out
+
+
+def _frame_path(frame: _Frame) -> Path:
+    return frame.path + ((frame.key,) if frame.kind == "object" else (frame.index,))
+
+
+def parse_partial(text: str) -> Dict[str, Any]:
+    """Best-effort top-level object from complete, truncated or partly malformed JSON text."""
+    parser = JSONStreamParser()
+    parser.feed(text)
+    return parser.result()
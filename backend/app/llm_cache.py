@@ -0,0 +1,167 @@
+"""
+Content-addressed cache for LLM completions.
+
+The key is a SHA-256 over everything that shapes the output: model, prompts,
+JSON schema, temperature and max_tokens. Entries are small JSON files under
+`ONESHOT_OUTPUT_DIR/llm_cache/`, written atomically (temp file + rename) so
+every gunicorn worker can share the directory without coordination.
+
+Eviction is by last use: a hit refreshes the file's mtime, entries unused for
+`LLM_CACHE_MAX_AGE` seconds are dropped, and when the directory grows past
+`LLM_CACHE_MAX_BYTES` the least recently used entries go first. The sweep runs
+every `evict_every` writes rather than on each one.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from . import metrics
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# A temp file untouched this long belongs to a write that was interrupted, not one in progress.
+_STALE_TMP_AGE = 300
+
+
+class LLMResponseCache:
+    def __init__(self, directory: str, max_bytes: int, max_age: float, evict_every: int = 50):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.evict_every = evict_every
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._writes_since_sweep = 0
+
+    @classmethod
+    def from_settings(cls) -> Optional["LLMResponseCache"]:
+        settings = get_settings()
+        if not settings.LLM_CACHE_ENABLED:
+            return None
+        return cls(
+            directory=os.path.join(settings.ONESHOT_OUTPUT_DIR, "llm_cache"),
+            max_bytes=settings.LLM_CACHE_MAX_BYTES,
+            max_age=settings.LLM_CACHE_MAX_AGE,
+        )
+
+    @staticmethod
+    def key(
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        json_schema: Optional[Dict[str, Any]],
+        temperature: float,
+        max_tokens: int,
+    ) -> str:
+        material = json.dumps(
+            [model, system_prompt, user_prompt, json_schema, temperature, max_tokens],
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        # Two-character fan-out keeps directory listings short.
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _hit(self) -> None:
+        self.hits += 1
+        metrics.CACHE_LOOKUPS.labels("llm_response", "hit").inc()
+
+    def _miss(self) -> None:
+        self.misses += 1
+        metrics.CACHE_LOOKUPS.labels("llm_response", "miss").inc()
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+                self._miss()
+                return None
+            with path.open("r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            self._miss()
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("LLM cache read failed", extra={"key": key, "error": str(e)})
+            self._miss()
+            return None
+        self._hit()
+        return entry["content"]
+
+    def put(self, key: str, content: str, model: str) -> None:
+        path = self._path(key)
+        tmp = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"model": model, "content": content, "created_at": time.time()}, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("LLM cache write failed", extra={"key": key, "error": str(e)})
+            if tmp is not None:
+                Path(tmp).unlink(missing_ok=True)
+            return
+        self.writes += 1
+        self._writes_since_sweep += 1
+        if self._writes_since_sweep >= self.evict_every:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Drop expired entries and temp files left by interrupted writes, then least
+        recently used entries until under the size budget. Temp files of writes still
+        in progress count toward the budget but are left alone.
+        """
+        self._writes_since_sweep = 0
+        now = time.time()
+        entries = []
+        in_progress = 0
+        removed = 0
+        for path in self.directory.glob("*/*.tmp"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            if now - st.st_mtime > _STALE_TMP_AGE:
+                path.unlink(missing_ok=True)
+                removed += 1
+            else:
+                in_progress += st.st_size
+        for path in self.directory.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            if now - st.st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+                removed += 1
+            else:
+                entries.append((st.st_mtime, st.st_size, path))
+
+        total = in_progress + sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+
+        self.evictions += removed
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "writes": self.writes, "evictions": self.evictions}
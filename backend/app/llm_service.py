@@ -2,52 +2,284 @@ import httpx
 import json
 import logging
 import asyncio
-from typing import Any, Dict, Optional, Union
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterator, List, Optional, Tuple, TypeVar, Union
+from tenacity import AsyncRetrying, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 from .config import get_settings
+from .json_stream import JSONStreamParser
+from .llm_cache import LLMResponseCache
 
 logger = logging.getLogger(__name__)
 
+
+class PartialJSON(dict):
+    """
+    An object salvaged by `LLMService.parse_json(partial=True)`. `truncated` is
+    True when the output stopped before the object was closed, so items may be
+    missing rather than just malformed.
+    """
+
+    def __init__(self, value: Dict[str, Any], truncated: bool):
+        super().__init__(value)
+        self.truncated = truncated
+
+
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ReadTimeout, httpx.ConnectTimeout)
+
+# TTFB samples kept per provider, and how many are needed before their p95 replaces LLM_HEDGE_DELAY.
+TTFB_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20
+
+T = TypeVar("T")
+
+
+@dataclass
+class LLMCallStats:
+    """Timing and usage of one `generate` call. Streamed calls are filled in as the stream is read."""
+    model: str
+    label: Optional[str] = None
+    stream: bool = False
+    cached: bool = False
+    prompt_tokens: Optional[int] = None      # from the response `usage`, when the API reports it
+    completion_tokens: Optional[int] = None
+    ttfb: Optional[float] = None             # seconds to response headers (to the first delta when streaming)
+    latency: Optional[float] = None          # seconds until the completion was fully read, retries included
+    retries: int = 0
+    hedged: bool = False                     # a second provider was started because the first was slow
+    error: Optional[str] = None
+
+
+_recorder: ContextVar[Optional[List[LLMCallStats]]] = ContextVar("llm_call_recorder", default=None)
+
+
+@contextmanager
+def record_llm_calls() -> Iterator[List[LLMCallStats]]:
+    """
+    Collect stats for every `generate` call made inside the block, including
+    calls from tasks it spawns (they inherit the context).
+    """
+    calls: List[LLMCallStats] = []
+    token = _recorder.set(calls)
+    try:
+        yield calls
+    finally:
+        _recorder.reset(token)
+
+
+class LLMUnavailableError(RuntimeError):
+    """Every configured provider's circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Closed until `failure_threshold` consecutive failures, then open (requests
+    skip the provider) for `cooldown` seconds. After that one trial request is
+    let through: success closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int, cooldown: float, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self._clock() - self.opened_at < self.cooldown:
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = self._clock()
+
+    def release(self) -> None:
+        """The request was abandoned (e.g. lost a hedge race) without telling us anything."""
+        self._trial_in_flight = False
+
+
+@dataclass(eq=False)
+class LLMProvider:
+    """One model on one OpenAI-compatible endpoint, with its own connection pool and breaker."""
+    model: str
+    base_url: str
+    api_key: str
+    transport: Optional[httpx.AsyncBaseTransport] = None
+    http2: bool = False
+    breaker: Optional[CircuitBreaker] = None
+    ttfb: Deque[float] = field(default_factory=lambda: deque(maxlen=TTFB_WINDOW))
+    _client: Optional[httpx.AsyncClient] = field(default=None, repr=False)
+
+    def __post_init__(self):
+        self.base_url = self.base_url.rstrip("/")
+        if self.breaker is None:
+            settings = get_settings()
+            self.breaker = CircuitBreaker(settings.LLM_BREAKER_FAILURES, settings.LLM_BREAKER_COOLDOWN)
+
+    @property
+    def name(self) -> str:
+        return f"{self.model}@{self.base_url}"
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Process-wide pooled client, so consecutive calls reuse keep-alive connections."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                # Read timeout applies between chunks, so long streamed completions are fine.
+                timeout=httpx.Timeout(60.0, connect=10.0),
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=120.0),
+                http2=self.http2,
+                transport=self.transport,
+            )
+        return self._client
+
+    def ttfb_p95(self) -> Optional[float]:
+        if len(self.ttfb) < HEDGE_MIN_SAMPLES:
+            return None
+        samples = sorted(self.ttfb)
+        return samples[math.ceil(0.95 * len(samples)) - 1]
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def status(self) -> Dict[str, Any]:
+        p95 = self.ttfb_p95()
+        return {
+            "provider": self.name,
+            "breaker": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "ttfb_samples": len(self.ttfb),
+            "ttfb_p95_ms": round(p95 * 1000) if p95 is not None else None,
+        }
+
+
+@dataclass(eq=False)
+class _Attempt:
+    provider: LLMProvider
+    first_byte: bool = False
+    ttfb: Optional[float] = None
+
+
+def _is_provider_fault(exc: BaseException) -> bool:
+    """Errors that say something about the provider's health (vs. our request)."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500 or exc.response.status_code == 429
+    return isinstance(exc, httpx.TransportError)
+
+
 class LLMService:
-    def __init__(self):
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        response_cache: Optional[LLMResponseCache] = None,
+        fallbacks: Optional[List[LLMProvider]] = None,
+    ):
+        """
+        `fallbacks` are tried in order after the primary model, when it fails or
+        (hedging) hasn't sent a first byte in time. Defaults to the providers in
+        LLM_FALLBACK_MODELS.
+        """
         self.settings = get_settings()
-        self.api_key = self.settings.LLM_API_KEY
-        self.base_url = self.settings.LLM_API_BASE
-        self.model = self.settings.LLM_MODEL
-        
-        if not self.api_key:
+        api_key = self.settings.LLM_API_KEY if api_key is None else api_key
+        base_url = (base_url or self.settings.LLM_API_BASE).rstrip("/")
+        http2 = self._use_http2()
+        primary = LLMProvider(model or self.settings.LLM_MODEL, base_url, api_key, transport, http2)
+        if fallbacks is None:
+            fallbacks = [
+                LLMProvider(fb_model, fb_base or base_url, api_key, transport, http2)
+                for fb_model, fb_base in self._configured_fallbacks()
+            ]
+        self.providers: List[LLMProvider] = [primary, *fallbacks]
+        self.response_cache = response_cache
+
+        if not api_key:
             logger.warning("LLM_API_KEY is not set. LLM features will not work.")
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        retry=retry_if_exception_type((httpx.ConnectError, httpx.ReadTimeout, httpx.ConnectTimeout))
-    )
-    async def generate(
+    # The primary provider's settings.
+    @property
+    def model(self) -> str:
+        return self.providers[0].model
+
+    @property
+    def base_url(self) -> str:
+        return self.providers[0].base_url
+
+    @property
+    def api_key(self) -> str:
+        return self.providers[0].api_key
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self.providers[0].client
+
+    def _configured_fallbacks(self) -> List[Tuple[str, Optional[str]]]:
+        """Parse LLM_FALLBACK_MODELS: comma-separated `model` (same endpoint) or `model@base_url`."""
+        entries = []
+        for entry in self.settings.LLM_FALLBACK_MODELS.split(","):
+            entry = entry.strip()
+            if not entry:
+                continue
+            fb_model, _, fb_base = entry.partition("@")
+            entries.append((fb_model.strip(), fb_base.strip() or None))
+        return entries
+
+    def _use_http2(self) -> bool:
+        if not self.settings.LLM_HTTP2:
+            return False
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("LLM_HTTP2 is set but the 'h2' package is not installed; using HTTP/1.1.")
+            return False
+        return True
+
+    async def aclose(self) -> None:
+        for provider in self.providers:
+            await provider.aclose()
+
+    def provider_status(self) -> List[Dict[str, Any]]:
+        return [p.status() for p in self.providers]
+
+    def _build_request(
         self,
         system_prompt: str,
         user_prompt: str,
-        json_schema: Optional[Dict[str, Any]] = None,
-        temperature: float = 0.7,
-        max_tokens: int = 4096
-    ) -> Union[Dict[str, Any], str]:
-        """
-        Generate content using the configured LLM.
-        
-        Args:
-            system_prompt: The system instruction.
-            user_prompt: The user's input/request.
-            json_schema: Optional JSON schema to enforce structured output.
-            temperature: Creativity parameter (0.0 to 1.0).
-            max_tokens: Maximum tokens to generate.
-            
-        Returns:
-            Dict if json_schema is provided, otherwise str.
-        """
-        if not self.api_key:
-            raise ValueError("LLM_API_KEY is not configured")
-
+        json_schema: Optional[Dict[str, Any]],
+        temperature: float,
+        max_tokens: int,
+    ) -> Tuple[Dict[str, str], Dict[str, Any]]:
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
@@ -74,38 +306,367 @@ class LLMService:
             if "JSON" not in system_prompt and "json" not in system_prompt:
                 messages[0]["content"] += f"\n\nYou must output valid JSON matching this schema:\n{json.dumps(json_schema, indent=2)}"
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/chat/completions",
-                    headers=headers,
-                    json=payload
+        return headers, payload
+
+    @staticmethod
+    def _for_provider(
+        provider: LLMProvider, headers: Dict[str, str], payload: Dict[str, Any]
+    ) -> Tuple[Dict[str, str], Dict[str, Any]]:
+        return {**headers, "Authorization": f"Bearer {provider.api_key}"}, {**payload, "model": provider.model}
+
+    @staticmethod
+    def parse_json(content: str, partial: bool = False) -> Dict[str, Any]:
+        """
+        Parse a JSON object out of model output, tolerating markdown code fences around it.
+
+        With `partial=True`, output that was cut off or has a malformed item is
+        salvaged rather than rejected (see `json_stream.parse_partial`): finished
+        fields and array items are kept, a broken item comes back as its raw text,
+        and callers validate and repair what is missing. A salvaged object is
+        returned as a `PartialJSON`.
+        """
+        try:
+            return LLMService._loads(content)
+        except json.JSONDecodeError as e:
+            parser = JSONStreamParser()
+            if partial:
+                parser.feed(content)
+            salvaged = parser.result()
+            if salvaged:
+                logger.warning("Salvaged partial LLM JSON output", extra={"error": str(e), "fields": sorted(salvaged)})
+                return PartialJSON(salvaged, truncated=not parser.done)
+            logger.error(f"Failed to parse LLM JSON output: {content}")
+            raise ValueError(f"LLM output was not valid JSON: {e}")
+
+    @staticmethod
+    def _loads(content: str) -> Any:
+        # Find the first '{' and last '}' to extract JSON if there's markdown code blocks
+        start = content.find('{')
+        end = content.rfind('}') + 1
+        if start != -1 and end != -1:
+            return json.loads(content[start:end])
+        # Fallback: try parsing the whole string
+        return json.loads(content)
+
+    async def generate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        json_schema: Optional[Dict[str, Any]] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 4096,
+        stream: bool = False,
+        cache: bool = True,
+        label: Optional[str] = None,
+        validate: Optional[Callable[[Any], Any]] = None,
+    ) -> Union[Dict[str, Any], str, AsyncIterator[str]]:
+        """
+        Generate content using the configured LLM.
+
+        Args:
+            system_prompt: The system instruction.
+            user_prompt: The user's input/request.
+            json_schema: Optional JSON schema to enforce structured output.
+            temperature: Creativity parameter (0.0 to 1.0).
+            max_tokens: Maximum tokens to generate.
+            stream: Return an async iterator of text deltas instead of the finished output.
+                The caller joins the deltas and, for JSON output, runs `parse_json` on the result.
+            cache: Look up / store the completion in the response cache. Pass False to
+                force a fresh completion (the new result still replaces the cached one).
+            label: Name of the prompt (e.g. "outline") in the call's `LLMCallStats`.
+            validate: The caller's check of the parsed output (e.g. a Pydantic model's
+                `model_validate`). A completion it raises on is returned but not cached,
+                and a cached one it raises on is treated as a miss, so a response the
+                caller rejects is never replayed.
+
+        Returns:
+            Dict if json_schema is provided, otherwise str. With stream=True, an async
+            iterator of str deltas.
+        """
+        if not self.api_key:
+            raise ValueError("LLM_API_KEY is not configured")
+
+        headers, payload = self._build_request(system_prompt, user_prompt, json_schema, temperature, max_tokens)
+        stats = LLMCallStats(model=self.model, label=label, stream=stream)
+        calls = _recorder.get()
+        if calls is not None:
+            calls.append(stats)
+
+        cache_key = None
+        if self.response_cache is not None:
+            # Keyed on the primary model: it is the same request whichever provider answers it.
+            cache_key = LLMResponseCache.key(self.model, system_prompt, user_prompt, json_schema, temperature, max_tokens)
+            cached = self.response_cache.get(cache_key) if cache else None
+            if cached is not None and not self._accepts(validate, cached, bool(json_schema)):
+                logger.info("Cached LLM response rejected by the caller", extra={"cache_key": cache_key})
+                cached = None
+            if cached is not None:
+                logger.info("LLM response cache hit", extra={"cache_key": cache_key})
+                stats.cached = True
+                stats.ttfb = stats.latency = 0.0
+                if stream:
+                    return self._replay(cached)
+                return self.parse_json(cached) if json_schema else cached
+
+        if stream:
+            return self._stream_completion(headers, payload, cache_key, bool(json_schema), stats, validate)
+
+        start = time.monotonic()
+        try:
+            async for attempt in AsyncRetrying(
+                stop=stop_after_attempt(3),
+                wait=wait_exponential(multiplier=1, min=4, max=10),
+                retry=retry_if_exception_type(RETRYABLE_ERRORS),
+            ):
+                with attempt:
+                    stats.retries = attempt.retry_state.attempt_number - 1
+                    winner, content = await self._race(
+                        lambda a: self._complete(a, headers, payload, stats), stats
+                    )
+            parsed = self.parse_json(content, partial=True) if json_schema else content
+        except Exception as e:
+            stats.error = str(e) or type(e).__name__
+            raise
+        finally:
+            stats.latency = time.monotonic() - start
+            self._log_call(stats)
+
+        # Only cache complete completions the caller accepts, so a salvaged or rejected one is never replayed.
+        if cache_key is not None and self._accepts(validate, content, bool(json_schema)):
+            self.response_cache.put(cache_key, content, winner.provider.model)
+        return parsed
+
+    @classmethod
+    def _accepts(cls, validate: Optional[Callable[[Any], Any]], content: str, expects_json: bool) -> bool:
+        """Whether `content` is worth caching: well-formed JSON if JSON was asked for, and passes `validate`."""
+        try:
+            value = cls.parse_json(content) if expects_json else content
+            if validate is not None:
+                validate(value)
+        except (ValueError, TypeError):  # pydantic.ValidationError is a ValueError
+            return False
+        return True
+
+    def _hedge_delay(self) -> Optional[float]:
+        """Seconds to wait for a first byte before starting the next provider; None disables hedging."""
+        if not self.settings.LLM_HEDGE_ENABLED or len(self.providers) < 2:
+            return None
+        p95 = self.providers[0].ttfb_p95()
+        if p95 is None:
+            return self.settings.LLM_HEDGE_DELAY
+        return max(self.settings.LLM_HEDGE_MIN_DELAY, p95)
+
+    async def _race(
+        self,
+        start: Callable[[_Attempt], Awaitable[T]],
+        stats: LLMCallStats,
+        discard: Optional[Callable[[T], Awaitable[None]]] = None,
+    ) -> Tuple[_Attempt, T]:
+        """
+        Run `start` against the providers in order until one succeeds.
+
+        Providers whose breaker is open are skipped. When one fails the next is
+        started; when none of the running ones has produced a first byte within
+        the hedge delay, the next is started alongside and whichever finishes
+        first wins. Losers are cancelled (ones that finished anyway go to `discard`).
+        """
+        candidates = [p for p in self.providers if p.breaker.allow()]
+        if not candidates:
+            raise LLMUnavailableError("All LLM providers are unavailable (circuit breakers open)")
+        delay = self._hedge_delay()
+        running: Dict[asyncio.Task, _Attempt] = {}
+        last_error: Optional[BaseException] = None
+
+        def launch() -> None:
+            attempt = _Attempt(candidates.pop(0))
+            running[asyncio.ensure_future(start(attempt))] = attempt
+
+        launch()
+        try:
+            while running:
+                waiting = delay is not None and candidates and not any(a.first_byte for a in running.values())
+                done, _ = await asyncio.wait(
+                    running, timeout=delay if waiting else None, return_when=asyncio.FIRST_COMPLETED
                 )
+                if not done:
+                    stats.hedged = True
+                    logger.info("Hedging slow LLM request", extra={"next_provider": candidates[0].name})
+                    launch()
+                    continue
+                for task in done:
+                    attempt = running.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        attempt.provider.breaker.record_success()
+                        stats.model = attempt.provider.model
+                        if attempt.ttfb is not None:
+                            attempt.provider.ttfb.append(attempt.ttfb)
+                            stats.ttfb = attempt.ttfb
+                        return attempt, task.result()
+                    if _is_provider_fault(error):
+                        attempt.provider.breaker.record_failure()
+                    else:
+                        attempt.provider.breaker.release()
+                    logger.warning(
+                        "LLM provider failed",
+                        extra={"provider": attempt.provider.name, "error": str(error) or type(error).__name__},
+                    )
+                    last_error = error
+                if not running and candidates:
+                    launch()
+            raise last_error
+        finally:
+            for task, attempt in running.items():
+                task.cancel()
+                attempt.provider.breaker.release()
+            finished = await asyncio.gather(*running, return_exceptions=True)
+            if discard is not None:
+                for result in finished:
+                    if not isinstance(result, BaseException):
+                        await discard(result)
+            for candidate in candidates:
+                candidate.breaker.release()  # allowed through but never started
+
+    async def _complete(
+        self, attempt: _Attempt, headers: Dict[str, str], payload: Dict[str, Any], stats: LLMCallStats
+    ) -> str:
+        """One non-streaming request. Headers are awaited separately from the body to time TTFB."""
+        provider = attempt.provider
+        headers, payload = self._for_provider(provider, headers, payload)
+        sent = time.monotonic()
+        request = provider.client.build_request("POST", "/chat/completions", headers=headers, json=payload)
+        response = await provider.client.send(request, stream=True)
+        attempt.ttfb = time.monotonic() - sent
+        attempt.first_byte = True
+        try:
+            await response.aread()
+        finally:
+            await response.aclose()
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            logger.error(f"LLM API Error: {e.response.text}")
+            raise
+
+        result = response.json()
+        self._read_usage(result, stats)
+        return result["choices"][0]["message"]["content"]
+
+    @staticmethod
+    def _read_usage(body: Dict[str, Any], stats: LLMCallStats) -> None:
+        usage = body.get("usage") or {}
+        if "prompt_tokens" in usage:
+            stats.prompt_tokens = usage["prompt_tokens"]
+        if "completion_tokens" in usage:
+            stats.completion_tokens = usage["completion_tokens"]
+
+    @staticmethod
+    def _log_call(stats: LLMCallStats) -> None:
+        logger.info(
+            "LLM call finished",
+            extra={
+                "llm_label": stats.label,
+                "llm_model": stats.model,
+                "stream": stats.stream,
+                "prompt_tokens": stats.prompt_tokens,
+                "completion_tokens": stats.completion_tokens,
+                "ttfb_ms": round(stats.ttfb * 1000) if stats.ttfb is not None else None,
+                "latency_ms": round(stats.latency * 1000) if stats.latency is not None else None,
+                "retries": stats.retries,
+                "hedged": stats.hedged,
+                "error": stats.error,
+            },
+        )
+
+    @staticmethod
+    async def _replay(content: str) -> AsyncIterator[str]:
+        yield content
+
+    async def _provider_stream(
+        self, provider: LLMProvider, headers: Dict[str, str], payload: Dict[str, Any], stats: LLMCallStats
+    ) -> AsyncIterator[str]:
+        """Yield content deltas from one provider's OpenAI-style `text/event-stream` completion."""
+        headers, payload = self._for_provider(provider, headers, payload)
+        async with provider.client.stream("POST", "/chat/completions", headers=headers, json=payload) as response:
+            if response.status_code >= 400:
+                await response.aread()
+                logger.error(f"LLM API Error: {response.text}")
                 response.raise_for_status()
-                
-                result = response.json()
-                content = result["choices"][0]["message"]["content"]
-
-                if json_schema:
-                    try:
-                        # Find the first '{' and last '}' to extract JSON if there's markdown code blocks
-                        start = content.find('{')
-                        end = content.rfind('}') + 1
-                        if start != -1 and end != -1:
-                            json_str = content[start:end]
-                            return json.loads(json_str)
-                        else:
-                            # Fallback: try parsing the whole string
-                            return json.loads(content)
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Failed to parse LLM JSON output: {content}")
-                        raise ValueError(f"LLM output was not valid JSON: {e}")
-                
-                return content
-
-            except httpx.HTTPStatusError as e:
-                logger.error(f"LLM API Error: {e.response.text}")
-                raise
+
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue  # blank separators and ": keep-alive" comments
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                self._read_usage(chunk, stats)
+                choices = chunk.get("choices") or []
+                if not choices:
+                    continue
+                delta = (choices[0].get("delta") or {}).get("content")
+                if delta:
+                    yield delta
+
+    async def _open_stream(
+        self, attempt: _Attempt, headers: Dict[str, str], payload: Dict[str, Any], stats: LLMCallStats
+    ) -> Tuple[AsyncIterator[str], Optional[str]]:
+        """Start a provider's stream and wait for its first delta (None if it sent nothing)."""
+        opened = time.monotonic()
+        deltas = self._provider_stream(attempt.provider, headers, payload, stats)
+        try:
+            first = await deltas.__anext__()
+        except StopAsyncIteration:
+            first = None
+        except BaseException:
+            await deltas.aclose()
+            raise
+        attempt.ttfb = time.monotonic() - opened
+        attempt.first_byte = True
+        return deltas, first
+
+    @staticmethod
+    async def _close_stream(opened: Tuple[AsyncIterator[str], Optional[str]]) -> None:
+        await opened[0].aclose()
+
+    async def _stream_completion(
+        self,
+        headers: Dict[str, str],
+        payload: Dict[str, Any],
+        cache_key: Optional[str] = None,
+        expects_json: bool = False,
+        stats: Optional[LLMCallStats] = None,
+        validate: Optional[Callable[[Any], Any]] = None,
+    ) -> AsyncIterator[str]:
+        """Yield content deltas from whichever provider starts streaming first."""
+        stats = stats or LLMCallStats(model=self.model, stream=True)
+        # Ask for a final `usage` chunk; APIs that don't support it simply omit it.
+        payload = {**payload, "stream": True, "stream_options": {"include_usage": True}}
+        parts = []
+        start = time.monotonic()
+        try:
+            winner, (deltas, first) = await self._race(
+                lambda a: self._open_stream(a, headers, payload, stats), stats, discard=self._close_stream
+            )
+            try:
+                if first is not None:
+                    parts.append(first)
+                    yield first
+                async for delta in deltas:
+                    parts.append(delta)
+                    yield delta
+            finally:
+                await deltas.aclose()
+        except BaseException as e:
+            stats.error = str(e) or type(e).__name__
+            raise
+        finally:
+            stats.latency = time.monotonic() - start
+            self._log_call(stats)
+
+        content = "".join(parts)
+        if cache_key is not None and self._accepts(validate, content, expects_json):
+            self.response_cache.put(cache_key, content, winner.provider.model)
 
 # Singleton instance
-llm_service = LLMService()
+llm_service = LLMService(response_cache=LLMResponseCache.from_settings())
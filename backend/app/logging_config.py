@@ -4,6 +4,8 @@ import logging.config
 import contextvars
 from datetime import datetime, timezone
 
+from .query_stats import query_stats_var
+
 # Injected into every log line so requests can be correlated across log entries.
 request_id_var: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="-")
 
@@ -26,6 +28,10 @@ class JsonFormatter(logging.Formatter):
             "message": record.message,
             "request_id": request_id_var.get(),
         }
+        # The access log line carries the request's SQL totals (see query_stats).
+        stats = query_stats_var.get()
+        if stats is not None and record.name == "uvicorn.access":
+            log_record.update(stats.log_fields())
         # Forward any extra={} kwargs passed to the logger call.
         for key, val in record.__dict__.items():
             if key not in _STANDARD_ATTRS and not key.startswith("_"):
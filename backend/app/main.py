@@ -1,11 +1,17 @@
+import logging
+import time
 import uuid
-from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.orm import Session
 
 # Configure structured JSON logging before any other app imports so that
 # module-level startup code (e.g. Settings validation) uses the JSON formatter.
 from .logging_config import configure_logging, request_id_var
 configure_logging()
+from .query_stats import QueryStats, query_stats_var
+from . import metrics
 
 # Import all models to ensure they are registered with Base
 from .modules.auth import models as auth_models
@@ -17,6 +23,7 @@ from .modules.maps import models as map_models
 from .modules.factions import models as faction_models
 from .modules.ship import models as ship_models
 from .modules.ledger import models as ledger_models
+from .modules.search import models as search_models
 
 # Import routers
 from .modules.auth import router as auth_router
@@ -34,18 +41,75 @@ from .modules.factions import router as faction_router
 from .modules.debug import router as debug_router
 from .modules.ship import router as ship_router
 from .modules.ledger import router as ledger_router
+from .modules.search import router as search_router
+from .modules.campaigns import role_sync
+from .modules.oneshot import queue as oneshot_queue
+from .modules.oneshot.queue import oneshot_worker
+from .discord_client import discord_client
+from .llm_service import llm_service
+from .config import get_settings
+from .database import engine
+from .dependencies import get_db
 
-app = FastAPI()
 
-# Request ID middleware — injects a UUID into every request and all downstream log lines.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    worker_enabled = get_settings().ONESHOT_WORKER_ENABLED
+    if worker_enabled:
+        await oneshot_worker.start()
+    role_sync.start_scheduler()
+    yield
+    await role_sync.stop_scheduler()
+    if worker_enabled:
+        await oneshot_worker.stop()
+    # Release pooled keep-alive connections on shutdown.
+    await discord_client.aclose()
+    await llm_service.aclose()
+
+
+logger = logging.getLogger(__name__)
+
+app = FastAPI(lifespan=lifespan)
+
+# Request ID middleware — injects a UUID into every request and all downstream log lines,
+# and counts the request's SQL statements (reported on the access log line).
 @app.middleware("http")
 async def request_id_middleware(request: Request, call_next):
     req_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
     request_id_var.set(req_id)
+    stats = QueryStats()
+    query_stats_var.set(stats)
     response = await call_next(request)
     response.headers["X-Request-ID"] = req_id
+    threshold = get_settings().SQL_REPEAT_WARN_THRESHOLD
+    repeated = stats.repeated(threshold) if threshold > 0 else []
+    if repeated:
+        logger.warning(
+            "Possible N+1 queries: %s %s ran the same statement %d times",
+            request.method, request.url.path, repeated[0][1],
+            extra={"path": request.url.path, "db_queries": stats.count,
+                   "db_repeated": [{"sql": t, "count": n} for t, n in repeated]},
+        )
     return response
 
+# Metrics middleware — request count, latency and in-flight gauge per route template.
+@app.middleware("http")
+async def metrics_middleware(request: Request, call_next):
+    method = request.method
+    started = time.perf_counter()
+    status = 500
+    metrics.HTTP_IN_PROGRESS.labels(method).inc()
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        metrics.HTTP_IN_PROGRESS.labels(method).dec()
+        route = metrics.route_label(request.scope)
+        metrics.HTTP_LATENCY.labels(method, route).observe(time.perf_counter() - started)
+        metrics.HTTP_REQUESTS.labels(method, route, str(status)).inc()
+        metrics.record_pool(engine)
+
 # CORS Middleware
 origins = [
     "http://localhost",
@@ -68,6 +132,14 @@ app.add_middleware(
 async def health_check():
     return {"status": "ok"}
 
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(metrics.require_token)])
+def prometheus_metrics(db: Session = Depends(get_db)):
+    """Prometheus scrape endpoint; see app/metrics.py. Needs METRICS_TOKEN when that is set."""
+    metrics.ONESHOT_JOBS.labels("pending").set(oneshot_queue.queue_depth(db))
+    metrics.ONESHOT_JOBS.labels("processing").set(oneshot_queue.running_count(db))
+    body, content_type = metrics.render()
+    return Response(body, media_type=content_type)
+
 @app.get("/", tags=["Health"])
 async def root():
     return {"status": "ok", "message": "DnD West Marches API"}
@@ -88,3 +160,4 @@ app.include_router(faction_router.router, prefix="/api/factions")
 app.include_router(debug_router.router, prefix="/api/debug")
 app.include_router(ship_router.router, prefix="/api/ship")
 app.include_router(ledger_router.router, prefix="/api/ledger")
+app.include_router(search_router.router, prefix="/api/search")
@@ -0,0 +1,88 @@
+"""
+Prometheus metrics, served at `/metrics`.
+
+Gunicorn runs several worker processes, each counting its own requests. When
+`PROMETHEUS_MULTIPROC_DIR` is set (gunicorn_conf.py sets it, and clears the
+directory on start), prometheus_client keeps every sample in memory-mapped
+files there and `/metrics` merges the files of all workers, so whichever
+worker answers a scrape reports the whole server. Without it (uvicorn in dev,
+tests) the in-process default registry is used.
+
+Scrapes are open unless `METRICS_TOKEN` is set; then Prometheus must send it
+as a bearer token (`authorization: {credentials: ...}` in the scrape config).
+
+Cache hit ratios are left to the query, e.g.
+    sum by (cache) (rate(cache_lookups_total{result="hit"}[5m]))
+      / sum by (cache) (rate(cache_lookups_total[5m]))
+"""
+import os
+import secrets
+from typing import Optional, Tuple
+
+from fastapi import Header, HTTPException
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+from sqlalchemy.pool import QueuePool
+
+from .config import get_settings
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route template and status code.",
+    ["method", "route", "status"],
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time until the response headers are sent, by route template.",
+    ["method", "route"],
+)
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "Requests being handled right now.",
+    ["method"], multiprocess_mode="livesum",
+)
+DB_POOL = Gauge(
+    "db_pool_connections", "SQLAlchemy connection pool: size, checked_in, checked_out and overflow.",
+    ["state"], multiprocess_mode="livesum",
+)
+ONESHOT_JOBS = Gauge(
+    "oneshot_jobs", "One-shot generation jobs waiting (pending) or running (processing), read at scrape time.",
+    ["status"], multiprocess_mode="livemostrecent",
+)
+DISCORD_LATENCY = Histogram(
+    "discord_request_duration_seconds", "Discord API calls by route template and status code (each retry counts).",
+    ["method", "route", "status"],
+)
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total", "Cache lookups by cache and result (hit, miss, or coalesced onto an in-flight miss).",
+    ["cache", "result"],
+)
+
+
+def route_label(scope) -> str:
+    """The matched route's path template, so /api/maps/1 and /api/maps/2 share a series."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def record_pool(engine) -> None:
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return  # SQLite in-memory / static pools have nothing to report
+    DB_POOL.labels("size").set(pool.size())
+    DB_POOL.labels("checked_in").set(pool.checkedin())
+    DB_POOL.labels("checked_out").set(pool.checkedout())
+    DB_POOL.labels("overflow").set(max(pool.overflow(), 0))
+
+
+def require_token(authorization: Optional[str] = Header(None)) -> None:
+    token = get_settings().METRICS_TOKEN
+    if token and not secrets.compare_digest(authorization or "", f"Bearer {token}"):
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+
+
+def render() -> Tuple[bytes, str]:
+    """The scrape body and its content type."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
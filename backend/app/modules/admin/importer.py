@@ -0,0 +1,295 @@
+"""
+Loads a campaign export (see `service.export_campaign`) into a campaign.
+
+The file is read a line at a time and rows are written in chunks of
+`IMPORT_CHUNK_SIZE`, table by table in the export's dependency order: a
+multi-row `INSERT ... RETURNING id` (SQLAlchemy's insertmanyvalues) on SQLite,
+`COPY ... FROM STDIN` with ids drawn from the table's sequence beforehand on
+Postgres. Primary keys are never reused: every row gets a new id and an
+in-memory `old id -> new id` map per table translates the foreign keys of the
+rows that follow. Foreign keys that point forward (a mission's prerequisite,
+a user's active character) are written as NULL and patched once the target
+table has loaded.
+
+Import replaces the campaign's content: everything in `CAMPAIGN_TABLES` that
+belongs to it is deleted first, except the campaign row and its users.
+Exported users are matched to existing users of the campaign by Discord id,
+so members (and the admin running the import) keep their accounts. Generation
+jobs arrive without their queue state and module file, and those that had not
+finished are marked failed. The whole import is one transaction; the caller
+commits or rolls back.
+"""
+import json
+import logging
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import JSON, Date, DateTime, Table, bindparam, delete, insert, select, text, update
+from sqlalchemy.orm import Session
+
+from ..campaigns.tables import BY_NAME, CAMPAIGN_TABLES, campaign_filter
+from ..missions import dag as mission_dag
+from ..oneshot import snapshot
+from ..oneshot.models import FINISHED_STATUSES, LLMCall
+from ..search import service as search_service
+from .service import EXPORT_FORMAT, EXPORT_VERSION
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = 1000
+
+
+class ImportFormatError(ValueError):
+    """The file is not a campaign export this version can read."""
+
+
+def _read_header(lines: Iterator[str]) -> Dict[str, Any]:
+    try:
+        header = json.loads(next(lines))
+    except (StopIteration, ValueError):
+        raise ImportFormatError("The file is empty or not NDJSON.")
+    if not isinstance(header, dict) or header.get("format") != EXPORT_FORMAT:
+        raise ImportFormatError("Not a campaign export.")
+    if header.get("version") != EXPORT_VERSION:
+        raise ImportFormatError(f"Unsupported export version {header.get('version')!r}.")
+    return header
+
+
+def _converters(table: Table, columns: List[str]) -> List[Optional[Callable[[Any], Any]]]:
+    """Per exported column: a parser back from JSON, or None for columns this schema doesn't have."""
+    out = []
+    for name in columns:
+        column = table.c.get(name)
+        if column is None:
+            out.append(None)
+        elif isinstance(column.type, DateTime):
+            out.append(lambda v: datetime.fromisoformat(v) if isinstance(v, str) else v)
+        elif isinstance(column.type, Date):
+            out.append(lambda v: date.fromisoformat(v) if isinstance(v, str) else v)
+        else:
+            out.append(lambda v: v)
+    return out
+
+
+def _reset_job(row: Dict[str, Any]) -> None:
+    """
+    A generation job's queue state and module file belong to the server that ran it:
+    a job still pending or processing there will never finish here, and its zip is
+    not on this disk (it is rebuilt on the next download).
+    """
+    if row.get("status") not in FINISHED_STATUSES:
+        row["status"] = "failed"
+    row.update(claimed_by=None, heartbeat_at=None, foundry_module_path=None)
+
+
+class _Loader:
+    def __init__(self, db: Session, campaign_id: int, chunk_size: int):
+        self.db = db
+        self.conn = db.connection()
+        self.postgres = self.conn.dialect.name == "postgresql"
+        self.campaign_id = campaign_id
+        self.chunk_size = chunk_size
+        self.ids: Dict[str, Dict[int, int]] = defaultdict(dict)  # table -> old id -> new id
+        self.fixups: List[Tuple[str, str, int, Any]] = []         # (table, column, new row id, old target id)
+        self.read: Dict[str, int] = defaultdict(int)
+        self.imported: Dict[str, int] = {}
+        self.skipped: Dict[str, int] = {}
+        self.order = {t.name: i for i, t in enumerate(CAMPAIGN_TABLES)}
+        self.existing_users: Dict[str, int] = {}
+
+    # --- Clearing the target ------------------------------------------------------
+
+    def clear(self) -> None:
+        users = BY_NAME["users"].table
+        self.conn.execute(update(users).where(users.c.campaign_id == self.campaign_id).values(active_character_id=None))
+        self.conn.execute(delete(LLMCall.__table__).where(LLMCall.__table__.c.campaign_id == self.campaign_id))
+        for scoped in reversed(CAMPAIGN_TABLES):
+            if scoped.name not in ("campaigns", "users"):
+                self.conn.execute(delete(scoped.table).where(campaign_filter(scoped.name, self.campaign_id)))
+        self.existing_users = dict(self.conn.execute(
+            select(users.c.discord_id, users.c.id).where(users.c.campaign_id == self.campaign_id)
+        ).all())
+
+    # --- Translating rows -------------------------------------------------------
+
+    def _foreign_keys(self, table: Table) -> Dict[str, str]:
+        return {fk.parent.name: fk.column.table.name for fk in table.foreign_keys}
+
+    def _translate(self, name: str, table: Table, row: Dict[str, Any]) -> Optional[List[Tuple[str, Any]]]:
+        """
+        Rewrite `row`'s foreign keys in place. Returns the forward references to
+        patch later, or None if the row points at something that was not
+        exported (it is skipped).
+        """
+        forward = []
+        for column, target in self._foreign_keys(table).items():
+            old = row.get(column)
+            if old is None:
+                continue
+            if target == "campaigns":
+                row[column] = self.campaign_id
+            elif self.order[target] >= self.order[name]:
+                # Self or forward reference: write NULL now, patch after load.
+                forward.append((column, old))
+                row[column] = None
+            elif old in self.ids[target]:
+                row[column] = self.ids[target][old]
+            elif table.c[column].nullable:
+                row[column] = None
+            else:
+                return None
+        return forward
+
+    # --- Writing chunks -----------------------------------------------------------
+
+    def _insert(self, table: Table, rows: List[Dict[str, Any]], with_ids: bool) -> List[int]:
+        if not rows:
+            return []
+        if self.postgres:
+            return self._copy(table, rows, with_ids)
+        if with_ids:
+            stmt = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+            return list(self.conn.execute(stmt, rows).scalars())
+        self.conn.execute(insert(table), rows)
+        return []
+
+    def _copy(self, table: Table, rows: List[Dict[str, Any]], with_ids: bool) -> List[int]:
+        new_ids = []
+        if with_ids:
+            new_ids = list(self.conn.execute(
+                text("SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :n)"),
+                {"table": table.name, "n": len(rows)},
+            ).scalars())
+            for row, new_id in zip(rows, new_ids):
+                row["id"] = new_id
+        columns = list(rows[0])
+        json_columns = {c for c in columns if isinstance(table.c[c].type, JSON)}
+        sql = f'COPY "{table.name}" ({", ".join(f'"{c}"' for c in columns)}) FROM STDIN'
+        raw = self.conn.connection.driver_connection  # psycopg 3; same transaction as the session
+        with raw.cursor() as cursor, cursor.copy(sql) as copy:
+            for row in rows:
+                copy.write_row([json.dumps(row[c]) if c in json_columns and row[c] is not None else row[c] for c in columns])
+        return new_ids
+
+    def load_section(self, name: str, columns: List[str], rows: Iterable[List[Any]]) -> Iterator[Dict[str, Any]]:
+        """Load one table's rows. Yields a progress dict after every chunk."""
+        scoped = BY_NAME.get(name)
+        if scoped is None:
+            raise ImportFormatError(f"Unknown table {name!r} in export.")
+        table = scoped.table
+        converters = _converters(table, columns)
+        has_id = "id" in table.c and list(table.primary_key.columns) == [table.c.id]
+        loaded = skipped = 0
+
+        chunk: List[Tuple[Optional[int], Dict[str, Any], List[Tuple[str, Any]]]] = []
+
+        def flush():
+            nonlocal loaded
+            old_ids = [old for old, _, _ in chunk]
+            values = [row for _, row, _ in chunk]
+            new_ids = self._insert(table, values, with_ids=has_id)
+            for old, new, (_, _, forward) in zip(old_ids, new_ids, chunk):
+                self.ids[name][old] = new
+                self.fixups.extend((name, column, new, target) for column, target in forward)
+            loaded += len(chunk)
+            chunk.clear()
+
+        for values in rows:
+            self.read[name] += 1
+            if name == "campaigns":
+                continue  # the target campaign keeps its own row
+            row = {c: convert(v) for c, convert, v in zip(columns, converters, values) if convert is not None}
+            old_id = row.pop("id", None) if has_id else None
+            if name == "generated_oneshots":
+                _reset_job(row)
+            forward = self._translate(name, table, row)
+            if forward is None:
+                skipped += 1
+                continue
+            if name == "users" and row.get("discord_id") in self.existing_users:
+                # Keep the account; only its references (the active character) are patched.
+                existing = self.existing_users[row["discord_id"]]
+                self.ids["users"][old_id] = existing
+                self.fixups.extend((name, column, existing, target) for column, target in forward)
+                continue
+            chunk.append((old_id, row, forward))
+            if len(chunk) >= self.chunk_size:
+                flush()
+                yield {"table": name, "rows": loaded}
+        flush()
+        self.imported[name] = loaded
+        if skipped:
+            self.skipped[name] = skipped
+        yield {"table": name, "rows": loaded}
+
+    def apply_fixups(self) -> None:
+        by_column = defaultdict(list)
+        for name, column, new_id, old_target in self.fixups:
+            target = self._foreign_keys(BY_NAME[name].table)[column]
+            if old_target in self.ids[target]:
+                by_column[(name, column)].append({"_id": new_id, "_value": self.ids[target][old_target]})
+        for (name, column), params in by_column.items():
+            table = BY_NAME[name].table
+            stmt = update(table).where(table.c.id == bindparam("_id")).values({column: bindparam("_value")})
+            self.conn.execute(stmt, params)
+
+
+def import_campaign(
+    db: Session, campaign_id: int, lines: Iterable[str], chunk_size: int = IMPORT_CHUNK_SIZE
+) -> Iterator[Dict[str, Any]]:
+    """
+    Replace the campaign's content with an export, yielding progress as it goes:
+    `{"table": ..., "rows": n}` per chunk, then `{"done": True, "imported": {...},
+    "skipped": {...}}`. Raises `ImportFormatError` for a bad or truncated file.
+    Nothing is committed; the caller commits after the last item or rolls back.
+    """
+    lines = (line for line in lines if line.strip())
+    _read_header(lines)
+
+    loader = _Loader(db, campaign_id, chunk_size)
+    loader.clear()
+
+    section: Optional[Tuple[str, List[str]]] = None
+    footer = None
+
+    def rows_until_next_section():
+        nonlocal section, footer
+        for line in lines:
+            value = json.loads(line)
+            if isinstance(value, list):
+                yield value
+            elif value.get("end"):
+                footer, section = value, None
+                return
+            else:
+                section = (value["table"], value["columns"])
+                return
+        section = None
+
+    try:
+        first = json.loads(next(lines))
+    except StopIteration:
+        raise ImportFormatError("The export is truncated: it has no end marker.")
+    if first.get("end"):
+        footer = first
+    else:
+        section = (first["table"], first["columns"])
+
+    while section is not None:
+        name, columns = section
+        yield from loader.load_section(name, columns, rows_until_next_section())
+
+    if footer is None:
+        raise ImportFormatError("The export is truncated: it has no end marker.")
+    for name, count in footer.get("counts", {}).items():
+        if loader.read[name] != count:
+            raise ImportFormatError(f"The export is truncated: {name} has {loader.read[name]} rows, the footer says {count}.")
+
+    loader.apply_fixups()
+    # Bulk writes bypass the search and snapshot flush hooks and the mission graph cache.
+    search_service.reindex_campaign(db, campaign_id)
+    snapshot.invalidate_campaign(db, campaign_id)
+    mission_dag.invalidate(campaign_id)
+    logger.info(f"Imported campaign {campaign_id}: {loader.imported}, skipped {loader.skipped}")
+    yield {"done": True, "imported": loader.imported, "skipped": loader.skipped}
@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+import io
 import json
+import logging
 
 from ...dependencies import get_db, get_current_active_admin_user
 from ..auth.schemas import User
-from . import schemas, service as crud
+from ..campaigns import clone, role_sync, schemas as campaign_schemas, service as campaign_service
+from . import importer, service as crud
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -21,18 +27,88 @@ def seed_world_data(
     return {"factions_created": factions, "missions_created": missions}
 
 
-@router.get("/export", response_model=schemas.GameDataExport, tags=["Admin"], dependencies=[Depends(get_current_active_admin_user)])
-def export_data(db: Session = Depends(get_db)):
-    return crud.export_game_data(db)
+@router.post("/clone", response_model=campaign_schemas.Campaign, tags=["Admin"])
+def clone_campaign(
+    clone_data: campaign_schemas.CampaignClone,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_admin_user),
+):
+    """
+    Copy the admin's campaign, members included, into a new campaign (a fork to
+    try a storyline in, or staging data). Log into it with `/campaigns/login`.
+    The copy gets a placeholder guild id, so it can't take over a real guild.
+    """
+    copy = clone.clone_campaign(db, current_user.campaign_id, clone_data.name)
+    db.commit()
+    db.refresh(copy)
+    return copy
+
+
+@router.post("/discord-role-sync", tags=["Admin"])
+async def sync_discord_roles(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_admin_user),
+):
+    """Re-check every campaign member's Discord roles now instead of waiting for the scheduled sync."""
+    campaign = campaign_service.get_campaign(db, current_user.campaign_id)
+    try:
+        result = await role_sync.sync_campaign(db, campaign)
+    except role_sync.GuildFetchError as e:
+        raise HTTPException(status_code=502, detail=f"Failed to fetch guild members from Discord (HTTP {e.status_code}).")
+    return result.as_dict()
+
+
+@router.get("/export", tags=["Admin"])
+def export_data(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_admin_user),
+):
+    """
+    Download the admin's campaign as NDJSON (see `service.export_campaign` for the
+    format). The body streams as rows are read, so the download starts at once.
+    """
+    campaign_id = current_user.campaign_id
+    return StreamingResponse(
+        crud.export_campaign(db, campaign_id),
+        media_type="application/x-ndjson",
+        headers={
+            "Content-Disposition": f'attachment; filename="campaign-{campaign_id}.ndjson"',
+            "Cache-Control": "no-store",
+        },
+    )
 
-@router.post("/import", tags=["Admin"], dependencies=[Depends(get_current_active_admin_user)])
-async def import_data(db: Session = Depends(get_db), file: UploadFile = File(...)):
+@router.post("/import", tags=["Admin"])
+def import_data(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_admin_user),
+):
+    """
+    Replace the admin's campaign with the contents of an `/export` file.
+
+    The upload is read line by line and loaded in one transaction. The response
+    streams NDJSON progress (`{"table": ..., "rows": n}` per chunk) and ends with
+    `{"done": true, ...}` once committed, or `{"error": ...}` after a rollback.
+    A file that isn't an export is rejected with 400 before anything is written.
+    """
+    lines = io.TextIOWrapper(file.file, encoding="utf-8")
+    progress = importer.import_campaign(db, current_user.campaign_id, lines)
     try:
-        contents = await file.read()
-        data = json.loads(contents)
-        result = crud.import_game_data(db, data)
-        return result
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=400, detail="Invalid JSON file.")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"An error occurred during import: {e}")
+        first = next(progress)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def events():
+        try:
+            yield json.dumps(first) + "\n"
+            for event in progress:
+                if event.get("done"):
+                    db.commit()
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            db.rollback()
+            logger.exception("Campaign import failed")
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
@@ -1,39 +1,50 @@
-from sqlalchemy.orm import Session, joinedload
-from ..auth import models as auth_models
-from ..characters import models as char_models
-from ..items import models as item_models
-from ..missions import models as mission_models
-from ..sessions import models as session_models
-from . import schemas
-
-def export_game_data(db: Session) -> schemas.GameDataExport:
-    users = db.query(auth_models.User).options(joinedload(auth_models.User.campaign)).all()
-    items = db.query(item_models.Item).all()
-    store_items = db.query(item_models.StoreItem).all()
-    missions = db.query(mission_models.Mission).all()
-    game_sessions = db.query(session_models.GameSession).all()
-
-    return schemas.GameDataExport(
-        users=users,
-        items=items,
-        store_items=store_items,
-        missions=missions,
-        game_sessions=game_sessions,
-    )
-
-def import_game_data(db: Session, data: schemas.GameDataExport):
-    # Wipe existing data in reverse order of dependency
-    db.execute(session_models.game_session_players.delete())
-    db.execute(mission_models.mission_players.delete())
-    db.query(item_models.InventoryItem).delete()
-    db.query(item_models.StoreItem).delete()
-    db.query(mission_models.MissionReward).delete()
-    db.query(session_models.GameSession).delete()
-    db.query(mission_models.Mission).delete()
-    db.query(item_models.Item).delete()
-    db.query(char_models.CharacterStats).delete()
-    db.query(char_models.Character).delete()
-    db.query(auth_models.User).delete()
-    db.commit()
-
-    return {"message": "Data wipe successful. Full import is not yet implemented."}
+import json
+from datetime import date, datetime, timezone
+from typing import Any, Iterator
+
+from sqlalchemy.orm import Session
+from ..campaigns.tables import CAMPAIGN_TABLES, campaign_rows
+
+EXPORT_FORMAT = "campaign-export"
+EXPORT_VERSION = 1
+EXPORT_BATCH_SIZE = 1000
+
+
+def _json_default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot export {type(value).__name__}")
+
+
+def _line(value: Any) -> str:
+    return json.dumps(value, default=_json_default, separators=(",", ":")) + "\n"
+
+
+def export_campaign(db: Session, campaign_id: int, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[str]:
+    """
+    Stream one campaign as NDJSON, a chunk of lines per batch of rows.
+
+    The first line is a header, then each table in `CAMPAIGN_TABLES` order is a
+    `{"table": ..., "columns": [...]}` line followed by one JSON array per row
+    (values in column order), and the last line is `{"end": true, "counts": {...}}`
+    so a reader can tell a complete file from a truncated one. Rows are read with
+    `yield_per`, so memory stays flat however large the campaign is.
+    """
+    yield _line({
+        "format": EXPORT_FORMAT,
+        "version": EXPORT_VERSION,
+        "campaign_id": campaign_id,
+        "exported_at": datetime.now(timezone.utc),
+        "tables": [t.name for t in CAMPAIGN_TABLES],
+    })
+    counts = {}
+    for scoped in CAMPAIGN_TABLES:
+        columns = [c.name for c in scoped.table.columns]
+        yield _line({"table": scoped.name, "columns": columns})
+        result = db.execute(campaign_rows(scoped.name, campaign_id).execution_options(yield_per=batch_size))
+        count = 0
+        for rows in result.partitions():
+            count += len(rows)
+            yield "".join(_line(list(row)) for row in rows)
+        counts[scoped.name] = count
+    yield _line({"end": True, "counts": counts})
@@ -3,9 +3,9 @@ from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from fastapi.responses import RedirectResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
-import httpx
 from typing import Optional
 from ...config import get_settings
+from ...discord_client import discord_client
 
 from ... import security
 from ...dependencies import get_db, get_current_user, get_current_user_global
@@ -149,18 +149,13 @@ async def discord_callback(code: str, request: Request, response: Response, stat
     logger.info("Discord OAuth callback received", extra={"code_present": bool(code)})
 
     # Exchange code for token
-    async with httpx.AsyncClient() as client:
-        token_response = await client.post(
-            "https://discord.com/api/oauth2/token",
-            data={
-                "client_id": settings.DISCORD_CLIENT_ID,
-                "client_secret": settings.DISCORD_CLIENT_SECRET,
-                "grant_type": "authorization_code",
-                "code": code,
-                "redirect_uri": settings.DISCORD_REDIRECT_URI,
-            },
-            headers={"Content-Type": "application/x-www-form-urlencoded"},
-        )
+    token_response = await discord_client.exchange_code({
+        "client_id": settings.DISCORD_CLIENT_ID,
+        "client_secret": settings.DISCORD_CLIENT_SECRET,
+        "grant_type": "authorization_code",
+        "code": code,
+        "redirect_uri": settings.DISCORD_REDIRECT_URI,
+    })
 
     if token_response.status_code != 200:
         logger.error(
@@ -180,11 +175,7 @@ async def discord_callback(code: str, request: Request, response: Response, stat
     logger.info("Discord token exchange succeeded")
 
     # Get User Info
-    async with httpx.AsyncClient() as client:
-        user_response = await client.get(
-            "https://discord.com/api/users/@me",
-            headers={"Authorization": f"Bearer {access_token}"},
-        )
+    user_response = await discord_client.get_current_user(access_token)
 
     if user_response.status_code != 200:
         logger.error(
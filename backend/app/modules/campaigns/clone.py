@@ -0,0 +1,176 @@
+"""
+Copies a campaign and everything in it to a new campaign, for staging data or
+for a DM to try out a storyline without touching the real one.
+
+The copy is set-based: one `INSERT INTO t (...) SELECT ... FROM t WHERE <in
+source campaign>` per table in `CAMPAIGN_TABLES`, with no rows passing through
+Python. Ids are remapped by a fixed offset per table, chosen before anything
+is written so that every copied id lands above the table's current maximum:
+
+    new id = old id + offset[t]      offset[t] = max(t.id) - min(source t.id) + 1
+
+Because every offset is known up front, a foreign key into another copied
+table is just `fk + offset[target]`. References that point at a table copied
+later, or at the same table (a user's active character, a mission's
+prerequisite), are inserted as NULL and filled in by one `UPDATE` per column
+at the end, so no foreign key ever points at a row that doesn't exist yet.
+
+On Postgres the copied tables are locked against writes for the transaction
+(ids are chosen by hand, so nothing may draw from the sequences meanwhile) and
+each sequence is moved past the new maximum afterwards.
+
+Search documents are copied the same way (their text doesn't depend on ids)
+rather than rebuilt, which would cost a round trip per indexed row.
+
+Ids stored inside JSON columns (generated adventure content, for instance)
+are copied verbatim. Generation jobs are copied without their queue state and
+module file (see `_OVERRIDES`).
+"""
+import logging
+import uuid
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import ColumnElement, Table, case, func, insert, literal, null, select, text, update
+from sqlalchemy.orm import Session
+
+from ..oneshot import snapshot
+from ..oneshot.models import FINISHED_STATUSES
+from ..search.indexer import INDEXED
+from ..search.models import SearchDocument
+from . import models
+from .tables import CAMPAIGN_TABLES, campaign_filter
+
+logger = logging.getLogger(__name__)
+
+_COPIED = [t for t in CAMPAIGN_TABLES if t.name != "campaigns"]
+
+
+def _job_overrides(table: Table) -> Dict[str, ColumnElement]:
+    # A copied job that was still pending or processing would be picked up (or
+    # counted as running) a second time, and the module zip belongs to the
+    # source job; the copy's is rebuilt on its first download.
+    return {
+        "status": case((table.c.status.in_(FINISHED_STATUSES), table.c.status), else_=literal("failed")),
+        "claimed_by": null(),
+        "heartbeat_at": null(),
+        "foundry_module_path": null(),
+    }
+
+
+# table -> column name -> the value to copy instead of the source column
+_OVERRIDES: Dict[str, Callable[[Table], Dict[str, ColumnElement]]] = {
+    "generated_oneshots": _job_overrides,
+}
+
+
+def _has_id(table: Table) -> bool:
+    return list(table.primary_key.columns) == [table.c.get("id")]
+
+
+def _offsets(db: Session, source_id: int) -> Dict[str, int]:
+    offsets = {}
+    for scoped in _COPIED:
+        table = scoped.table
+        if not _has_id(table):
+            continue
+        source_min = select(func.min(table.c.id)).where(campaign_filter(scoped.name, source_id)).scalar_subquery()
+        offset = db.execute(select(func.max(table.c.id) - source_min + 1)).scalar()
+        offsets[scoped.name] = offset or 0  # NULL when the campaign has no rows here
+    return offsets
+
+
+def _copy_search_documents(conn, source_id: int, clone_id: int, offsets: Dict[str, int]) -> None:
+    docs = SearchDocument.__table__
+    shift = {
+        source_type: offsets[model.__tablename__]
+        for model, (source_types, _, _) in INDEXED.items()
+        for source_type in source_types
+    }
+    columns = ["campaign_id", "source_type", "source_id", "title", "body", "visibility", "updated_at"]
+    conn.execute(insert(docs).from_select(columns, select(
+        literal(clone_id),
+        docs.c.source_type,
+        docs.c.source_id + case(shift, value=docs.c.source_type, else_=0),
+        docs.c.title,
+        docs.c.body,
+        docs.c.visibility,
+        docs.c.updated_at,
+    ).where(docs.c.campaign_id == source_id)))
+
+
+def clone_campaign(db: Session, source_id: int, name: str) -> models.Campaign:
+    """
+    Copy campaign `source_id` into a new campaign and return it. Users are
+    copied too, so the source's members can log into the copy straight away.
+    The copy's guild id is a placeholder, as guild ids are unique and binding
+    a real guild is `/setup`'s job; Discord role sync skips a campaign whose
+    guild can't be fetched. The caller commits.
+    """
+    source = db.get(models.Campaign, source_id)
+    if source is None:
+        raise ValueError(f"Campaign {source_id} does not exist.")
+
+    conn = db.connection()
+    postgres = conn.dialect.name == "postgresql"
+    if postgres:
+        names = ", ".join(f'"{t.name}"' for t in _COPIED)
+        conn.execute(text(f"LOCK TABLE {names} IN EXCLUSIVE MODE"))
+
+    clone = models.Campaign(
+        name=name,
+        discord_guild_id=f"{source.discord_guild_id}:clone-{uuid.uuid4().hex[:8]}",
+        dm_role_id=source.dm_role_id,
+        player_role_id=source.player_role_id,
+    )
+    db.add(clone)
+    db.flush()
+
+    offsets = _offsets(db, source_id)
+    order = {t.name: i for i, t in enumerate(CAMPAIGN_TABLES)}
+    deferred: List[Tuple[Table, str, str]] = []  # (table, fk column, target table)
+
+    for scoped in _COPIED:
+        table = scoped.table
+        targets = {fk.parent.name: fk.column.table.name for fk in table.foreign_keys}
+        overrides = _OVERRIDES[scoped.name](table) if scoped.name in _OVERRIDES else {}
+        columns = []
+        for column in table.c:
+            target = targets.get(column.name)
+            if column.name in overrides:
+                columns.append(overrides[column.name])
+            elif column.name == "id" and scoped.name in offsets:
+                columns.append(column + offsets[scoped.name])
+            elif target == "campaigns":
+                columns.append(literal(clone.id))
+            elif target in offsets and order[target] >= order[scoped.name]:
+                deferred.append((table, column.name, target))
+                columns.append(null())
+            elif target in offsets:
+                columns.append(column + offsets[target])
+            else:
+                columns.append(column)
+        conn.execute(insert(table).from_select(
+            [c.name for c in table.c],
+            select(*columns).where(campaign_filter(scoped.name, source_id)),
+        ))
+
+    for table, column, target in deferred:
+        offset = offsets[table.name]
+        original = table.alias("original")
+        conn.execute(
+            update(table)
+            .where(campaign_filter(table.name, clone.id))
+            .values({column: select(original.c[column] + offsets[target])
+                     .where(original.c.id == table.c.id - offset)
+                     .scalar_subquery()})
+        )
+
+    if postgres:
+        for name in offsets:
+            conn.execute(text(f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), (SELECT max(id) FROM \"{name}\"))"))
+
+    # INSERT ... SELECT bypasses the search and snapshot flush hooks.
+    _copy_search_documents(conn, source_id, clone.id, offsets)
+    snapshot.invalidate_campaign(db, clone.id)
+    logger.info(f"Cloned campaign {source_id} into campaign {clone.id}")
+    return clone
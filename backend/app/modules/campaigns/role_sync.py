@@ -0,0 +1,200 @@
+"""
+Background re-check of campaign members' Discord roles.
+
+`join_campaign` only looks at a user's roles once. This job pages through each
+campaign guild's member list (1000 members per request instead of one request
+per user), works out what every campaign user's role should be, and applies
+the differences with one UPDATE per (role, is_active) outcome.
+
+Users who left the guild or lost both campaign roles are deactivated rather
+than deleted so their characters and history survive a rejoin. Discord IDs in
+ADMIN_DISCORD_IDS are never touched.
+"""
+import asyncio
+import logging
+import random
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ...config import get_settings
+from ...database import SessionLocal
+from ...discord_client import DiscordClient, discord_client
+from ..auth import models as auth_models
+from . import models
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 1000
+_UPDATE_CHUNK = 500
+# pg_try_advisory_lock key so only one gunicorn worker runs a sync at a time.
+_ADVISORY_LOCK_KEY = 0x524F4C45
+
+
+class GuildFetchError(Exception):
+    def __init__(self, guild_id: str, status_code: int):
+        super().__init__(f"Fetching members of guild {guild_id} failed with HTTP {status_code}")
+        self.guild_id = guild_id
+        self.status_code = status_code
+
+
+@dataclass
+class SyncResult:
+    campaign_id: int
+    members_seen: int = 0
+    role_changed: int = 0
+    deactivated: int = 0
+    reactivated: int = 0
+    skipped: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def role_for(campaign: models.Campaign, roles: List[str]) -> Optional[str]:
+    """Map a member's Discord role ids to an app role, or None if they hold neither."""
+    if campaign.dm_role_id and campaign.dm_role_id in roles:
+        return "admin"
+    if campaign.player_role_id and campaign.player_role_id in roles:
+        return "player"
+    return None
+
+
+async def fetch_member_roles(client: DiscordClient, guild_id: str) -> Dict[str, List[str]]:
+    """Return {discord user id: role ids} for every member of the guild."""
+    member_roles: Dict[str, List[str]] = {}
+    after = "0"
+    while True:
+        response = await client.list_guild_members(guild_id, limit=PAGE_SIZE, after=after)
+        if response.status_code != 200:
+            raise GuildFetchError(guild_id, response.status_code)
+        page = response.json()
+        for member in page:
+            member_roles[member["user"]["id"]] = member.get("roles", [])
+        if len(page) < PAGE_SIZE:
+            return member_roles
+        after = page[-1]["user"]["id"]
+
+
+def apply_member_roles(db: Session, campaign: models.Campaign, member_roles: Dict[str, List[str]]) -> SyncResult:
+    settings = get_settings()
+    protected = {i.strip() for i in settings.ADMIN_DISCORD_IDS.split(",") if i.strip()}
+    result = SyncResult(campaign_id=campaign.id, members_seen=len(member_roles))
+
+    users = db.query(
+        auth_models.User.id,
+        auth_models.User.discord_id,
+        auth_models.User.role,
+        auth_models.User.is_active,
+    ).filter(auth_models.User.campaign_id == campaign.id).all()
+
+    updates: Dict[Tuple[str, bool], List[int]] = defaultdict(list)
+    for user in users:
+        if user.discord_id in protected:
+            continue
+        is_active = bool(user.is_active)
+        if user.discord_id not in member_roles:
+            wanted = (user.role, False)
+        else:
+            role = role_for(campaign, member_roles[user.discord_id])
+            if role is None and user.role == "admin" and not campaign.dm_role_id:
+                # No DM role configured, so there is nothing to judge a DM against.
+                continue
+            wanted = (user.role, False) if role is None else (role, True)
+        if wanted == (user.role, is_active):
+            continue
+
+        updates[wanted].append(user.id)
+        if wanted[0] != user.role:
+            result.role_changed += 1
+        if wanted[1] != is_active:
+            if wanted[1]:
+                result.reactivated += 1
+            else:
+                result.deactivated += 1
+
+    for (role, active), user_ids in updates.items():
+        for start in range(0, len(user_ids), _UPDATE_CHUNK):
+            chunk = user_ids[start:start + _UPDATE_CHUNK]
+            db.query(auth_models.User).filter(auth_models.User.id.in_(chunk)).update(
+                {auth_models.User.role: role, auth_models.User.is_active: active},
+                synchronize_session=False,
+            )
+    db.commit()
+    return result
+
+
+async def sync_campaign(db: Session, campaign: models.Campaign, client: Optional[DiscordClient] = None) -> SyncResult:
+    if not campaign.dm_role_id and not campaign.player_role_id:
+        return SyncResult(campaign_id=campaign.id, skipped="no roles configured")
+    member_roles = await fetch_member_roles(client or discord_client, campaign.discord_guild_id)
+    result = apply_member_roles(db, campaign, member_roles)
+    logger.info("Discord role sync finished", extra=result.as_dict())
+    return result
+
+
+async def sync_all_campaigns(client: Optional[DiscordClient] = None) -> List[SyncResult]:
+    db = SessionLocal()
+    lock_conn = None
+    try:
+        bind = db.get_bind()
+        if bind.dialect.name == "postgresql":
+            # Session-level lock on a dedicated connection, held across the per-campaign commits.
+            lock_conn = bind.connect()
+            if not lock_conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": _ADVISORY_LOCK_KEY}).scalar():
+                logger.info("Discord role sync already running in another worker")
+                return []
+
+        results = []
+        for campaign in db.query(models.Campaign).order_by(models.Campaign.id).all():
+            try:
+                results.append(await sync_campaign(db, campaign, client))
+            except GuildFetchError as e:
+                db.rollback()
+                logger.warning("Discord role sync skipped campaign", extra={"campaign_id": campaign.id, "error": str(e)})
+        return results
+    finally:
+        if lock_conn is not None:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": _ADVISORY_LOCK_KEY})
+            lock_conn.close()
+        db.close()
+
+
+# --- Scheduler ------------------------------------------------------------------
+
+_task: Optional[asyncio.Task] = None
+
+
+async def _run_forever(interval: float) -> None:
+    while True:
+        # Jitter spreads the first run of each gunicorn worker so they don't all race for the lock.
+        await asyncio.sleep(interval + random.uniform(0, interval * 0.1))
+        try:
+            await sync_all_campaigns()
+        except Exception:
+            logger.exception("Discord role sync failed")
+
+
+def start_scheduler() -> Optional[asyncio.Task]:
+    """Start the periodic sync on the running loop. No-op without a bot token or with the interval at 0."""
+    global _task
+    settings = get_settings()
+    if settings.DISCORD_ROLE_SYNC_INTERVAL <= 0 or not settings.DISCORD_BOT_TOKEN:
+        return None
+    if _task is None or _task.done():
+        _task = asyncio.create_task(_run_forever(settings.DISCORD_ROLE_SYNC_INTERVAL))
+    return _task
+
+
+async def stop_scheduler() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
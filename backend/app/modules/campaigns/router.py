@@ -1,15 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body
 from sqlalchemy.orm import Session
 from typing import List
-import httpx
 import logging
 
 from ...database import get_db
 from ...config import get_settings
 from ... import security
 from ...dependencies import get_current_user_global
+from ...discord_cache import discord_cache
 
-from . import schemas, service as crud
+from . import role_sync, schemas, service as crud
 from ..auth import service as auth_crud
 from ..auth import schemas as auth_schemas
 
@@ -72,12 +72,10 @@ async def get_available_campaigns(
     BUT has not joined in the app yet.
     Requires the client to pass the `discord_token` received during login.
     """
-    # 1. Fetch user's guilds from Discord
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            "https://discord.com/api/users/@me/guilds",
-            headers={"Authorization": f"Bearer {discord_token}"}
-        )
+    discord_id = current_user_payload.get("sub")
+
+    # 1. Fetch user's guilds from Discord (cached briefly per user)
+    response = await discord_cache.get_user_guilds(discord_id, discord_token)
 
     if response.status_code != 200:
         raise HTTPException(status_code=400, detail="Failed to fetch guilds from Discord")
@@ -89,7 +87,6 @@ async def get_available_campaigns(
     potential_campaigns = crud.get_campaigns_by_guild_ids(db, user_guild_ids)
 
     # 3. Filter out campaigns the user has already joined
-    discord_id = current_user_payload.get("sub")
     from ..auth import models as auth_models
     existing_memberships = db.query(auth_models.User).filter(auth_models.User.discord_id == discord_id).all()
     joined_campaign_ids = {u.campaign_id for u in existing_memberships}
@@ -116,14 +113,10 @@ async def join_campaign(
         raise HTTPException(status_code=404, detail="Campaign not found")
 
     # Check Discord Membership and Roles
-    async with httpx.AsyncClient() as client:
-        # We need the user's member object from the guild
-        # Note: We can only do this if the BOT is in the guild.
-        # We use the BOT TOKEN here, not the user's token.
-        member_response = await client.get(
-            f"https://discord.com/api/guilds/{campaign.discord_guild_id}/members/{discord_id}",
-            headers={"Authorization": f"Bot {settings.DISCORD_BOT_TOKEN}"}
-        )
+    # We need the user's member object from the guild
+    # Note: We can only do this if the BOT is in the guild.
+    # The client uses the BOT TOKEN here, not the user's token.
+    member_response = await discord_cache.get_guild_member(campaign.discord_guild_id, discord_id)
 
     if member_response.status_code == 404:
         raise HTTPException(status_code=403, detail="You are not a member of this Discord server.")
@@ -134,16 +127,14 @@ async def join_campaign(
     roles = member_data.get("roles", [])
 
     # Determine App Role
-    app_role = None
-    if campaign.dm_role_id and campaign.dm_role_id in roles:
-        app_role = "admin"
-    elif campaign.player_role_id and campaign.player_role_id in roles:
-        app_role = "player"
+    app_role = role_sync.role_for(campaign, roles)
 
     # If no specific roles set, maybe allow anyone?
     # The requirement said: "if it matches an established dm server we check their roles if they are a player or a dm."
     # Implies we ONLY allow if they match.
     if not app_role:
+         # Don't keep serving the role-less member object once the DM fixes their roles.
+         discord_cache.invalidate_member(campaign.discord_guild_id, discord_id)
          raise HTTPException(status_code=403, detail="You do not have the required Player or DM role in this server.")
 
     # Create User Record
@@ -228,12 +219,7 @@ async def get_admin_discord_guilds(
         logger.warning(f"Unauthorized admin guilds view attempt by discord_id: {discord_id}. Allowed admins: {allowed_admins}")
         raise HTTPException(status_code=403, detail="You are not authorized to view admin guilds.")
 
-    async with httpx.AsyncClient() as client:
-        # Use httpx to make Discord API calls
-        response = await client.get(
-            "https://discord.com/api/users/@me/guilds",
-            headers={"Authorization": f"Bearer {discord_token}"}
-        )
+    response = await discord_cache.get_user_guilds(discord_id, discord_token)
 
     if response.status_code != 200:
         raise HTTPException(status_code=400, detail="Failed to fetch guilds.")
@@ -17,6 +17,9 @@ class Campaign(CampaignBase):
     class Config:
         from_attributes = True
 
+class CampaignClone(BaseModel):
+    name: str
+
 class CampaignJoin(BaseModel):
     discord_guild_id: str
     discord_access_token: str # Needed to verify membership via Discord API
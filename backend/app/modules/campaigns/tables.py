@@ -0,0 +1,77 @@
+"""
+The tables that make up one campaign's data, and how to select its rows.
+
+`CAMPAIGN_TABLES` lists every campaign-scoped table in dependency order (a
+table comes after the tables its foreign keys point at, except for the
+users <-> characters cycle and self-references, which readers of the list
+must patch up after the fact). Each entry names the column that ties a row to
+the campaign, either directly (`campaign_id`) or through a parent table in the
+list, so `campaign_rows(name, campaign_id)` can build the WHERE clause for any
+of them as nested `IN (SELECT id ...)` subqueries.
+
+Derived tables are left out on purpose: `search_documents` and
+`campaign_context_sections` are rebuilt from the rows here, and `llm_calls`
+is telemetry.
+"""
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from sqlalchemy import Table, select
+
+from ... import all_models  # noqa: F401  (registers every table on Base.metadata)
+from ...database import Base
+
+
+@dataclass(frozen=True)
+class ScopedTable:
+    name: str
+    column: str                   # column that ties a row to the campaign
+    parent: Optional[str] = None  # table `column` points at; None = `column` holds the campaign id
+
+    @property
+    def table(self) -> Table:
+        return Base.metadata.tables[self.name]
+
+
+CAMPAIGN_TABLES = [
+    ScopedTable("campaigns", "id"),
+    ScopedTable("users", "campaign_id"),
+    ScopedTable("characters", "campaign_id"),
+    ScopedTable("character_stats", "character_id", "characters"),
+    ScopedTable("items", "campaign_id"),
+    ScopedTable("store_items", "item_id", "items"),
+    ScopedTable("inventory_items", "character_id", "characters"),
+    ScopedTable("generated_oneshots", "campaign_id"),
+    ScopedTable("missions", "campaign_id"),
+    ScopedTable("mission_rewards", "mission_id", "missions"),
+    ScopedTable("mission_players", "mission_id", "missions"),
+    ScopedTable("game_sessions", "campaign_id"),
+    ScopedTable("game_session_players", "session_id", "game_sessions"),
+    ScopedTable("session_proposals", "session_id", "game_sessions"),
+    ScopedTable("proposal_backers", "proposal_id", "session_proposals"),
+    ScopedTable("ships", "campaign_id"),
+    ScopedTable("ledger_entries", "campaign_id"),
+    ScopedTable("faction_reputations", "campaign_id"),
+    ScopedTable("faction_reputation_events", "reputation_id", "faction_reputations"),
+    ScopedTable("hex_maps", "campaign_id"),
+    ScopedTable("hexes", "map_id", "hex_maps"),
+    ScopedTable("hex_notes", "hex_id", "hexes"),
+]
+
+BY_NAME: Dict[str, ScopedTable] = {t.name: t for t in CAMPAIGN_TABLES}
+
+
+def campaign_filter(name: str, campaign_id: int):
+    """WHERE clause selecting the rows of table `name` that belong to the campaign."""
+    scoped = BY_NAME[name]
+    column = scoped.table.c[scoped.column]
+    if scoped.parent is None:
+        return column == campaign_id
+    parent = BY_NAME[scoped.parent].table
+    return column.in_(select(parent.c.id).where(campaign_filter(scoped.parent, campaign_id)))
+
+
+def campaign_rows(name: str, campaign_id: int):
+    """SELECT of every column of table `name` for the campaign, in primary key order."""
+    table = BY_NAME[name].table
+    return select(table).where(campaign_filter(name, campaign_id)).order_by(*table.primary_key.columns)
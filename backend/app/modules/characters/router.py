@@ -69,7 +69,12 @@ def read_my_characters(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    return db.query(models.Character).filter(models.Character.owner_id == current_user.id).all()
+    return (
+        db.query(models.Character)
+        .options(*crud.WITH_SESSIONS)
+        .filter(models.Character.owner_id == current_user.id)
+        .all()
+    )
 
 @router.get("/{character_id}", response_model=schemas.Character)
 def read_character(character_id: int, db: Session = Depends(get_db)):
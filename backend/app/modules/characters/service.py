@@ -1,8 +1,16 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from . import models, schemas
+from ..sessions.models import GameSession
+
+# A Character response nests its sessions with their reports and players; load them
+# with the character rather than one lazy SELECT per session.
+WITH_SESSIONS = (
+    selectinload(models.Character.game_sessions).undefer_group("reports"),
+    selectinload(models.Character.game_sessions).selectinload(GameSession.players),
+)
 
 def get_character(db: Session, character_id: int):
-    return db.query(models.Character).filter(models.Character.id == character_id).first()
+    return db.query(models.Character).options(*WITH_SESSIONS).filter(models.Character.id == character_id).first()
 
 def update_character(db: Session, character_id: int, character: schemas.CharacterCreate):
     db_character = get_character(db, character_id)
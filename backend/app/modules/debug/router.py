@@ -7,12 +7,13 @@ If DEBUG_TOKEN is not set, all endpoints return 404 (hidden).
 Usage:
     curl -H "X-Debug-Token: <your-token>" http://localhost:8000/api/debug/config
     curl -H "X-Debug-Token: <your-token>" http://localhost:8000/api/debug/health
+    curl -H "X-Debug-Token: <your-token>" http://localhost:8000/api/debug/caches
+    curl -H "X-Debug-Token: <your-token>" http://localhost:8000/api/debug/llm-providers
     curl -X POST -H "X-Debug-Token: <your-token>" -H "Content-Type: application/json" \\
          -d '{"token": "<jwt>"}' http://localhost:8000/api/debug/auth-trace
 """
 import re
 import logging
-import httpx
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Header
 from pydantic import BaseModel
@@ -23,6 +24,9 @@ from jose.exceptions import ExpiredSignatureError
 
 from ...config import get_settings
 from ...dependencies import get_db
+from ...discord_client import discord_client
+from ...discord_cache import discord_cache
+from ...llm_service import llm_service
 from ...modules.auth import models as auth_models
 
 logger = logging.getLogger("app.debug")
@@ -83,11 +87,10 @@ async def debug_health(db: Session = Depends(get_db)):
     discord_ok = False
     discord_error = None
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            r = await client.get("https://discord.com/api/v10/gateway")
-            discord_ok = r.status_code == 200
-            if not discord_ok:
-                discord_error = f"HTTP {r.status_code}"
+        r = await discord_client.get_gateway()
+        discord_ok = r.status_code == 200
+        if not discord_ok:
+            discord_error = f"HTTP {r.status_code}"
     except Exception as exc:
         discord_error = str(exc)
         logger.error("Debug health: Discord API unreachable", extra={"error": discord_error})
@@ -98,6 +101,28 @@ async def debug_health(db: Session = Depends(get_db)):
     }
 
 
+@router.get("/caches", dependencies=[Depends(require_debug_token)])
+async def debug_caches():
+    """
+    Hit/miss counters for this worker process's Discord lookup cache and the
+    LLM response cache. Counters are per process and reset on restart.
+    """
+    llm_cache = llm_service.response_cache
+    return {
+        "discord": discord_cache.stats(),
+        "llm_responses": llm_cache.stats() if llm_cache is not None else None,
+    }
+
+
+@router.get("/llm-providers", dependencies=[Depends(require_debug_token)])
+async def debug_llm_providers():
+    """
+    This worker process's LLM providers in fallback order, with circuit breaker
+    state and the recent time-to-first-byte p95 that drives request hedging.
+    """
+    return llm_service.provider_status()
+
+
 class AuthTraceRequest(BaseModel):
     token: str
 
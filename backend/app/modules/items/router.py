@@ -20,12 +20,24 @@ def create_item(
 def read_items(
     skip: int = 0,
     limit: int = 100,
+    cursor: int = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    items = crud.get_items(db, campaign_id=current_user.campaign_id, skip=skip, limit=limit)
+    items = crud.get_items(db, campaign_id=current_user.campaign_id, skip=skip, limit=limit, cursor=cursor)
     return items
 
+@router.get("/summary", response_model=schemas.ItemSummaryPage, tags=["Items"])
+def read_item_summaries(
+    cursor: int = None,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Keyset-paginated item ids and names, for pickers and catalogs; use GET /items/{id} for the description."""
+    items, next_cursor = crud.get_item_summaries(db, campaign_id=current_user.campaign_id, cursor=cursor, limit=limit)
+    return {"items": items, "next_cursor": next_cursor}
+
 @router.get("/{item_id}", response_model=schemas.Item, tags=["Items"])
 def read_item(
     item_id: int,
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional
+from ...pagination import Page
 
 # Item Schemas
 class ItemBase(BaseModel):
@@ -14,6 +15,14 @@ class Item(ItemBase):
     class Config:
         from_attributes = True
 
+class ItemSummary(BaseModel):
+    id: int
+    name: str
+    class Config:
+        from_attributes = True
+
+ItemSummaryPage = Page[ItemSummary]
+
 # InventoryItem Schemas
 class InventoryItemBase(BaseModel):
     quantity: int
@@ -40,3 +49,12 @@ class StoreItem(StoreItemBase):
     item: Item
     class Config:
         from_attributes = True
+
+class StoreItemSummary(StoreItemBase):
+    id: int
+    item_id: int
+    name: str
+    class Config:
+        from_attributes = True
+
+StoreItemSummaryPage = Page[StoreItemSummary]
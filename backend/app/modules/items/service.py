@@ -1,13 +1,23 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager
 from . import models, schemas
 from ..characters.models import Character
+from ...pagination import keyset
 
 # Item CRUD
 def get_item(db: Session, item_id: int):
     return db.query(models.Item).filter(models.Item.id == item_id).first()
 
-def get_items(db: Session, campaign_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Item).filter(models.Item.campaign_id == campaign_id).offset(skip).limit(limit).all()
+def get_items(db: Session, campaign_id: int, skip: int = 0, limit: int = 100, cursor: int = None):
+    query = db.query(models.Item).filter(models.Item.campaign_id == campaign_id)
+    if cursor is not None:
+        items, _ = keyset(query, models.Item.id, cursor=cursor, limit=limit)
+        return items
+    return query.order_by(models.Item.id).offset(skip).limit(limit).all()
+
+def get_item_summaries(db: Session, campaign_id: int, cursor: int = None, limit: int = 100):
+    """Item ids and names only; the description comes from GET /items/{id}."""
+    query = db.query(models.Item.id, models.Item.name).filter(models.Item.campaign_id == campaign_id)
+    return keyset(query, models.Item.id, cursor=cursor, limit=limit)
 
 def create_item(db: Session, item: schemas.ItemCreate, campaign_id: int):
     db_item = models.Item(**item.model_dump(), campaign_id=campaign_id)
@@ -101,8 +111,25 @@ def remove_item_from_inventory(db: Session, inventory_item_id: int, quantity: in
 def get_store_item(db: Session, store_item_id: int):
     return db.query(models.StoreItem).filter(models.StoreItem.id == store_item_id).first()
 
-def get_store_items_by_campaign(db: Session, campaign_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.StoreItem).join(models.Item).filter(models.Item.campaign_id == campaign_id).offset(skip).limit(limit).all()
+def get_store_items_by_campaign(db: Session, campaign_id: int, skip: int = 0, limit: int = 100, cursor: int = None):
+    query = db.query(models.StoreItem).join(models.Item).options(
+        contains_eager(models.StoreItem.item)
+    ).filter(models.Item.campaign_id == campaign_id)
+    if cursor is not None:
+        store_items, _ = keyset(query, models.StoreItem.id, cursor=cursor, limit=limit)
+        return store_items
+    return query.order_by(models.StoreItem.id).offset(skip).limit(limit).all()
+
+def get_store_item_summaries(db: Session, campaign_id: int, cursor: int = None, limit: int = 100):
+    """Flat store listing selected straight from the join, without building Item objects."""
+    query = db.query(
+        models.StoreItem.id,
+        models.StoreItem.item_id,
+        models.Item.name,
+        models.StoreItem.price,
+        models.StoreItem.quantity_available,
+    ).join(models.Item).filter(models.Item.campaign_id == campaign_id)
+    return keyset(query, models.StoreItem.id, cursor=cursor, limit=limit)
 
 def create_store_item(db: Session, store_item: schemas.StoreItemCreate):
     # StoreItem just links to Item. Validation should ensure Item belongs to correct campaign?
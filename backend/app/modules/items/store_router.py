@@ -25,12 +25,28 @@ def create_store_item(
 def read_store_items(
     skip: int = 0,
     limit: int = 100,
+    cursor: int = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    store_items = crud.get_store_items_by_campaign(db, campaign_id=current_user.campaign_id, skip=skip, limit=limit)
+    store_items = crud.get_store_items_by_campaign(
+        db, campaign_id=current_user.campaign_id, skip=skip, limit=limit, cursor=cursor
+    )
     return store_items
 
+@router.get("/items/summary", response_model=schemas.StoreItemSummaryPage, tags=["Store"])
+def read_store_item_summaries(
+    cursor: int = None,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Keyset-paginated store listing with the item name inlined instead of a nested Item."""
+    store_items, next_cursor = crud.get_store_item_summaries(
+        db, campaign_id=current_user.campaign_id, cursor=cursor, limit=limit
+    )
+    return {"items": store_items, "next_cursor": next_cursor}
+
 @router.get("/items/{store_item_id}", response_model=schemas.StoreItem, tags=["Store"])
 def read_store_item(
     store_item_id: int,
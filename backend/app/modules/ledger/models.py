@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime, timezone
 from ...database import Base
 
@@ -20,7 +20,7 @@ class LedgerEntry(Base):
     essence_delta = Column(Integer, default=0, nullable=False)
 
     # Ship state snapshot at time of entry: {"level": 1, "essence": 42}
-    ship_snapshot = Column(JSON, nullable=True)
+    ship_snapshot = deferred(Column(JSON, nullable=True))
 
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
 
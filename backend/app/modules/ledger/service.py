@@ -1,4 +1,4 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 from sqlalchemy import desc
 from typing import Optional, List
 
@@ -35,7 +35,8 @@ def get_entries(
     limit: int = 50,
     offset: int = 0,
 ) -> List[models.LedgerEntry]:
-    q = db.query(models.LedgerEntry).filter(models.LedgerEntry.campaign_id == campaign_id)
+    q = db.query(models.LedgerEntry).options(undefer(models.LedgerEntry.ship_snapshot))\
+        .filter(models.LedgerEntry.campaign_id == campaign_id)
     if event_type:
         q = q.filter(models.LedgerEntry.event_type == event_type)
     if session_id:
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, UniqueConstraint, JSON
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, UniqueConstraint, DateTime, Index
 from sqlalchemy.orm import relationship
+from datetime import datetime, timezone
 from ...database import Base
 
 HEX_STATE_HOURS: dict = {
@@ -42,7 +43,7 @@ class Hex(Base):
     notes = Column(String, nullable=True) # DM Notes
     hex_state = Column(String, default="wilderness")  # claimed_developed | friendly | wilderness | contested | awakened
     controlling_faction = Column(String, nullable=True)  # Collegium | Limes
-    player_notes = Column(JSON, default=list)
+    note_count = Column(Integer, default=0, server_default="0", nullable=False)  # len(player_notes), kept by add_player_note
 
     @property
     def hours_to_cross(self):
@@ -55,7 +56,30 @@ class Hex(Base):
     # Relationships
     map = relationship("HexMap", back_populates="hexes")
     linked_mission = relationship("Mission")
+    player_notes = relationship(
+        "HexNote", back_populates="hex", order_by="HexNote.id",
+        cascade="all, delete-orphan", passive_deletes=True,
+    )
 
     __table_args__ = (
         UniqueConstraint('map_id', 'q', 'r', name='unique_hex_coord'),
     )
+
+
+class HexNote(Base):
+    """A player's note on a discovered hex. Append-only; read a page at a time."""
+    __tablename__ = "hex_notes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    hex_id = Column(Integer, ForeignKey("hexes.id", ondelete="CASCADE"), nullable=False)
+    author_character_id = Column(Integer, ForeignKey("characters.id", ondelete="SET NULL"), nullable=True)
+    session_id = Column(Integer, ForeignKey("game_sessions.id", ondelete="SET NULL"), nullable=True)
+    text = Column(String, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    hex = relationship("Hex", back_populates="player_notes")
+
+    __table_args__ = (
+        # get_player_notes pages by id within a hex
+        Index("ix_hex_notes_hex_id_id", "hex_id", "id"),
+    )
@@ -55,13 +55,13 @@ def update_hex(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_admin_user)
 ):
-    db_map = crud.get_map(db, map_id=map_id)
+    db_map = crud.get_map(db, map_id=map_id, with_hexes=False)
     if not db_map or db_map.campaign_id != current_user.campaign_id:
         raise HTTPException(status_code=404, detail="Map not found")
         
     return crud.update_hex(db, map_id=map_id, q=q, r=r, hex_update=hex_update)
 
-@router.post("/{map_id}/hexes/{q}/{r}/notes", response_model=schemas.Hex, tags=["Maps"])
+@router.post("/{map_id}/hexes/{q}/{r}/notes", response_model=schemas.PlayerNote, tags=["Maps"])
 def add_hex_note(
     map_id: int,
     q: int,
@@ -70,7 +70,7 @@ def add_hex_note(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    db_map = crud.get_map(db, map_id=map_id)
+    db_map = crud.get_map(db, map_id=map_id, with_hexes=False)
     if not db_map or db_map.campaign_id != current_user.campaign_id:
         raise HTTPException(status_code=404, detail="Map not found")
 
@@ -78,7 +78,7 @@ def add_hex_note(
     if not character:
         raise HTTPException(status_code=400, detail="User has no active character selected")
 
-    db_hex, error = crud.add_player_note(
+    db_note, error = crud.add_player_note(
         db,
         map_id=map_id,
         q=q,
@@ -89,4 +89,29 @@ def add_hex_note(
     )
     if error:
         raise HTTPException(status_code=400, detail=error)
-    return db_hex
+    return db_note
+
+@router.get("/{map_id}/hexes/{q}/{r}/notes", response_model=schemas.PlayerNotePage, tags=["Maps"])
+def read_hex_notes(
+    map_id: int,
+    q: int,
+    r: int,
+    cursor: int = None,
+    limit: int = 50,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Keyset-paginated player notes for one hex, oldest first. The map itself only
+    carries each hex's `note_count`.
+    """
+    db_map = crud.get_map(db, map_id=map_id, with_hexes=False)
+    if not db_map or db_map.campaign_id != current_user.campaign_id:
+        raise HTTPException(status_code=404, detail="Map not found")
+
+    db_hex = crud.get_hex(db, map_id=map_id, q=q, r=r)
+    if not db_hex:
+        raise HTTPException(status_code=404, detail="Hex not found")
+
+    notes, next_cursor = crud.get_player_notes(db, hex_id=db_hex.id, cursor=cursor, limit=limit)
+    return {"items": notes, "next_cursor": next_cursor}
@@ -1,6 +1,8 @@
-from pydantic import BaseModel, field_validator
-from typing import Optional, List, Any, Literal
+from pydantic import BaseModel
+from typing import Optional, List, Literal
+from datetime import datetime
 from ..missions.schemas import Mission
+from ...pagination import Page
 
 HexState = Literal["wilderness", "claimed_developed", "friendly", "contested", "awakened"]
 ControllingFaction = Literal["Collegium", "Limes"]
@@ -31,19 +33,27 @@ class PlayerNoteCreate(BaseModel):
     text: str
     session_id: Optional[int] = None
 
+class PlayerNote(BaseModel):
+    id: int
+    hex_id: int
+    author_character_id: Optional[int] = None
+    session_id: Optional[int] = None
+    text: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+PlayerNotePage = Page[PlayerNote]
+
 class Hex(HexBase):
     id: int
     map_id: int
     notes: Optional[str] = None
     hours_to_cross: Optional[float] = None
-    player_notes: List[Any] = []
+    note_count: int = 0  # page through GET /maps/{map_id}/hexes/{q}/{r}/notes for the notes themselves
     linked_mission: Optional[Mission] = None
 
-    @field_validator('player_notes', mode='before')
-    @classmethod
-    def coerce_none_to_list(cls, v: Any) -> List[Any]:
-        return v if v is not None else []
-
     class Config:
         from_attributes = True
 
@@ -1,13 +1,19 @@
-from sqlalchemy.orm import Session
-from datetime import datetime, timezone
+from sqlalchemy.orm import Session, selectinload
 from typing import Optional
 from . import models, schemas
+from ...pagination import keyset
+
+# Map responses carry every hex; load them in one query rather than on first access
+_WITH_HEXES = selectinload(models.HexMap.hexes)
 
 def get_maps(db: Session, campaign_id: int):
-    return db.query(models.HexMap).filter(models.HexMap.campaign_id == campaign_id).all()
+    return db.query(models.HexMap).options(_WITH_HEXES).filter(models.HexMap.campaign_id == campaign_id).all()
 
-def get_map(db: Session, map_id: int):
-    return db.query(models.HexMap).filter(models.HexMap.id == map_id).first()
+def get_map(db: Session, map_id: int, with_hexes: bool = True):
+    query = db.query(models.HexMap).filter(models.HexMap.id == map_id)
+    if with_hexes:
+        query = query.options(_WITH_HEXES)
+    return query.first()
 
 def create_map(db: Session, map_in: schemas.HexMapCreate, campaign_id: int, seed: bool = True):
     db_map = models.HexMap(**map_in.model_dump(), campaign_id=campaign_id)
@@ -88,17 +94,18 @@ def add_player_note(
     if not db_hex.is_discovered:
         return None, "Cannot add notes to undiscovered hexes"
 
-    notes = list(db_hex.player_notes or [])
-    notes.append({
-        "author_character_id": character_id,
-        "text": text,
-        "session_id": session_id,
-        "created_at": datetime.now(timezone.utc).isoformat()
-    })
-    db_hex.player_notes = notes
+    # Append-only: one INSERT, and the count is bumped in SQL so concurrent notes don't race
+    note = models.HexNote(hex=db_hex, author_character_id=character_id, session_id=session_id, text=text)
+    db.add(note)
+    db_hex.note_count = models.Hex.note_count + 1
     db.commit()
-    db.refresh(db_hex)
-    return db_hex, None
+    db.refresh(note)
+    return note, None
+
+def get_player_notes(db: Session, hex_id: int, cursor: int = None, limit: int = 50):
+    """One keyset page of a hex's player notes, oldest first."""
+    query = db.query(models.HexNote).filter(models.HexNote.hex_id == hex_id)
+    return keyset(query, models.HexNote.id, cursor=cursor, limit=limit)
 
 def bulk_update_hexes(db: Session, map_id: int, hexes: list[schemas.HexBase]):
     updated = []
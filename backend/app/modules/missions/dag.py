@@ -0,0 +1,155 @@
+"""
+Per-campaign mission prerequisite graph.
+
+`Mission.prerequisite_id` links each mission to at most one parent, so a
+campaign's missions form a forest. The graph is built from a single query,
+cached in-process per campaign and invalidated by the mission service whenever
+a mission is created, edited or changes status.
+"""
+import time
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Safety net for multi-worker deployments: invalidation is process-local, so a
+# status change made through another gunicorn worker is picked up after this.
+CACHE_TTL_SECONDS = 60.0
+
+COMPLETED_STATUS = "Completed"
+
+
+@dataclass
+class MissionNode:
+    id: int
+    name: str
+    status: str
+    prerequisite_id: Optional[int]
+    is_retired: bool
+    is_discoverable: bool
+    depth: int = 0
+    unlocked: bool = False
+    in_cycle: bool = False
+
+
+@dataclass
+class MissionGraph:
+    campaign_id: int
+    nodes: Dict[int, MissionNode]
+    order: List[int] = field(default_factory=list)  # topological: prerequisites first
+    built_at: float = field(default_factory=time.monotonic)
+
+    def ordered_nodes(self) -> List[MissionNode]:
+        return [self.nodes[mid] for mid in self.order]
+
+
+_cache: Dict[int, MissionGraph] = {}
+_lock = threading.Lock()
+
+
+def build_graph(db: Session, campaign_id: int) -> MissionGraph:
+    """Load every mission in the campaign in one query and resolve the DAG."""
+    rows = db.query(
+        models.Mission.id,
+        models.Mission.name,
+        models.Mission.status,
+        models.Mission.prerequisite_id,
+        models.Mission.is_retired,
+        models.Mission.is_discoverable,
+    ).filter(models.Mission.campaign_id == campaign_id).order_by(models.Mission.id).all()
+
+    nodes = {
+        r.id: MissionNode(
+            id=r.id,
+            name=r.name,
+            status=r.status,
+            prerequisite_id=r.prerequisite_id,
+            is_retired=bool(r.is_retired),
+            is_discoverable=bool(r.is_discoverable),
+        )
+        for r in rows
+    }
+
+    children: Dict[int, List[int]] = {}
+    roots: List[int] = []
+    for node in nodes.values():
+        if node.prerequisite_id is None:
+            roots.append(node.id)
+        elif node.prerequisite_id in nodes:
+            children.setdefault(node.prerequisite_id, []).append(node.id)
+        else:
+            # Dangling or cross-campaign prerequisite: treat as a locked root.
+            roots.append(node.id)
+
+    # Kahn's algorithm; with in-degree <= 1 this is a breadth-first walk from the roots.
+    order: List[int] = []
+    queue = deque(roots)
+    while queue:
+        mid = queue.popleft()
+        node = nodes[mid]
+        parent = nodes.get(node.prerequisite_id) if node.prerequisite_id is not None else None
+        if node.prerequisite_id is None:
+            node.depth = 0
+            node.unlocked = True
+        elif parent is None:
+            node.depth = 0
+            node.unlocked = False
+        else:
+            node.depth = parent.depth + 1
+            node.unlocked = parent.unlocked and parent.status == COMPLETED_STATUS
+        order.append(mid)
+        queue.extend(children.get(mid, []))
+
+    # Anything not reached from a root sits on (or hangs off) a prerequisite cycle.
+    visited = set(order)
+    for mid in nodes:
+        if mid not in visited:
+            node = nodes[mid]
+            node.in_cycle = True
+            node.unlocked = False
+            node.depth = 0
+            order.append(mid)
+
+    return MissionGraph(campaign_id=campaign_id, nodes=nodes, order=order)
+
+
+def get_graph(db: Session, campaign_id: int) -> MissionGraph:
+    """Return the cached graph for a campaign, rebuilding it if stale or missing."""
+    with _lock:
+        graph = _cache.get(campaign_id)
+    if graph is not None and time.monotonic() - graph.built_at < CACHE_TTL_SECONDS:
+        return graph
+
+    graph = build_graph(db, campaign_id)
+    with _lock:
+        _cache[campaign_id] = graph
+    return graph
+
+
+def invalidate(campaign_id: int) -> None:
+    with _lock:
+        _cache.pop(campaign_id, None)
+
+
+def creates_cycle(db: Session, campaign_id: int, mission_id: Optional[int], prerequisite_id: Optional[int]) -> bool:
+    """
+    True if pointing `mission_id` at `prerequisite_id` would close a loop.
+    Walks the prerequisite chain upwards from the proposed parent. Uses a fresh
+    build rather than the cache so a stale entry can never let a cycle through.
+    """
+    if prerequisite_id is None or mission_id is None:
+        return False
+    graph = build_graph(db, campaign_id)
+    seen = set()
+    current: Optional[int] = prerequisite_id
+    while current is not None and current not in seen:
+        if current == mission_id:
+            return True
+        seen.add(current)
+        node = graph.nodes.get(current)
+        current = node.prerequisite_id if node else None
+    return False
@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, ForeignKey, Table, DateTime, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, query_expression
 from ...database import Base
 
 mission_players = Table('mission_players', Base.metadata,
@@ -32,6 +32,10 @@ class Mission(Base):
     rewards = relationship("MissionReward", back_populates="mission", cascade="all, delete-orphan")
     players = relationship("Character", secondary=mission_players, back_populates="missions")
 
+    # Populated only by summary queries (see service.get_mission_summaries)
+    player_count = query_expression()
+    reward_count = query_expression()
+
 
 class MissionReward(Base):
     __tablename__ = "mission_rewards"
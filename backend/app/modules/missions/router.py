@@ -14,6 +14,10 @@ def create_mission(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_admin_user)
 ):
+    ok, error = crud.is_valid_prerequisite(db, current_user.campaign_id, mission.prerequisite_id)
+    if not ok:
+        raise HTTPException(status_code=400, detail=error)
+
     # Pass campaign_id from the current user
     return crud.create_mission(db=db, mission=mission, campaign_id=current_user.campaign_id)
 
@@ -21,6 +25,7 @@ def create_mission(
 def read_missions(
     skip: int = 0,
     limit: int = 100,
+    cursor: int = None,
     tier: str = None,
     region: str = None,
     include_retired: bool = False,
@@ -42,10 +47,59 @@ def read_missions(
         tier=tier,
         region=region,
         include_retired=inc_retired,
-        include_hidden=inc_hidden
+        include_hidden=inc_hidden,
+        cursor=cursor
     )
     return missions
 
+@router.get("/summary", response_model=schemas.MissionSummaryPage, tags=["Missions"])
+def read_mission_summaries(
+    cursor: int = None,
+    limit: int = 100,
+    tier: str = None,
+    region: str = None,
+    include_retired: bool = False,
+    include_hidden: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Keyset-paginated mission board. Returns player and reward counts instead of the
+    nested collections; use GET /missions/{id} for the full detail.
+    """
+    is_admin = current_user.role == "admin"
+    missions, next_cursor = crud.get_mission_summaries(
+        db,
+        campaign_id=current_user.campaign_id,
+        cursor=cursor,
+        limit=limit,
+        tier=tier,
+        region=region,
+        include_retired=include_retired if is_admin else False,
+        include_hidden=include_hidden if is_admin else False,
+    )
+    return {"items": missions, "next_cursor": next_cursor}
+
+@router.get("/graph", response_model=List[schemas.MissionGraphNode], tags=["Missions"])
+def read_mission_graph(
+    include_retired: bool = False,
+    include_hidden: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Missions in prerequisite (topological) order, each with its unlock depth and
+    whether it is currently unlocked. Missions caught in a prerequisite cycle are
+    flagged and always locked.
+    """
+    is_admin = current_user.role == "admin"
+    return crud.get_mission_graph(
+        db,
+        campaign_id=current_user.campaign_id,
+        include_retired=include_retired if is_admin else False,
+        include_hidden=include_hidden if is_admin else False,
+    )
+
 @router.get("/{mission_id}", response_model=schemas.Mission, tags=["Missions"])
 def read_mission(
     mission_id: int,
@@ -119,4 +173,9 @@ def update_mission(
     mission = crud.get_mission(db, mission_id=mission_id)
     if not mission or mission.campaign_id != current_user.campaign_id:
         raise HTTPException(status_code=404, detail="Mission not found")
+
+    ok, error = crud.is_valid_prerequisite(db, current_user.campaign_id, mission_update.prerequisite_id, mission_id=mission.id)
+    if not ok:
+        raise HTTPException(status_code=400, detail=error)
+
     return crud.update_mission(db, mission=mission, mission_update=mission_update)
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from typing import Optional, List
 import datetime
+from ...pagination import Page
 from ..items.schemas import Item
 from ..characters.base_schema import CharacterBase
 
@@ -50,3 +51,24 @@ class Mission(MissionBase):
     players: List[CharacterInMission] = []
     class Config:
         from_attributes = True
+
+class MissionSummary(MissionBase):
+    id: int
+    campaign_id: int
+    player_count: int = 0
+    reward_count: int = 0
+    class Config:
+        from_attributes = True
+
+MissionSummaryPage = Page[MissionSummary]
+
+class MissionGraphNode(BaseModel):
+    id: int
+    name: str
+    status: str
+    prerequisite_id: Optional[int] = None
+    depth: int
+    unlocked: bool
+    in_cycle: bool = False
+    class Config:
+        from_attributes = True
@@ -1,9 +1,10 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.orm import Session, selectinload, with_expression
+from sqlalchemy import or_, select, func
 import datetime
-from . import models, schemas
+from . import models, schemas, dag
 from ..items import service as item_service
 from ..characters import models as char_models
+from ...pagination import keyset
 
 def get_mission(db: Session, mission_id: int, campaign_id: int = None):
     q = db.query(models.Mission).filter(models.Mission.id == mission_id)
@@ -11,9 +12,8 @@ def get_mission(db: Session, mission_id: int, campaign_id: int = None):
         q = q.filter(models.Mission.campaign_id == campaign_id)
     return q.first()
 
-def get_missions(db: Session, campaign_id: int, skip: int = 0, limit: int = 100, 
-                 tier: str = None, region: str = None, 
-                 include_retired: bool = False, include_hidden: bool = False):
+def _filtered_missions(db: Session, campaign_id: int, tier: str = None, region: str = None,
+                       include_retired: bool = False, include_hidden: bool = False):
     query = db.query(models.Mission).filter(models.Mission.campaign_id == campaign_id)
     
     if not include_retired:
@@ -27,8 +27,59 @@ def get_missions(db: Session, campaign_id: int, skip: int = 0, limit: int = 100,
         
     if region:
         query = query.filter(models.Mission.region == region)
-        
-    return query.offset(skip).limit(limit).all()
+
+    return query
+
+def get_missions(db: Session, campaign_id: int, skip: int = 0, limit: int = 100, 
+                 tier: str = None, region: str = None, 
+                 include_retired: bool = False, include_hidden: bool = False,
+                 cursor: int = None):
+    query = _filtered_missions(db, campaign_id, tier, region, include_retired, include_hidden).options(
+        selectinload(models.Mission.rewards).joinedload(models.MissionReward.item),
+        selectinload(models.Mission.players),
+    )
+    if cursor is not None:
+        missions, _ = keyset(query, models.Mission.id, cursor=cursor, limit=limit)
+        return missions
+    return query.order_by(models.Mission.id).offset(skip).limit(limit).all()
+
+def get_mission_summaries(db: Session, campaign_id: int, cursor: int = None, limit: int = 100,
+                          tier: str = None, region: str = None,
+                          include_retired: bool = False, include_hidden: bool = False):
+    """Lean board listing: player/reward counts come from correlated subqueries, not relationship loads."""
+    player_count = select(func.count()).select_from(models.mission_players).where(
+        models.mission_players.c.mission_id == models.Mission.id
+    ).scalar_subquery()
+    reward_count = select(func.count(models.MissionReward.id)).where(
+        models.MissionReward.mission_id == models.Mission.id
+    ).scalar_subquery()
+
+    query = _filtered_missions(db, campaign_id, tier, region, include_retired, include_hidden).options(
+        with_expression(models.Mission.player_count, player_count),
+        with_expression(models.Mission.reward_count, reward_count),
+    )
+    return keyset(query, models.Mission.id, cursor=cursor, limit=limit)
+
+def get_mission_graph(db: Session, campaign_id: int, include_retired: bool = False, include_hidden: bool = False):
+    """Missions in topological order with their unlock depth and locked state."""
+    nodes = dag.get_graph(db, campaign_id).ordered_nodes()
+    if not include_retired:
+        nodes = [n for n in nodes if not n.is_retired]
+    if not include_hidden:
+        nodes = [n for n in nodes if n.is_discoverable]
+    return nodes
+
+def is_valid_prerequisite(db: Session, campaign_id: int, prerequisite_id: int, mission_id: int = None):
+    """Returns (ok, error). The prerequisite must be in the same campaign and not close a cycle."""
+    if prerequisite_id is None:
+        return True, None
+    if prerequisite_id == mission_id:
+        return False, "A mission cannot be its own prerequisite"
+    if get_mission(db, prerequisite_id, campaign_id=campaign_id) is None:
+        return False, "Prerequisite mission not found"
+    if dag.creates_cycle(db, campaign_id, mission_id, prerequisite_id):
+        return False, "Prerequisite would create a cycle"
+    return True, None
 
 def is_mission_selectable(mission: models.Mission):
     if mission.is_retired:
@@ -69,6 +120,7 @@ def create_mission(db: Session, mission: schemas.MissionCreate, campaign_id: int
     if rewards:
         db.add_all(rewards)
     db.commit()
+    dag.invalidate(campaign_id)
     db.refresh(db_mission)
     return db_mission
 
@@ -87,6 +139,7 @@ def remove_character_from_mission(db: Session, mission: models.Mission, characte
 def update_mission_status(db: Session, mission: models.Mission, status: str):
     mission.status = status
     db.commit()
+    dag.invalidate(mission.campaign_id)
     db.refresh(mission)
     return mission
 
@@ -111,6 +164,7 @@ def update_mission(db: Session, mission: models.Mission, mission_update: schemas
         db.add(db_reward)
     
     db.commit()
+    dag.invalidate(mission.campaign_id)
     db.refresh(mission)
     return mission
 
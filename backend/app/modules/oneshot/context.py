@@ -0,0 +1,317 @@
+"""
+Token-budgeted campaign context for one-shot prompts.
+
+Every discovered hex and recent field report is a candidate snippet, scored
+against the request:
+
+- lexical similarity (TF-IDF cosine) to a query built from `hex_region`, the
+  chosen mission seeds and the names of factions the crew has standing with;
+- distance from `hex_region` when it names a coordinate (``"4,-2"``);
+- being linked to one of the chosen missions;
+- recency, for field reports.
+
+The best snippets are packed until `ONESHOT_CONTEXT_TOKEN_BUDGET` tokens are
+used, counted with a local estimator rather than a tokenizer. The campaign
+header, faction standing and mission seeds are always included.
+
+Loading (`load_sources`, one loader per section) is kept apart from ranking
+and packing (`render_context`), so the loaded sections can be cached between
+requests (see snapshot.py).
+"""
+import math
+import re
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session, undefer_group
+
+from ...config import get_settings
+from ..campaigns.models import Campaign
+from ..factions.models import FactionReputation
+from ..maps.models import HexMap, Hex
+from ..missions.models import Mission
+from ..sessions.models import GameSession
+
+# Field reports considered for ranking; older ones are never worth the tokens.
+MAX_REPORT_CANDIDATES = 20
+
+HEX_SECTION = "Known Hex Map (discovered hexes)"
+REPORT_SECTION = "Recent Field Reports from the Board"
+
+LEXICAL_WEIGHT = 1.0
+PROXIMITY_WEIGHT = 1.0
+LINKED_MISSION_BONUS = 1.0
+NOTABLE_HEX_BONUS = 0.1  # settled, contested or otherwise not plain wilderness
+REPORT_RECENCY_WEIGHT = 0.8
+REPORT_RECENCY_DECAY = 0.6
+
+LAYER_LABELS = {"early": "Early — Surface Complications", "mid": "Mid — Hidden Threads", "late": "Late — Campaign Revelations"}
+
+_PIECE = re.compile(r"\w+|[^\w\s]")
+_WORD = re.compile(r"[a-z0-9]+")
+_COORD = re.compile(r"^\s*\(?\s*(-?\d+)\s*,\s*(-?\d+)\s*\)?\s*$")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the their there this to was were with".split()
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate BPE token count: a word costs one token per ~4 characters, punctuation one each."""
+    return sum((len(piece) + 3) // 4 for piece in _PIECE.findall(text))
+
+
+def _terms(text: str) -> List[str]:
+    return [w for w in _WORD.findall(text.lower()) if len(w) > 1 and w not in _STOPWORDS]
+
+
+def tfidf_similarity(query: str, documents: Sequence[str]) -> List[float]:
+    """Cosine similarity between `query` and each document, TF-IDF weighted over `documents`."""
+    docs = [Counter(_terms(d)) for d in documents]
+    df = Counter(term for doc in docs for term in doc)
+    idf = {term: math.log((len(docs) + 1) / (count + 1)) + 1.0 for term, count in df.items()}
+
+    def weigh(counts: Counter) -> Dict[str, float]:
+        return {term: n * idf[term] for term, n in counts.items() if term in idf}
+
+    q = weigh(Counter(_terms(query)))
+    q_norm = math.sqrt(sum(w * w for w in q.values()))
+    if not q_norm:
+        return [0.0] * len(docs)
+
+    scores = []
+    for doc in docs:
+        d = weigh(doc)
+        d_norm = math.sqrt(sum(w * w for w in d.values()))
+        dot = sum(w * d.get(term, 0.0) for term, w in q.items())
+        scores.append(dot / (q_norm * d_norm) if d_norm else 0.0)
+    return scores
+
+
+@dataclass(frozen=True)
+class HexFact:
+    q: int
+    r: int
+    terrain: str
+    hex_state: Optional[str]
+    controlling_faction: Optional[str]
+    linked_location_name: Optional[str]
+    linked_mission_id: Optional[int]
+    player_note_count: int
+
+    def line(self) -> str:
+        line = f"  - ({self.q},{self.r}) {self.terrain}"
+        if self.hex_state and self.hex_state != "wilderness":
+            line += f" [{self.hex_state.replace('_', ' ')}]"
+        if self.controlling_faction:
+            line += f" controlled by {self.controlling_faction}"
+        if self.linked_location_name:
+            line += f" — {self.linked_location_name}"
+        if self.player_note_count:
+            line += f" ({self.player_note_count} player note(s))"
+        return line
+
+
+@dataclass(frozen=True)
+class ReportFact:
+    session_name: str
+    field_report: str
+
+    def line(self) -> str:
+        return f"  [{self.session_name}]: {self.field_report}"
+
+
+@dataclass(frozen=True)
+class MissionFact:
+    id: int
+    name: str
+    description: Optional[str]
+    region: Optional[str]
+
+
+@dataclass
+class ContextSources:
+    """Everything the prompt context is built from, detached from the session."""
+    campaign_name: str
+    reputations: List[Tuple[str, int]] = field(default_factory=list)
+    missions: Dict[int, MissionFact] = field(default_factory=dict)
+    hexes: List[HexFact] = field(default_factory=list)
+    reports: List[ReportFact] = field(default_factory=list)  # newest first
+
+
+@dataclass
+class Snippet:
+    section: str
+    text: str
+    order: int  # position within its section when rendered
+    score: float = 0.0
+
+
+def _load_campaign(db: Session, campaign_id: int) -> str:
+    return db.query(Campaign.name).filter(Campaign.id == campaign_id).scalar()
+
+
+def _load_reputations(db: Session, campaign_id: int) -> List[Tuple[str, int]]:
+    return [
+        (r.faction_name, r.level)
+        for r in db.query(FactionReputation).filter(FactionReputation.campaign_id == campaign_id).all()
+    ]
+
+
+def _load_missions(db: Session, campaign_id: int) -> Dict[int, MissionFact]:
+    return {
+        m.id: MissionFact(m.id, m.name, m.description, m.region)
+        for m in db.query(Mission).filter(Mission.campaign_id == campaign_id).all()
+    }
+
+
+def _load_hexes(db: Session, campaign_id: int) -> List[HexFact]:
+    hex_map = db.query(HexMap).filter(HexMap.campaign_id == campaign_id).first()
+    if not hex_map:
+        return []
+    discovered = db.query(Hex).filter(
+        Hex.map_id == hex_map.id,
+        Hex.is_discovered == True  # noqa: E712
+    ).order_by(Hex.id).all()
+    return [
+        HexFact(
+            q=h.q, r=h.r, terrain=h.terrain, hex_state=h.hex_state,
+            controlling_faction=h.controlling_faction,
+            linked_location_name=h.linked_location_name,
+            linked_mission_id=h.linked_mission_id,
+            player_note_count=h.note_count or 0,
+        )
+        for h in discovered
+    ]
+
+
+def _load_reports(db: Session, campaign_id: int) -> List[ReportFact]:
+    return [
+        ReportFact(s.name, s.field_report)
+        for s in db.query(GameSession)
+        .options(undefer_group("reports"))
+        .filter(
+            GameSession.campaign_id == campaign_id,
+            GameSession.status == "Completed",
+            GameSession.field_report != None  # noqa: E711
+        )
+        .order_by(GameSession.session_date.desc())
+        .limit(MAX_REPORT_CANDIDATES)
+        .all()
+    ]
+
+
+# ContextSources field -> loader. Each section can be reloaded (and cached) on its own.
+SECTION_LOADERS: Dict[str, Callable[[Session, int], Any]] = {
+    "campaign_name": _load_campaign,
+    "reputations": _load_reputations,
+    "missions": _load_missions,
+    "hexes": _load_hexes,
+    "reports": _load_reports,
+}
+
+
+def load_section(db: Session, campaign_id: int, section: str) -> Any:
+    return SECTION_LOADERS[section](db, campaign_id)
+
+
+def load_sources(db: Session, campaign_id: int) -> ContextSources:
+    return ContextSources(**{section: load_section(db, campaign_id, section) for section in SECTION_LOADERS})
+
+
+def dump_section(section: str, value: Any) -> Any:
+    """JSON-safe form of a loaded section."""
+    if section == "campaign_name":
+        return value
+    if section == "reputations":
+        return [list(pair) for pair in value]
+    if section == "missions":
+        return [asdict(m) for m in value.values()]
+    return [asdict(fact) for fact in value]
+
+
+def restore_section(section: str, data: Any) -> Any:
+    """Inverse of `dump_section`."""
+    if section == "campaign_name":
+        return data
+    if section == "reputations":
+        return [(name, level) for name, level in data]
+    if section == "missions":
+        return {m["id"]: MissionFact(**m) for m in data}
+    fact = HexFact if section == "hexes" else ReportFact
+    return [fact(**item) for item in data]
+
+
+def _hex_distance(aq: int, ar: int, bq: int, br: int) -> int:
+    return (abs(aq - bq) + abs(ar - br) + abs((aq + ar) - (bq + br))) // 2
+
+
+def rank_snippets(sources: ContextSources, params: dict) -> List[Snippet]:
+    """Score every hex and report snippet for this request (highest first)."""
+    region = params.get("hex_region") or ""
+    missions = [sources.missions[i] for i in params.get("mission_ids", []) if i in sources.missions]
+    query = " ".join(
+        [region]
+        + [f"{m.name} {m.description or ''} {m.region or ''}" for m in missions]
+        + [name for name, level in sources.reputations if level]
+    )
+    coord = _COORD.match(region)
+    chosen = {m.id for m in missions}
+
+    snippets = []
+    for i, h in enumerate(sources.hexes):
+        prior = 0.0
+        if coord:
+            prior += PROXIMITY_WEIGHT / (1 + _hex_distance(h.q, h.r, int(coord.group(1)), int(coord.group(2))))
+        if h.linked_mission_id in chosen:
+            prior += LINKED_MISSION_BONUS
+        if h.hex_state and h.hex_state != "wilderness":
+            prior += NOTABLE_HEX_BONUS
+        snippets.append(Snippet(HEX_SECTION, h.line(), i, prior))
+    for i, report in enumerate(sources.reports):
+        prior = REPORT_RECENCY_WEIGHT * REPORT_RECENCY_DECAY ** i
+        snippets.append(Snippet(REPORT_SECTION, report.line(), i, prior))
+
+    for snippet, similarity in zip(snippets, tfidf_similarity(query, [s.text for s in snippets])):
+        snippet.score += LEXICAL_WEIGHT * similarity
+    # sorted() is stable, so ties keep map / recency order.
+    return sorted(snippets, key=lambda s: -s.score)
+
+
+def render_context(sources: ContextSources, params: dict, token_budget: Optional[int] = None) -> str:
+    if token_budget is None:
+        token_budget = get_settings().ONESHOT_CONTEXT_TOKEN_BUDGET
+
+    parts = [f"Campaign: {sources.campaign_name}"]
+    revelation_layer = params.get("revelation_layer", "early")
+    parts.append(f"Revelation Layer: {LAYER_LABELS.get(revelation_layer, revelation_layer)}")
+    if sources.reputations:
+        rep_lines = [f"  - {name}: {level:+d}" for name, level in sources.reputations]
+        parts.append("Current Faction Standing:\n" + "\n".join(rep_lines))
+    for mission_id in params.get("mission_ids", []):
+        m = sources.missions.get(mission_id)
+        if m:
+            parts.append(f"Mission Seed: {m.name} — {m.description or 'No description'}")
+    if params.get("hex_region"):
+        parts.append(f"Region Focus: {params['hex_region']}")
+
+    used = sum(estimate_tokens(p) for p in parts)
+    packed: Dict[str, List[Snippet]] = {HEX_SECTION: [], REPORT_SECTION: []}
+    for snippet in rank_snippets(sources, params):
+        cost = estimate_tokens(snippet.text)
+        if not packed[snippet.section]:
+            cost += estimate_tokens(snippet.section + ":")
+        if used + cost > token_budget:
+            continue  # a shorter, lower-ranked snippet may still fit
+        packed[snippet.section].append(snippet)
+        used += cost
+
+    for section, chosen in packed.items():
+        if chosen:
+            lines = [s.text for s in sorted(chosen, key=lambda s: s.order)]
+            parts.append(f"{section}:\n" + "\n".join(lines))
+    return "\n\n".join(parts)
+
+
+def build_campaign_context(db: Session, campaign_id: int, params: dict, token_budget: Optional[int] = None) -> str:
+    return render_context(load_sources(db, campaign_id), params, token_budget)
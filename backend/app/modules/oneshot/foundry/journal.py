@@ -49,6 +49,42 @@ def create_journal_pages(adventure: AdventureStructure) -> list[Dict[str, Any]]:
         })
         sort_order += 10000
 
+    if adventure.npcs:
+        content = "<h2>NPCs</h2>"
+        for npc in adventure.npcs:
+            content += f"<h3>{npc.name}</h3>"
+            if npc.role:
+                content += f"<p><em>{npc.role}</em></p>"
+            content += f"<p>{npc.description}</p>"
+            if npc.motivation:
+                content += f"<p><strong>Wants:</strong> {npc.motivation}</p>"
+            if npc.secret:
+                content += f"<p><strong>Secret:</strong> {npc.secret}</p>"
+        pages.append({
+            "name": "NPCs",
+            "type": "text",
+            "text": {"content": content, "format": 1},
+            "sort": sort_order
+        })
+        sort_order += 10000
+
+    if adventure.pregens:
+        content = "<h2>Pregenerated Characters</h2>"
+        for pc in adventure.pregens:
+            content += f"<h3>{pc.name}</h3>"
+            content += f"<p><em>{pc.species} {pc.class_name} {pc.level}</em></p>"
+            if pc.background:
+                content += f"<p>{pc.background}</p>"
+            if pc.hook:
+                content += f"<p><strong>Stake:</strong> {pc.hook}</p>"
+        pages.append({
+            "name": "Pregenerated Characters",
+            "type": "text",
+            "text": {"content": content, "format": 1},
+            "sort": sort_order
+        })
+        sort_order += 10000
+
     # Resolution
     pages.append({
         "name": "Conclusion",
@@ -1,14 +1,23 @@
 from typing import Dict, Any, List
 
+ADVENTURES_PACK = {
+    "name": "adventures",
+    "label": "Adventure Content",
+    "path": "packs/adventures.db",
+    "type": "JournalEntry"
+}
+
 def create_module_manifest(
     module_id: str,
     title: str,
     description: str,
     version: str = "1.0.0",
-    authors: List[str] = None
+    authors: List[str] = None,
+    packs: List[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
     """
     Generate a module.json manifest for FoundryVTT.
+    `packs` defaults to the single adventures journal pack.
     """
     return {
         "id": module_id,
@@ -29,14 +38,7 @@ def create_module_manifest(
                 }
             ]
         },
-        "packs": [
-            {
-                "name": "adventures",
-                "label": "Adventure Content",
-                "path": "packs/adventures.db",
-                "type": "JournalEntry"
-            }
-        ],
+        "packs": packs or [ADVENTURES_PACK],
         "url": "",
         "manifest": "",
         "download": ""
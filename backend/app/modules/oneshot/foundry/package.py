@@ -0,0 +1,115 @@
+"""
+Installable FoundryVTT module ZIPs.
+
+An archive holds `module.json` and one compendium per pack (`packs/<name>.db`)
+in NeDB format (one JSON document per line). Foundry v11+ migrates NeDB packs to
+LevelDB the first time the module is loaded, so the same ZIP installs on v10
+through v12.
+
+Packs are fed as iterables of documents and written through
+`ZipFile.open(..., "w")`, so each document is compressed as it is produced
+rather than assembled in memory first. A document field may itself be an
+iterator (a Scene's drawings, say); it is encoded element by element, so even a
+single large document is never held whole. The ZIP goes to a temp file next to
+its destination and is renamed into place, so a reader never sees a
+half-written archive.
+"""
+import hashlib
+import json
+import os
+import secrets
+import string
+import tempfile
+import zipfile
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from .journal import create_journal_entry_data
+from .module import ADVENTURES_PACK, create_module_manifest
+from ..schemas import AdventureStructure
+
+PACK_PATH = ADVENTURES_PACK["path"]
+
+_ID_ALPHABET = string.ascii_letters + string.digits
+
+
+def random_id(length: int = 16) -> str:
+    """A Foundry document id (same shape as `foundry.utils.randomID`)."""
+    return "".join(secrets.choice(_ID_ALPHABET) for _ in range(length))
+
+
+def stable_id(*parts: Any) -> str:
+    """A document id derived from `parts`, so re-exports update documents instead of duplicating them."""
+    digest = hashlib.sha256(":".join(map(str, parts)).encode()).digest()
+    return "".join(_ID_ALPHABET[b % len(_ID_ALPHABET)] for b in digest[:16])
+
+
+def module_id(job_id: int) -> str:
+    return f"oneshot-{job_id}"
+
+
+def with_ids(entry: Dict[str, Any], entry_id: Optional[str] = None) -> Dict[str, Any]:
+    """A JournalEntry from `create_journal_entry_data` with document ids for it and its pages."""
+    entry_id = entry_id or random_id()
+    return {
+        "_id": entry_id,
+        **entry,
+        "pages": [{"_id": stable_id(entry_id, i), **page} for i, page in enumerate(entry["pages"])],
+    }
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"))
+
+
+def encode_document(doc: Dict[str, Any]) -> Iterator[str]:
+    """One NeDB line for `doc`, in pieces; iterator-valued fields are expanded lazily."""
+    yield "{"
+    for i, (key, value) in enumerate(doc.items()):
+        yield ("," if i else "") + _dumps(key) + ":"
+        if isinstance(value, Iterator):
+            yield "["
+            for j, item in enumerate(value):
+                yield ("," if j else "") + _dumps(item)
+            yield "]"
+        else:
+            yield _dumps(value)
+    yield "}\n"
+
+
+def write_module_zip(
+    path: str,
+    manifest: Dict[str, Any],
+    packs: Iterable[Tuple[str, Iterable[Dict[str, Any]]]],
+) -> str:
+    """Write `manifest` and each `(pack path, documents)` pair to a module ZIP at `path`."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f, zipfile.ZipFile(f, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("module.json", json.dumps(manifest, indent=2))
+            for pack_path, documents in packs:
+                with zf.open(pack_path, "w") as pack:
+                    for doc in documents:
+                        for piece in encode_document(doc):
+                            pack.write(piece.encode("utf-8"))
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+    return path
+
+
+def build_module_zip(job_id: int, adventure: AdventureStructure, output_dir: str) -> str:
+    """Write the module ZIP for `job_id` under `output_dir` and return its path."""
+    manifest = create_module_manifest(
+        module_id=module_id(job_id),
+        title=adventure.title,
+        description=adventure.hook,
+    )
+    entry = with_ids(create_journal_entry_data(adventure))
+    path = os.path.join(output_dir, f"{module_id(job_id)}.zip")
+    return write_module_zip(path, manifest, [(PACK_PATH, [entry])])
@@ -0,0 +1,296 @@
+"""
+Whole-campaign export as a FoundryVTT module.
+
+One ZIP with a compendium per kind of content:
+
+- ``adventures``: every completed one-shot, as built by `create_journal_entry_data`;
+- ``missions`` and ``factions``: one journal entry each;
+- ``hex-notes``: one journal entry per hex map, a page per discovered hex with
+  a location, DM notes or player notes;
+- ``scenes``: each hex map as a hex-grid Scene, a filled polygon per discovered
+  hex and a map note (linked to its hex-notes page) per noted hex.
+
+Each pack is a generator over `yield_per` queries, and a Scene's drawings,
+notes and a map's journal pages are themselves lazy, so memory stays bounded
+no matter how many hexes or adventures a campaign has (see `package.py`).
+Document ids are derived from database ids, so importing a fresh export over
+an old one updates documents in place.
+"""
+import logging
+import math
+import os
+from html import escape
+from typing import Any, Dict, Iterator, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload, undefer
+
+from .journal import create_journal_entry_data
+from .module import create_module_manifest
+from .package import stable_id, with_ids, write_module_zip
+from ..models import GeneratedOneShot
+from ..schemas import AdventureStructure
+from ...campaigns.models import Campaign
+from ...factions.models import FactionReputation, FactionReputationEvent
+from ...maps.models import HexMap, Hex
+from ...missions.models import Mission
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+FACTION_EVENT_LIMIT = 10
+
+# Foundry CONST.GRID_TYPES for flat-topped hex columns (the layout of the web map).
+GRID_HEXODDQ = 4
+GRID_HEXEVENQ = 5
+
+# Same palette as the web map (frontend/src/lib/utils/terrainColors.ts).
+TERRAIN_COLORS = {
+    "plains": "#90EE90",
+    "forest": "#228B22",
+    "mountain": "#808080",
+    "water": "#4682B4",
+    "desert": "#F4A460",
+    "swamp": "#556B2F",
+}
+DEFAULT_TERRAIN_COLOR = "#D3D3D3"
+
+NOTE_ICON = "icons/svg/book.svg"
+
+PACKS = [
+    {"name": "adventures", "label": "Adventures", "path": "packs/adventures.db", "type": "JournalEntry"},
+    {"name": "missions", "label": "Missions", "path": "packs/missions.db", "type": "JournalEntry"},
+    {"name": "factions", "label": "Factions", "path": "packs/factions.db", "type": "JournalEntry"},
+    {"name": "hex-notes", "label": "Hex Notes", "path": "packs/hex-notes.db", "type": "JournalEntry"},
+    {"name": "scenes", "label": "Hex Maps", "path": "packs/scenes.db", "type": "Scene"},
+]
+
+
+def module_id(campaign_id: int) -> str:
+    return f"campaign-{campaign_id}"
+
+
+def _text_page(page_id: str, name: str, content: str, sort: int) -> Dict[str, Any]:
+    return {"_id": page_id, "name": name, "type": "text", "text": {"content": content, "format": 1}, "sort": sort}
+
+
+def _journal_entry(entry_id: str, name: str, pages: Any, sort: int = 0) -> Dict[str, Any]:
+    return {"_id": entry_id, "name": name, "pages": pages, "folder": None, "sort": sort, "ownership": {"default": 0}, "flags": {}}
+
+
+# --- Journal packs ---------------------------------------------------------------
+
+def adventure_documents(db: Session, campaign_id: int) -> Iterator[Dict[str, Any]]:
+    jobs = db.query(GeneratedOneShot).filter(
+        GeneratedOneShot.campaign_id == campaign_id,
+        GeneratedOneShot.status == "completed",
+        GeneratedOneShot.content != None  # noqa: E711
+    ).options(undefer(GeneratedOneShot.content)).order_by(GeneratedOneShot.id)
+    for job in jobs.yield_per(20):
+        try:
+            adventure = AdventureStructure(**job.content)
+        except Exception as e:
+            logger.warning(f"Skipping one-shot {job.id} in campaign export: {e}")
+            continue
+        yield with_ids(create_journal_entry_data(adventure), stable_id("oneshot", job.id))
+
+
+def mission_documents(db: Session, campaign_id: int) -> Iterator[Dict[str, Any]]:
+    missions = db.query(Mission).filter(Mission.campaign_id == campaign_id).order_by(Mission.id)
+    for m in missions.yield_per(BATCH_SIZE):
+        details = [("Status", m.status), ("Tier", m.tier), ("Region", m.region)]
+        content = f"<h1>{escape(m.name)}</h1><ul>"
+        content += "".join(f"<li><strong>{label}:</strong> {escape(value)}</li>" for label, value in details if value)
+        content += f"</ul><p>{escape(m.description or 'No description')}</p>"
+        entry_id = stable_id("mission", m.id)
+        yield _journal_entry(entry_id, m.name, [_text_page(stable_id(entry_id, 0), m.name, content, 10000)])
+
+
+def faction_documents(db: Session, campaign_id: int) -> Iterator[Dict[str, Any]]:
+    factions = db.query(FactionReputation).filter(
+        FactionReputation.campaign_id == campaign_id
+    ).order_by(FactionReputation.faction_name)
+    for f in factions.yield_per(BATCH_SIZE):
+        content = f"<h1>{escape(f.faction_name)}</h1><p><strong>Standing:</strong> {f.level:+d}</p>"
+        if f.description:
+            content += f"<p>{escape(f.description)}</p>"
+        events = db.query(FactionReputationEvent).filter(
+            FactionReputationEvent.reputation_id == f.id
+        ).order_by(FactionReputationEvent.created_at.desc()).limit(FACTION_EVENT_LIMIT).all()
+        if events:
+            content += "<h2>Recent Changes</h2><ul>"
+            content += "".join(f"<li>{e.delta:+d}: {escape(e.description)}</li>" for e in events)
+            content += "</ul>"
+        entry_id = stable_id("faction", f.id)
+        entry = _journal_entry(entry_id, f.faction_name, [_text_page(stable_id(entry_id, 0), f.faction_name, content, 10000)])
+        if f.color:
+            entry["flags"] = {module_id(campaign_id): {"color": f.color}}
+        yield entry
+
+
+# --- Hex maps --------------------------------------------------------------------
+
+def _discovered_hexes(db: Session, map_id: int, with_notes: bool = False):
+    query = db.query(Hex).filter(
+        Hex.map_id == map_id,
+        Hex.is_discovered == True,  # noqa: E712
+    )
+    if with_notes:
+        query = query.options(selectinload(Hex.player_notes))
+    return query.order_by(Hex.q, Hex.r).yield_per(BATCH_SIZE)
+
+
+def _has_notes(h: Hex) -> bool:
+    return bool(h.linked_location_name or h.notes or h.note_count)
+
+
+def _hex_label(h: Hex) -> str:
+    return f"({h.q},{h.r}) {h.linked_location_name or h.terrain}"
+
+
+def _hex_page_content(h: Hex) -> str:
+    content = f"<h2>{escape(_hex_label(h))}</h2><p><strong>Terrain:</strong> {escape(h.terrain or '')}"
+    if h.hex_state:
+        content += f" · <strong>State:</strong> {escape(h.hex_state.replace('_', ' '))}"
+    if h.controlling_faction:
+        content += f" · <strong>Controlled by:</strong> {escape(h.controlling_faction)}"
+    content += "</p>"
+    if h.notes:
+        content += f"<h3>DM Notes</h3><p>{escape(h.notes)}</p>"
+    if h.player_notes:
+        content += "<h3>Player Notes</h3><ul>" + "".join(f"<li>{escape(n.text)}</li>" for n in h.player_notes) + "</ul>"
+    return content
+
+
+def _hex_page_id(hex_map: HexMap, h: Hex) -> str:
+    return stable_id("hex", hex_map.id, h.q, h.r)
+
+
+def hex_note_documents(db: Session, campaign_id: int) -> Iterator[Dict[str, Any]]:
+    for hex_map in db.query(HexMap).filter(HexMap.campaign_id == campaign_id).order_by(HexMap.id).all():
+        def pages(hex_map=hex_map):
+            for i, h in enumerate(h for h in _discovered_hexes(db, hex_map.id, with_notes=True) if _has_notes(h)):
+                yield _text_page(_hex_page_id(hex_map, h), _hex_label(h), _hex_page_content(h), (i + 1) * 100)
+        yield _journal_entry(stable_id("hex-notes", hex_map.id), f"{hex_map.name} — Hex Notes", pages())
+
+
+class HexLayout:
+    """
+    Flat-topped axial layout matching the web map, in scene pixels.
+
+    The hex radius is chosen so the hex height is a whole number of pixels (Foundry's
+    grid size), and the origin so the top-left hex's bounding box touches (0, 0).
+    """
+    def __init__(self, hex_size: int, min_q: int, max_q: int, min_s: int, max_s: int):
+        self.grid_size = max(round(math.sqrt(3) * hex_size), 1)
+        self.radius = self.grid_size / math.sqrt(3)
+        self.min_q = min_q
+        self.min_s = min_s  # s = q + 2r, so y grows with s
+        self.width = math.ceil(1.5 * self.radius * (max_q - min_q) + 2 * self.radius)
+        self.height = math.ceil(self.grid_size / 2 * (max_s - min_s) + self.grid_size)
+        # Foundry offsets alternate columns; pick the parity that matches column 0.
+        self.grid_type = GRID_HEXODDQ if (min_q - min_s) % 2 == 0 else GRID_HEXEVENQ
+
+    def center(self, q: int, r: int):
+        x = self.radius + 1.5 * self.radius * (q - self.min_q)
+        y = self.grid_size / 2 * (1 + (q + 2 * r) - self.min_s)
+        return x, y
+
+    def polygon(self) -> list:
+        """Corner offsets from the hex's bounding-box corner, as Foundry's flat point list."""
+        points = []
+        for i in range(6):
+            angle = math.radians(60 * i)
+            points += [round(self.radius * (1 + math.cos(angle)), 2), round(self.grid_size / 2 + self.radius * math.sin(angle), 2)]
+        return points
+
+
+def _layout(db: Session, hex_map: HexMap) -> Optional[HexLayout]:
+    s = Hex.q + 2 * Hex.r
+    bounds = db.query(func.min(Hex.q), func.max(Hex.q), func.min(s), func.max(s)).filter(Hex.map_id == hex_map.id).one()
+    if bounds[0] is None:
+        return None
+    return HexLayout(hex_map.hex_size or 60, *bounds)
+
+
+def _drawings(db: Session, hex_map: HexMap, layout: HexLayout) -> Iterator[Dict[str, Any]]:
+    points = layout.polygon()
+    for h in _discovered_hexes(db, hex_map.id):
+        x, y = layout.center(h.q, h.r)
+        yield {
+            "_id": stable_id("hex-drawing", hex_map.id, h.q, h.r),
+            "x": round(x - layout.radius, 2),
+            "y": round(y - layout.grid_size / 2, 2),
+            "shape": {"type": "p", "width": round(2 * layout.radius, 2), "height": layout.grid_size, "points": points},
+            "fillType": 1,
+            "fillColor": TERRAIN_COLORS.get((h.terrain or "").lower(), DEFAULT_TERRAIN_COLOR),
+            "fillAlpha": 0.5,
+            "strokeWidth": 2,
+            "strokeColor": "#000000",
+            "strokeAlpha": 0.4,
+            "hidden": False,
+            "locked": True,
+        }
+
+
+def _notes(db: Session, hex_map: HexMap, layout: HexLayout) -> Iterator[Dict[str, Any]]:
+    entry_id = stable_id("hex-notes", hex_map.id)
+    for h in _discovered_hexes(db, hex_map.id):
+        if not _has_notes(h):
+            continue
+        x, y = layout.center(h.q, h.r)
+        yield {
+            "_id": stable_id("hex-note", hex_map.id, h.q, h.r),
+            "entryId": entry_id,
+            "pageId": _hex_page_id(hex_map, h),
+            "x": round(x), "y": round(y),
+            "texture": {"src": NOTE_ICON},
+            "iconSize": 32,
+            "text": h.linked_location_name or f"({h.q},{h.r})",
+            "fontSize": 24,
+            "textAnchor": 1,
+        }
+
+
+def scene_documents(db: Session, campaign_id: int) -> Iterator[Dict[str, Any]]:
+    for hex_map in db.query(HexMap).filter(HexMap.campaign_id == campaign_id).order_by(HexMap.id).all():
+        layout = _layout(db, hex_map)
+        if layout is None:
+            continue
+        yield {
+            "_id": stable_id("scene", hex_map.id),
+            "name": hex_map.name,
+            "navigation": False,
+            "width": layout.width,
+            "height": layout.height,
+            "padding": 0,
+            "backgroundColor": "#1a1a1a",
+            "grid": {"type": layout.grid_type, "size": layout.grid_size, "color": "#000000", "alpha": 0.2, "distance": 1, "units": "hex"},
+            "tokenVision": False,
+            "fogExploration": False,
+            "drawings": _drawings(db, hex_map, layout),
+            "notes": _notes(db, hex_map, layout),
+            "flags": {},
+        }
+
+
+PACK_DOCUMENTS = {
+    "adventures": adventure_documents,
+    "missions": mission_documents,
+    "factions": faction_documents,
+    "hex-notes": hex_note_documents,
+    "scenes": scene_documents,
+}
+
+
+def build_campaign_module_zip(db: Session, campaign_id: int, output_dir: str) -> str:
+    """Write the campaign's module ZIP under `output_dir` and return its path."""
+    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).one()
+    manifest = create_module_manifest(
+        module_id=module_id(campaign_id),
+        title=campaign.name,
+        description=f"Adventures, missions, factions and hex maps from the {campaign.name} campaign.",
+        packs=PACKS,
+    )
+    packs = ((pack["path"], PACK_DOCUMENTS[pack["name"]](db, campaign_id)) for pack in PACKS)
+    return write_module_zip(os.path.join(output_dir, f"{module_id(campaign_id)}.zip"), manifest, packs)
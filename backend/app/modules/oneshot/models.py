@@ -1,9 +1,17 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON, Text, Boolean, Index
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 from ...database import Base
 
+# Job statuses the queue never moves on from.
+FINISHED_STATUSES = ("completed", "failed")
+
 class GeneratedOneShot(Base):
+    """
+    A generation job. The large JSON/text columns are deferred as the "payload"
+    group: job lists and queue bookkeeping never load them, and queries that
+    return a job's content ask for them with `undefer_group("payload")`.
+    """
     __tablename__ = "generated_oneshots"
     
     id = Column(Integer, primary_key=True, index=True)
@@ -12,18 +20,71 @@ class GeneratedOneShot(Base):
     title = Column(String, nullable=True)
     summary = Column(String, nullable=True)
     
-    status = Column(String, default="pending") # pending, processing, completed, failed
+    status = Column(String, default="pending", index=True) # pending, processing, completed, failed
+
+    # Job queue bookkeeping (see queue.py)
+    attempts = Column(Integer, default=0, nullable=False)
+    claimed_by = Column(String, nullable=True)        # worker id holding the job while processing
+    heartbeat_at = Column(DateTime, nullable=True)    # refreshed while processing; stale => recovered
     
     # Generation metadata
-    generation_params = Column(JSON, nullable=False)  # Stored request parameters
+    generation_params = deferred(Column(JSON, nullable=False), group="payload")  # Stored request parameters
     llm_model_used = Column(String, nullable=True)
-    tokens_used = Column(Integer, default=0)
+    tokens_used = Column(Integer, default=0)          # prompt + completion, summed over llm_calls
     
     # Output content
-    content = Column(JSON, nullable=True)            # Raw generated content (adventure structure)
+    content = deferred(Column(JSON, nullable=True), group="payload")        # Raw generated content (adventure structure)
+    progress_text = deferred(Column(Text, nullable=True), group="payload")  # Streamed model output so far; cleared when done
     foundry_module_path = Column(String, nullable=True) # Path to ZIP file
     
     created_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
     
     campaign = relationship("Campaign")
+    llm_calls = relationship("LLMCall", back_populates="job", cascade="all, delete-orphan")
+
+
+class CampaignContextSection(Base):
+    """
+    One cached section of a campaign's context snapshot (see snapshot.py).
+    `version` is bumped whenever a row the section is built from changes; the
+    cached `data` is current while `built_version == version`.
+    """
+    __tablename__ = "campaign_context_sections"
+
+    campaign_id = Column(Integer, ForeignKey("campaigns.id"), primary_key=True)
+    section = Column(String, primary_key=True)  # campaign_name | reputations | missions | hexes | reports
+
+    version = Column(Integer, nullable=False, default=0)
+    built_version = Column(Integer, nullable=False, default=0)
+    data = Column(JSON, nullable=True)
+    built_at = Column(DateTime, nullable=True)
+
+
+class LLMCall(Base):
+    """One LLM request made for a generation job, for latency / token / cost reporting."""
+    __tablename__ = "llm_calls"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("generated_oneshots.id"), nullable=False, index=True)
+    campaign_id = Column(Integer, ForeignKey("campaigns.id"), nullable=False)
+
+    label = Column(String, nullable=True)      # pipeline stage: outline | act_scenes | npcs | pregens
+    model = Column(String, nullable=False)
+    stream = Column(Boolean, default=False, nullable=False)
+    cached = Column(Boolean, default=False, nullable=False)
+
+    prompt_tokens = Column(Integer, nullable=True)
+    completion_tokens = Column(Integer, nullable=True)
+    ttfb_ms = Column(Integer, nullable=True)
+    latency_ms = Column(Integer, nullable=True)
+    retries = Column(Integer, default=0, nullable=False)
+    error = Column(String, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    job = relationship("GeneratedOneShot", back_populates="llm_calls")
+
+    __table_args__ = (
+        Index("ix_llm_calls_campaign_created", "campaign_id", "created_at"),
+    )
@@ -0,0 +1,55 @@
+"""
+Live progress for one-shot jobs.
+
+While a job streams its outline, the worker appends each delta here (for
+subscribers in the same process) and periodically flushes the text so far to
+`GeneratedOneShot.progress_text` (for subscribers connected to another gunicorn
+worker). The SSE endpoint reads from whichever is available.
+"""
+import asyncio
+from typing import Dict, List, Optional, Set
+
+
+class ProgressHub:
+    def __init__(self):
+        self._parts: Dict[int, List[str]] = {}
+        self._waiters: Dict[int, Set[asyncio.Event]] = {}
+
+    def start(self, job_id: int) -> None:
+        self._parts[job_id] = []
+        self._wake(job_id)
+
+    def publish(self, job_id: int, delta: str) -> None:
+        self._parts.setdefault(job_id, []).append(delta)
+        self._wake(job_id)
+
+    def finish(self, job_id: int) -> None:
+        self._parts.pop(job_id, None)
+        self._wake(job_id)
+
+    def text(self, job_id: int) -> Optional[str]:
+        """Output so far if the job is streaming in this process, else None."""
+        parts = self._parts.get(job_id)
+        return "".join(parts) if parts is not None else None
+
+    async def wait(self, job_id: int, timeout: float) -> None:
+        """Return on the next publish/finish for the job, or after `timeout` seconds."""
+        event = asyncio.Event()
+        waiters = self._waiters.setdefault(job_id, set())
+        waiters.add(event)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            waiters.discard(event)
+            if not waiters:
+                self._waiters.pop(job_id, None)
+
+    def _wake(self, job_id: int) -> None:
+        for event in self._waiters.get(job_id, ()):
+            event.set()
+
+
+# Singleton instance
+progress_hub = ProgressHub()
@@ -0,0 +1,276 @@
+"""
+Durable queue for one-shot generation jobs.
+
+`GeneratedOneShot` rows double as queue entries. The generate endpoint inserts
+a `pending` row and wakes the local worker pool. Every app process (each
+gunicorn worker) runs one pool, which claims pending rows by flipping them to
+`processing` and runs the pipeline with its own DB session, so a job no longer
+depends on the request that created it.
+
+`ONESHOT_MAX_CONCURRENT` caps `processing` rows across all processes.
+
+- Claiming is serialised with a transaction-level advisory lock plus
+  `FOR UPDATE SKIP LOCKED` on Postgres.
+- On SQLite it is a single conditional UPDATE that re-checks the cap.
+
+While a job runs, its worker refreshes `heartbeat_at`. Jobs whose heartbeat
+goes stale (the process crashed or was killed) are put back to `pending`, or
+marked `failed` once they have used `ONESHOT_MAX_ATTEMPTS` attempts; a run that
+raises is handled the same way by `OneShotService.process_generation`. A worker
+that finds its claim gone cancels its run, and the result is only written while
+the claim is still held, so a recovered job is never finished twice.
+"""
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional, Set
+
+from sqlalchemy import and_, func, or_, select, text
+from sqlalchemy.orm import Session, aliased
+
+from ...config import get_settings
+from ...database import SessionLocal
+from .models import GeneratedOneShot
+from .service import OneShotService
+
+logger = logging.getLogger(__name__)
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# pg_advisory_xact_lock key serialising claims across processes.
+_CLAIM_LOCK_KEY = 0x4F4E4553
+
+
+def _utcnow() -> datetime:
+    # Naive UTC, matching what the DateTime columns store.
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def queue_depth(db: Session) -> int:
+    return db.query(func.count(GeneratedOneShot.id)).filter(GeneratedOneShot.status == "pending").scalar()
+
+
+def running_count(db: Session) -> int:
+    return db.query(func.count(GeneratedOneShot.id)).filter(GeneratedOneShot.status == "processing").scalar()
+
+
+def claim_next(db: Session, max_concurrent: int, worker_id: str = WORKER_ID) -> Optional[int]:
+    """Move the oldest pending job to `processing` if a slot is free. Returns its id, or None."""
+    is_postgres = db.get_bind().dialect.name == "postgresql"
+    if is_postgres:
+        db.execute(text("SELECT pg_advisory_xact_lock(:k)"), {"k": _CLAIM_LOCK_KEY})
+
+    processing = select(func.count(GeneratedOneShot.id)).where(GeneratedOneShot.status == "processing")
+    if db.execute(processing).scalar() >= max_concurrent:
+        db.commit()  # ends the transaction (and the advisory lock) without writing anything
+        return None
+
+    candidate = db.query(GeneratedOneShot.id).filter(GeneratedOneShot.status == "pending").order_by(GeneratedOneShot.id)
+    if is_postgres:
+        candidate = candidate.with_for_update(skip_locked=True)
+    job_id = candidate.limit(1).scalar()
+    if job_id is None:
+        db.commit()
+        return None
+
+    # The status and cap are re-checked in the UPDATE itself, which is what makes the
+    # transition atomic on SQLite where there is no row locking to lean on. The count
+    # runs over an alias so it isn't correlated to the row being updated.
+    other = aliased(GeneratedOneShot)
+    in_flight = select(func.count(other.id)).where(other.status == "processing").scalar_subquery()
+    claimed = db.query(GeneratedOneShot).filter(
+        GeneratedOneShot.id == job_id,
+        GeneratedOneShot.status == "pending",
+        in_flight < max_concurrent,
+    ).update(
+        {
+            GeneratedOneShot.status: "processing",
+            GeneratedOneShot.claimed_by: worker_id,
+            GeneratedOneShot.heartbeat_at: _utcnow(),
+            GeneratedOneShot.attempts: GeneratedOneShot.attempts + 1,
+        },
+        synchronize_session=False,
+    )
+    db.commit()
+    return job_id if claimed else None
+
+
+def heartbeat(db: Session, job_id: int, worker_id: str = WORKER_ID) -> bool:
+    """Refresh a claimed job's heartbeat. False means the claim was lost (e.g. recovered elsewhere)."""
+    updated = db.query(GeneratedOneShot).filter(
+        GeneratedOneShot.id == job_id,
+        GeneratedOneShot.claimed_by == worker_id,
+        GeneratedOneShot.status == "processing",
+    ).update({GeneratedOneShot.heartbeat_at: _utcnow()}, synchronize_session=False)
+    db.commit()
+    return bool(updated)
+
+
+def recover_stale_jobs(db: Session, stale_after: float, max_attempts: int) -> int:
+    """Requeue (or fail, when out of attempts) `processing` jobs whose worker stopped heartbeating."""
+    cutoff = _utcnow() - timedelta(seconds=stale_after)
+    stale = and_(
+        GeneratedOneShot.status == "processing",
+        or_(GeneratedOneShot.heartbeat_at == None, GeneratedOneShot.heartbeat_at < cutoff),  # noqa: E711
+    )
+    requeued = db.query(GeneratedOneShot).filter(stale, GeneratedOneShot.attempts < max_attempts).update(
+        {
+            GeneratedOneShot.status: "pending",
+            GeneratedOneShot.claimed_by: None,
+            GeneratedOneShot.heartbeat_at: None,
+        },
+        synchronize_session=False,
+    )
+    failed = db.query(GeneratedOneShot).filter(stale, GeneratedOneShot.attempts >= max_attempts).update(
+        {
+            GeneratedOneShot.status: "failed",
+            GeneratedOneShot.claimed_by: None,
+            GeneratedOneShot.content: {"error": f"Generation was interrupted {max_attempts} times; giving up."},
+        },
+        synchronize_session=False,
+    )
+    db.commit()
+    if requeued or failed:
+        logger.warning("Recovered stale one-shot jobs", extra={"requeued": requeued, "failed": failed})
+    return requeued + failed
+
+
+def release_claimed(db: Session, worker_id: str = WORKER_ID) -> int:
+    """Hand this worker's in-flight jobs back to the queue on a clean shutdown (not counted as an attempt)."""
+    released = db.query(GeneratedOneShot).filter(
+        GeneratedOneShot.claimed_by == worker_id,
+        GeneratedOneShot.status == "processing",
+    ).update(
+        {
+            GeneratedOneShot.status: "pending",
+            GeneratedOneShot.claimed_by: None,
+            GeneratedOneShot.heartbeat_at: None,
+            GeneratedOneShot.attempts: GeneratedOneShot.attempts - 1,
+        },
+        synchronize_session=False,
+    )
+    db.commit()
+    return released
+
+
+class OneShotWorkerPool:
+    """Per-process pool that claims and runs queued jobs, at most `max_concurrent` at a time."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        max_concurrent: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        stale_after: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        worker_id: str = WORKER_ID,
+    ):
+        settings = get_settings()
+        self.session_factory = session_factory
+        self.max_concurrent = max_concurrent or settings.ONESHOT_MAX_CONCURRENT
+        self.poll_interval = poll_interval or settings.ONESHOT_POLL_INTERVAL
+        self.stale_after = stale_after or settings.ONESHOT_STALE_AFTER
+        self.max_attempts = max_attempts or settings.ONESHOT_MAX_ATTEMPTS
+        self.heartbeat_interval = self.stale_after / 5
+        self.worker_id = worker_id
+
+        self._tasks: Set[asyncio.Task] = set()
+        self._wake: Optional[asyncio.Event] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        self._last_recovery: Optional[float] = None
+
+    @property
+    def running(self) -> int:
+        return len(self._tasks)
+
+    async def start(self) -> None:
+        if self._loop_task is not None and not self._loop_task.done():
+            return
+        self._wake = asyncio.Event()
+        self._loop_task = asyncio.create_task(self._run())
+        logger.info("One-shot worker pool started", extra={"worker_id": self.worker_id, "max_concurrent": self.max_concurrent})
+
+    def notify(self) -> None:
+        """Wake the pool so a freshly queued job is picked up without waiting for the next poll."""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def stop(self) -> None:
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        db = self.session_factory()
+        try:
+            released = release_claimed(db, self.worker_id)
+            if released:
+                logger.info("Released in-flight one-shot jobs on shutdown", extra={"released": released})
+        finally:
+            db.close()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                self._fill_slots(loop.time())
+            except Exception:
+                logger.exception("One-shot worker pool iteration failed")
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _fill_slots(self, now: float) -> None:
+        db = self.session_factory()
+        try:
+            if self._last_recovery is None or now - self._last_recovery >= self.heartbeat_interval:
+                recover_stale_jobs(db, self.stale_after, self.max_attempts)
+                self._last_recovery = now
+            while self.running < self.max_concurrent:
+                job_id = claim_next(db, self.max_concurrent, self.worker_id)
+                if job_id is None:
+                    return
+                task = asyncio.create_task(self._process(job_id))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        finally:
+            db.close()
+
+    async def _process(self, job_id: int) -> None:
+        db = self.session_factory()
+        beat = asyncio.create_task(self._heartbeat(job_id, asyncio.current_task()))
+        try:
+            await OneShotService(db).process_generation(job_id, stream=True, worker_id=self.worker_id)
+        except asyncio.CancelledError:
+            if not beat.done():
+                raise  # the pool is stopping
+            # The heartbeat lost the claim and cancelled the run.
+        finally:
+            beat.cancel()
+            db.close()
+            self.notify()
+
+    async def _heartbeat(self, job_id: int, work: asyncio.Task) -> None:
+        """Keep the claim fresh; if it was lost (recovered by another worker), stop the run."""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            db = self.session_factory()
+            try:
+                if not heartbeat(db, job_id, self.worker_id):
+                    logger.warning("Lost claim on one-shot job; cancelling it here", extra={"job_id": job_id})
+                    work.cancel()
+                    return
+            finally:
+                db.close()
+
+
+# Singleton instance
+oneshot_worker = OneShotWorkerPool()
@@ -1,14 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List
+import json
+import os
 
-from ...dependencies import get_db, get_current_user
+from ...dependencies import get_db, get_current_user, get_current_active_admin_user
 from ...modules.auth.models import User
-from .schemas import OneShotGenerateRequest, OneShotResponse, OneShotDetailResponse
+from .schemas import (
+    OneShotGenerateRequest, OneShotResponse, OneShotDetailResponse, CampaignContextSnapshot, LLMUsageStats,
+)
 from .service import OneShotService
+from .queue import oneshot_worker
+from .progress import progress_hub
+from .snapshot import get_snapshot
+from .models import GeneratedOneShot
+
+# Module ZIPs never change once built (a rebuild gets a new ETag), so clients may reuse them.
+MODULE_CACHE_CONTROL = "private, max-age=86400"
+
+# How long the SSE stream waits for a local delta before re-reading the job row.
+STREAM_POLL_SECONDS = 0.5
 
 router = APIRouter(
-    prefix="/oneshot",
     tags=["oneshot"],
     responses={404: {"description": "Not found"}},
 )
@@ -27,15 +41,65 @@ def list_oneshots(
     service = OneShotService(db)
     return service.list_jobs(current_user.campaign_id)
 
+@router.get("/context", response_model=CampaignContextSnapshot)
+def get_campaign_context(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_admin_user)
+):
+    """
+    The campaign context snapshot the generator works from (faction standing,
+    missions, discovered hexes, recent field reports). Stale sections are
+    rebuilt on read; `version` changes whenever any section does. DM only: the
+    missions section includes retired and undiscovered missions.
+    """
+    if not current_user.campaign_id:
+        raise HTTPException(status_code=400, detail="User not part of a campaign")
+    return get_snapshot(db, current_user.campaign_id)
+
+@router.get("/llm-stats", response_model=LLMUsageStats)
+def get_llm_stats(
+    days: int = Query(30, ge=1, le=365),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_admin_user)
+):
+    """
+    LLM usage for the campaign over the last `days` days: calls, tokens,
+    estimated cost, and latency / time-to-first-byte percentiles and histograms,
+    overall and per pipeline stage (outline, act_scenes, npcs, pregens).
+    """
+    if not current_user.campaign_id:
+        raise HTTPException(status_code=400, detail="User not part of a campaign")
+    return OneShotService(db).get_llm_stats(current_user.campaign_id, days)
+
+@router.get("/foundry-world")
+def export_campaign_foundry_module(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_admin_user)
+):
+    """
+    Export the whole campaign as a FoundryVTT module ZIP: completed one-shots,
+    missions, factions, hex notes, and each hex map as a hex-grid Scene.
+    Built fresh on each request, since any of it may have changed.
+    """
+    if not current_user.campaign_id:
+        raise HTTPException(status_code=400, detail="User not part of a campaign")
+    path = OneShotService(db).export_campaign_module(current_user.campaign_id)
+    return FileResponse(
+        path,
+        media_type="application/zip",
+        filename=os.path.basename(path),
+        headers={"Cache-Control": "no-store"},
+    )
+
 @router.post("/generate", response_model=OneShotResponse)
 async def generate_oneshot(
     request: OneShotGenerateRequest,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Start a background job to generate a One-Shot adventure.
+    Queue a job to generate a One-Shot adventure. The worker pool picks it up
+    once a slot under ONESHOT_MAX_CONCURRENT is free; poll GET /{job_id} for status.
     """
     # Verify campaign access (User must belong to a campaign)
     if not current_user.campaign_id:
@@ -44,8 +108,8 @@ async def generate_oneshot(
     service = OneShotService(db)
     job = service.create_generation_job(current_user.campaign_id, request)
 
-    # Launch background processing
-    background_tasks.add_task(service.process_generation, job.id)
+    # Wake the local worker pool; any process's pool may end up claiming it.
+    oneshot_worker.notify()
 
     return job
 
@@ -69,6 +133,67 @@ def get_oneshot_status(
 
     return job
 
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.get("/{job_id}/stream")
+async def stream_oneshot(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Server-sent events for a generation job: `status` on each status change,
+    `delta` with each new piece of the outline as the model writes it, then a
+    final `complete` or `error` event.
+    """
+    service = OneShotService(db)
+    job = service.get_job(job_id, with_content=False)
+    if not job:
+        raise HTTPException(status_code=404, detail="One-shot not found")
+    if job.campaign_id != current_user.campaign_id:
+        raise HTTPException(status_code=403, detail="Not authorized to view this one-shot")
+
+    async def events():
+        sent = 0
+        last_status = None
+        while True:
+            row = db.query(
+                GeneratedOneShot.status, GeneratedOneShot.title, GeneratedOneShot.progress_text
+            ).filter(GeneratedOneShot.id == job_id).one()
+            # End the read transaction so the next poll sees the worker's commits.
+            db.commit()
+
+            if row.status != last_status:
+                last_status = row.status
+                yield _sse("status", {"status": row.status})
+
+            # Live deltas if the job runs in this process, else whatever the worker last flushed.
+            text = progress_hub.text(job_id)
+            if text is None:
+                text = row.progress_text or ""
+            if len(text) > sent:
+                yield _sse("delta", {"text": text[sent:]})
+                sent = len(text)
+
+            if row.status == "completed":
+                yield _sse("complete", {"id": job_id, "title": row.title})
+                return
+            if row.status == "failed":
+                error = db.query(GeneratedOneShot.content).filter(GeneratedOneShot.id == job_id).scalar() or {}
+                yield _sse("error", {"error": error.get("error", "Generation failed")})
+                return
+
+            await progress_hub.wait(job_id, STREAM_POLL_SECONDS)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{job_id}/foundry-json")
 def get_oneshot_foundry_json(
     job_id: int,
@@ -98,3 +223,46 @@ def get_oneshot_foundry_json(
         return journal_data
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to format for Foundry: {str(e)}")
+
+
+@router.get("/{job_id}/foundry-module")
+def download_oneshot_foundry_module(
+    job_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Download the generated adventure as an installable FoundryVTT module ZIP.
+
+    The ZIP is written when generation completes and served from disk, with
+    ETag / Last-Modified validators and Range support for resumed downloads.
+    """
+    service = OneShotService(db)
+    job = service.get_job(job_id, with_content=False)
+    if not job:
+        raise HTTPException(status_code=404, detail="One-shot not found")
+
+    if job.campaign_id != current_user.campaign_id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    if job.status != "completed":
+        raise HTTPException(status_code=400, detail="Generation not complete")
+
+    try:
+        path = service.get_foundry_module(job)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to build Foundry module: {str(e)}")
+
+    response = FileResponse(
+        path,
+        media_type="application/zip",
+        filename=os.path.basename(path),
+        stat_result=os.stat(path),
+        headers={"Cache-Control": MODULE_CACHE_CONTROL},
+    )
+    # FileResponse answers If-Range itself but not If-None-Match.
+    etag = response.headers["etag"]
+    if etag in (t.strip() for t in request.headers.get("if-none-match", "").split(",")):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": MODULE_CACHE_CONTROL})
+    return response
@@ -17,12 +17,53 @@ class Act(BaseModel):
     scenes: List[SceneOutline]
     key_npcs: List[str]
 
+class NPCProfile(BaseModel):
+    name: str
+    role: str = ""
+    description: str = ""
+    motivation: str = ""
+    secret: str = ""
+
+class PregenCharacter(BaseModel):
+    name: str
+    species: str = ""
+    class_name: str = ""
+    level: int = 1
+    background: str = ""
+    hook: str = ""
+
 class AdventureStructure(BaseModel):
     title: str
     hook: str
     acts: List[Act]
     climax: str = "" # Description of the climax
     resolution: str
+    npcs: List[NPCProfile] = []          # Only with generate_npcs
+    pregens: List[PregenCharacter] = []  # Only with generate_pregens
+
+# --- Staged generation (outline first, then per-act scenes / NPCs / pregens) ---
+
+class ActPlan(BaseModel):
+    title: str
+    summary: str
+    key_npcs: List[str] = []
+    scene_names: List[str] = []
+
+class AdventureOutline(BaseModel):
+    title: str
+    hook: str
+    acts: List[ActPlan]
+    climax: str = ""
+    resolution: str
+
+class ActScenes(BaseModel):
+    scenes: List[SceneOutline]
+
+class NPCRoster(BaseModel):
+    npcs: List[NPCProfile]
+
+class PregenRoster(BaseModel):
+    pregens: List[PregenCharacter]
 
 # --- API Request/Response Schemas ---
 
@@ -44,6 +85,9 @@ class OneShotGenerateRequest(BaseModel):
     generate_npcs: bool = False
     generate_pregens: bool = False
 
+    # Skip the LLM response cache and force fresh completions (e.g. "regenerate")
+    bypass_cache: bool = False
+
 class OneShotResponse(BaseModel):
     id: int
     campaign_id: int
@@ -59,3 +103,42 @@ class OneShotDetailResponse(OneShotResponse):
     summary: Optional[str]
     content: Optional[Dict[str, Any]]
     generation_params: Dict[str, Any]
+    llm_model_used: Optional[str] = None
+    tokens_used: Optional[int] = None
+
+class CampaignContextSnapshot(BaseModel):
+    campaign_id: int
+    version: int
+    sections: Dict[str, Any]
+
+# --- LLM usage reporting ---
+
+class HistogramBucket(BaseModel):
+    le: Optional[int]  # upper bound in ms; None is the +Inf bucket
+    count: int
+
+class LatencySummary(BaseModel):
+    count: int
+    p50: Optional[int]
+    p95: Optional[int]
+    max: Optional[int]
+    histogram: List[HistogramBucket]
+
+class LLMStageStats(BaseModel):
+    label: str
+    calls: int
+    cached: int
+    errors: int
+    retries: int
+    prompt_tokens: int
+    completion_tokens: int
+    estimated_cost: float  # USD, from LLM_*_PRICE_PER_MTOK
+    latency_ms: LatencySummary
+    ttfb_ms: LatencySummary
+
+class LLMUsageStats(BaseModel):
+    campaign_id: int
+    since: datetime
+    jobs: int
+    total: LLMStageStats
+    stages: List[LLMStageStats]
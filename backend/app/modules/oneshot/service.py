@@ -1,20 +1,137 @@
-from sqlalchemy.orm import Session
-from datetime import datetime, timezone
+from sqlalchemy.orm import Session, load_only, undefer_group
+from datetime import datetime, timedelta, timezone
+import asyncio
+import bisect
 import json
+import math
 import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
 
-from .models import GeneratedOneShot
-from .schemas import OneShotGenerateRequest, AdventureStructure
-from .prompts.adventure import ADVENTURE_SYSTEM_PROMPT
-from ...llm_service import llm_service
-from ..campaigns.models import Campaign
-from ..missions.models import Mission
-from ..factions.models import FactionReputation
-from ..maps.models import HexMap, Hex
-from ..sessions.models import GameSession
+from pydantic import ValidationError
+
+from .models import GeneratedOneShot, LLMCall
+from .schemas import (
+    OneShotGenerateRequest, AdventureStructure, AdventureOutline, ActScenes, NPCRoster, PregenRoster,
+    ActPlan, SceneOutline, NPCProfile, PregenCharacter,
+)
+from .prompts.adventure import (
+    OUTLINE_SYSTEM_PROMPT, ACT_SCENES_SYSTEM_PROMPT, NPC_SYSTEM_PROMPT, PREGEN_SYSTEM_PROMPT, REPAIR_SYSTEM_PROMPT,
+)
+from ...config import get_settings
+from ...json_stream import JSONStreamParser, Path
+from ...llm_service import LLMCallStats, LLMService, PartialJSON, llm_service, record_llm_calls
+from .progress import progress_hub
+from .context import render_context
+from .snapshot import get_sources
+from .foundry.package import build_module_zip
+from .foundry.world import build_campaign_module_zip
 
 logger = logging.getLogger(__name__)
 
+# How often streamed output is copied to the DB for SSE readers in other processes.
+PROGRESS_FLUSH_SECONDS = 1.0
+
+
+# Stage schema -> (list field, item model, what an item is called), for validating and
+# repairing a stage's output one item at a time.
+FRAGMENTS = {
+    AdventureOutline: ("acts", ActPlan, "act"),
+    ActScenes: ("scenes", SceneOutline, "scene"),
+    NPCRoster: ("npcs", NPCProfile, "NPC"),
+    PregenRoster: ("pregens", PregenCharacter, "pregenerated character"),
+}
+
+
+def _reject_unplanned_truncation(response: Any, label: str, expected: Sequence[str] = (), count: Optional[int] = None) -> None:
+    """
+    A cut-off response can only be completed by repair when the stage knows how many
+    items it should have; otherwise accepting it would silently drop the missing ones,
+    so the stage fails and the job is retried (up to `ONESHOT_MAX_ATTEMPTS` times).
+    """
+    if isinstance(response, PartialJSON) and response.truncated and not expected and not count:
+        raise ValueError(f"The {label} output was cut off and there is no plan to complete it from")
+
+
+def _validation_error(item: Any, model) -> Optional[str]:
+    if isinstance(item, str):
+        return "It was not valid JSON."
+    try:
+        model.model_validate(item)
+    except ValidationError as e:
+        return str(e)
+    return None
+
+
+async def _gather_or_cancel(tasks: Sequence[asyncio.Future]) -> list:
+    """Await all of `tasks`; if one fails, cancel the rest before re-raising."""
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+# Upper bounds (ms) of the latency / TTFB histogram buckets; a final +Inf bucket is implied.
+LATENCY_BUCKETS_MS = (250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 120000)
+
+
+def _ms(seconds: Optional[float]) -> Optional[int]:
+    return round(seconds * 1000) if seconds is not None else None
+
+
+def build_foundry_module(job_id: int, content: dict) -> str:
+    """Write the job's Foundry module ZIP under `ONESHOT_OUTPUT_DIR/modules/` and return its path."""
+    output_dir = os.path.join(get_settings().ONESHOT_OUTPUT_DIR, "modules")
+    return build_module_zip(job_id, AdventureStructure(**content), output_dir)
+
+
+def _latency_summary(values: List[int]) -> dict:
+    values = sorted(values)
+
+    def percentile(q: float) -> Optional[int]:
+        # Nearest-rank percentile.
+        return values[max(0, math.ceil(q * len(values)) - 1)] if values else None
+
+    counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    for v in values:
+        counts[bisect.bisect_left(LATENCY_BUCKETS_MS, v)] += 1
+    return {
+        "count": len(values),
+        "p50": percentile(0.50),
+        "p95": percentile(0.95),
+        "max": values[-1] if values else None,
+        "histogram": [
+            {"le": le, "count": n} for le, n in zip(list(LATENCY_BUCKETS_MS) + [None], counts)
+        ],
+    }
+
+
+def _stage_stats(label: str, calls: List[LLMCall]) -> dict:
+    settings = get_settings()
+    prompt_tokens = sum(c.prompt_tokens or 0 for c in calls)
+    completion_tokens = sum(c.completion_tokens or 0 for c in calls)
+    # Cached calls never reached the API, so they skew neither timing nor cost.
+    live = [c for c in calls if not c.cached]
+    return {
+        "label": label,
+        "calls": len(calls),
+        "cached": len(calls) - len(live),
+        "errors": sum(1 for c in calls if c.error),
+        "retries": sum(c.retries for c in calls),
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "estimated_cost": round(
+            (prompt_tokens * settings.LLM_PROMPT_PRICE_PER_MTOK
+             + completion_tokens * settings.LLM_COMPLETION_PRICE_PER_MTOK) / 1_000_000, 6
+        ),
+        "latency_ms": _latency_summary([c.latency_ms for c in live if c.latency_ms is not None]),
+        "ttfb_ms": _latency_summary([c.ttfb_ms for c in live if c.ttfb_ms is not None]),
+    }
+
 class OneShotService:
     def __init__(self, db: Session):
         self.db = db
@@ -32,118 +149,212 @@ class OneShotService:
         self.db.refresh(db_job)
         return db_job
 
-    async def process_generation(self, job_id: int):
+    async def process_generation(self, job_id: int, stream: bool = False, worker_id: Optional[str] = None):
         """
-        Background task to run the generation pipeline.
-        Phase 1: Generate Adventure Outline.
+        Background task to run the generation pipeline (see `_generate_adventure`).
+
+        With `stream=True` the outline stage is streamed from the LLM and published to
+        `progress_hub` / `progress_text` as it arrives, for the SSE endpoint. A queue
+        worker passes its `worker_id`: the result is then only written while the job is
+        still claimed by that worker, so a job recovered elsewhere is finished only once.
         """
         logger.info(f"Starting generation job {job_id}")
-        job = self.db.query(GeneratedOneShot).filter(GeneratedOneShot.id == job_id).first()
+        job = self.get_job(job_id)
         if not job:
             logger.error(f"Job {job_id} not found")
             return
 
-        try:
-            job.status = "processing"
-            self.db.commit()
-            
-            # 1. Aggregate Context
-            context = self._aggregate_context(job.campaign_id, job.generation_params)
-            
-            # 2. Generate Adventure via LLM
-            adventure_json = await self._generate_adventure_outline(context, job.generation_params)
-            
-            # 3. Save Results
-            job.content = adventure_json
-            job.title = adventure_json.get("title", "Untitled Adventure")
-            job.summary = adventure_json.get("hook", "")
-            job.status = "completed"
-            job.completed_at = datetime.now(timezone.utc)
-            
-            self.db.commit()
-            logger.info(f"Job {job_id} completed successfully")
-            
-        except Exception as e:
-            logger.error(f"Job {job_id} failed: {str(e)}", exc_info=True)
-            job.status = "failed"
-            job.content = {"error": str(e)}
-            self.db.commit()
+        with record_llm_calls() as calls:
+            try:
+                job.status = "processing"
+                self.db.commit()
 
-    def _aggregate_context(self, campaign_id: int, params: dict) -> str:
-        """Collect campaign context for the LLM prompt."""
-        campaign = self.db.query(Campaign).filter(Campaign.id == campaign_id).first()
-        context_parts = [f"Campaign: {campaign.name}"]
-
-        # Revelation layer
-        revelation_layer = params.get("revelation_layer", "early")
-        layer_labels = {"early": "Early — Surface Complications", "mid": "Mid — Hidden Threads", "late": "Late — Campaign Revelations"}
-        context_parts.append(f"Revelation Layer: {layer_labels.get(revelation_layer, revelation_layer)}")
-
-        # Faction reputation levels
-        reputations = self.db.query(FactionReputation).filter(
-            FactionReputation.campaign_id == campaign_id
-        ).all()
-        if reputations:
-            rep_lines = [f"  - {r.faction_name}: {r.level:+d}" for r in reputations]
-            context_parts.append("Current Faction Standing:\n" + "\n".join(rep_lines))
-
-        # Mission inspirations
-        mission_ids = params.get("mission_ids", [])
-        if mission_ids:
-            missions = self.db.query(Mission).filter(Mission.id.in_(mission_ids)).all()
-            for m in missions:
-                context_parts.append(f"Mission Seed: {m.name} — {m.description or 'No description'}")
-
-        # Region focus
-        region = params.get("hex_region")
-        if region:
-            context_parts.append(f"Region Focus: {region}")
-
-        # Discovered hexes with state/faction
-        hex_map = self.db.query(HexMap).filter(HexMap.campaign_id == campaign_id).first()
-        if hex_map:
-            discovered = self.db.query(Hex).filter(
-                Hex.map_id == hex_map.id,
-                Hex.is_discovered == True  # noqa: E712
-            ).all()
-            if discovered:
-                hex_lines = []
-                for h in discovered:
-                    line = f"  - ({h.q},{h.r}) {h.terrain}"
-                    if h.hex_state and h.hex_state != "wilderness":
-                        line += f" [{h.hex_state.replace('_', ' ')}]"
-                    if h.controlling_faction:
-                        line += f" controlled by {h.controlling_faction}"
-                    if h.linked_location_name:
-                        line += f" — {h.linked_location_name}"
-                    notes = h.player_notes or []
-                    if notes:
-                        line += f" ({len(notes)} player note(s))"
-                    hex_lines.append(line)
-                context_parts.append("Known Hex Map (discovered hexes):\n" + "\n".join(hex_lines[:30]))
-
-        # Last 3 completed session field reports
-        recent_sessions = (
-            self.db.query(GameSession)
-            .filter(
-                GameSession.campaign_id == campaign_id,
-                GameSession.status == "Completed",
-                GameSession.field_report != None  # noqa: E711
-            )
-            .order_by(GameSession.session_date.desc())
-            .limit(3)
-            .all()
+                # 1. Aggregate Context
+                context = self._aggregate_context(job.campaign_id, job.generation_params)
+
+                # 2. Generate Adventure via LLM
+                adventure_json = await self._generate_adventure(
+                    context, job.generation_params, stream_job=job if stream else None
+                )
+
+                # 3. Save Results
+                result = {
+                    "content": adventure_json,
+                    "title": adventure_json.get("title", "Untitled Adventure"),
+                    "summary": adventure_json.get("hook", ""),
+                    "status": "completed",
+                    "completed_at": datetime.now(timezone.utc),
+                    "progress_text": None,
+                }
+
+                # 4. Package for Foundry. The adventure is saved either way;
+                # the download endpoint rebuilds a missing package on demand.
+                try:
+                    result["foundry_module_path"] = await asyncio.to_thread(
+                        build_foundry_module, job.id, adventure_json
+                    )
+                except Exception as e:
+                    logger.warning(f"Job {job_id}: Foundry module build failed: {e}", exc_info=True)
+
+                if self._finish(job, result, worker_id, calls):
+                    logger.info(f"Job {job_id} completed successfully")
+
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {str(e)}", exc_info=True)
+                self._finish(job, self._failure(job, e, worker_id), worker_id, calls)
+            finally:
+                if stream:
+                    progress_hub.finish(job_id)
+
+    @staticmethod
+    def _failure(job: GeneratedOneShot, error: Exception, worker_id: Optional[str]) -> Dict[str, Any]:
+        """
+        A queued job goes back to `pending` for another worker while it has attempts left
+        (`ONESHOT_MAX_ATTEMPTS`, counted by `queue.claim_next`); otherwise it fails.
+        """
+        if worker_id is not None and (job.attempts or 0) < get_settings().ONESHOT_MAX_ATTEMPTS:
+            return {"status": "pending", "claimed_by": None, "heartbeat_at": None, "progress_text": None}
+        return {"status": "failed", "content": {"error": str(error)}, "progress_text": None}
+
+    def _finish(self, job: GeneratedOneShot, values: Dict[str, Any], worker_id: Optional[str], calls: List[LLMCallStats]) -> bool:
+        """
+        Write the job's outcome and its LLM calls. With a `worker_id` the outcome is only
+        written while that worker still holds the claim (the same guard as `queue.heartbeat`);
+        returns False if the claim was lost. The calls are recorded either way.
+        """
+        self._save_llm_calls(job, calls)
+        query = self.db.query(GeneratedOneShot).filter(GeneratedOneShot.id == job.id)
+        if worker_id is not None:
+            query = query.filter(GeneratedOneShot.claimed_by == worker_id, GeneratedOneShot.status == "processing")
+        written = query.update(values, synchronize_session="fetch")
+        self.db.commit()
+        if not written:
+            logger.warning(f"Job {job.id}: claim lost to another worker; result discarded")
+        return bool(written)
+
+    def _save_llm_calls(self, job: GeneratedOneShot, calls: List[LLMCallStats]) -> None:
+        """Persist per-call stats and add this attempt's tokens to the job's running total."""
+        for c in calls:
+            self.db.add(LLMCall(
+                job_id=job.id,
+                campaign_id=job.campaign_id,
+                label=c.label,
+                model=c.model,
+                stream=c.stream,
+                cached=c.cached,
+                prompt_tokens=c.prompt_tokens,
+                completion_tokens=c.completion_tokens,
+                ttfb_ms=_ms(c.ttfb),
+                latency_ms=_ms(c.latency),
+                retries=c.retries,
+                error=c.error[:500] if c.error else None,
+            ))
+        job.tokens_used = (job.tokens_used or 0) + sum(
+            (c.prompt_tokens or 0) + (c.completion_tokens or 0) for c in calls
         )
-        if recent_sessions:
-            report_parts = []
-            for s in recent_sessions:
-                report_parts.append(f"  [{s.name}]: {s.field_report}")
-            context_parts.append("Recent Field Reports from the Board:\n" + "\n".join(report_parts))
+        models = list(dict.fromkeys(c.model for c in calls))
+        if models:
+            job.llm_model_used = ", ".join(models)
 
-        return "\n\n".join(context_parts)
+    def _aggregate_context(self, campaign_id: int, params: dict) -> str:
+        """Collect campaign context for the LLM prompt, ranked and packed under the token budget."""
+        return render_context(get_sources(self.db, campaign_id), params)
 
-    async def _generate_adventure_outline(self, context: str, params: dict) -> dict:
-        """Call LLM service to generate the 3-act structure."""
+    async def _generate_adventure(
+        self, context: str, params: dict, stream_job: GeneratedOneShot = None
+    ) -> dict:
+        """
+        Staged generation: one outline call, then the per-act scene calls (plus the
+        NPC / pregen calls when requested) concurrently, at most
+        `ONESHOT_PARALLEL_CALLS` in flight. The merged result is validated against
+        `AdventureStructure`.
+        """
+        cache = not params.get("bypass_cache", False)
+        limit = asyncio.Semaphore(get_settings().ONESHOT_PARALLEL_CALLS)
+        outline = await self._generate_adventure_outline(context, params, stream_job=stream_job, limit=limit)
+        outline_json = json.dumps(outline, indent=2)
+
+        async def call(label: str, system_prompt: str, user_prompt: str, schema, where: str = "",
+                       expected: Sequence[str] = (), count: Optional[int] = None) -> dict:
+            async with limit:
+                response = await llm_service.generate(
+                    system_prompt=system_prompt,
+                    user_prompt=user_prompt,
+                    json_schema=schema.model_json_schema(),
+                    temperature=0.7,
+                    cache=cache,
+                    label=label,
+                    validate=schema.model_validate,
+                )
+            if isinstance(response, str):
+                response = json.loads(response)
+            _reject_unplanned_truncation(response, label, expected, count)
+            response = await self._repair_items(response, schema, user_prompt, cache, limit, where, expected, count=count)
+            return schema.model_validate(response).model_dump()
+
+        stages = [
+            call("act_scenes", ACT_SCENES_SYSTEM_PROMPT, self._act_prompt(context, params, outline_json, number), ActScenes,
+                 where=f" of Act {number}", expected=act.get("scene_names") or ())
+            for number, act in enumerate(outline["acts"], 1)
+        ]
+        if params.get("generate_npcs"):
+            stages.append(call("npcs", NPC_SYSTEM_PROMPT, self._stage_prompt(context, params, outline_json,
+                "Write profiles for the key NPCs of this adventure now."), NPCRoster))
+        if params.get("generate_pregens"):
+            stages.append(call("pregens", PREGEN_SYSTEM_PROMPT, self._stage_prompt(context, params, outline_json,
+                f"Create {params.get('party_size')} pregenerated characters at level {params.get('party_level')} now."),
+                PregenRoster, count=params.get("party_size")))
+
+        # Tasks rather than bare coroutines so one failed stage cancels the rest.
+        results = await _gather_or_cancel([asyncio.ensure_future(stage) for stage in stages])
+
+        acts = [
+            {**{k: v for k, v in act.items() if k != "scene_names"}, "scenes": scenes["scenes"]}
+            for act, scenes in zip(outline["acts"], results)
+        ]
+        extra = iter(results[len(acts):])
+        adventure = {
+            **{k: v for k, v in outline.items() if k != "acts"},
+            "acts": acts,
+            "npcs": next(extra)["npcs"] if params.get("generate_npcs") else [],
+            "pregens": next(extra)["pregens"] if params.get("generate_pregens") else [],
+        }
+        return AdventureStructure.model_validate(adventure).model_dump()
+
+    @staticmethod
+    def _stage_prompt(context: str, params: dict, outline_json: str, instruction: str) -> str:
+        return f"""
+CAMPAIGN CONTEXT:
+{context}
+
+PARAMETERS:
+- Party Size: {params.get('party_size')}
+- Level: {params.get('party_level')}
+- Duration: {params.get('duration_hours')} hours
+- Tone: {params.get('tone')}
+- Revelation Layer: {params.get('revelation_layer', 'early')}
+
+ADVENTURE OUTLINE:
+{outline_json}
+
+{instruction}
+"""
+
+    def _act_prompt(self, context: str, params: dict, outline_json: str, number: int) -> str:
+        return self._stage_prompt(
+            context, params, outline_json,
+            f"Write the full scenes for Act {number} now. Only Act {number}; the other acts are written separately.",
+        )
+
+    async def _generate_adventure_outline(
+        self, context: str, params: dict, stream_job: GeneratedOneShot = None,
+        limit: Optional[asyncio.Semaphore] = None,
+    ) -> dict:
+        """
+        Call LLM service to generate the 3-act skeleton, streaming into `stream_job` if given.
+        While streaming, each act is validated as soon as it is complete, and a broken one
+        is sent for repair while the rest of the outline is still arriving.
+        """
         user_prompt = f"""
 CAMPAIGN CONTEXT:
 {context}
@@ -158,25 +369,195 @@ PARAMETERS:
 Generate a 3-Act adventure outline now. The session must be framed as a question, not an objective. Use proper in-world nouns (Collegium, Limes, Meridian, Vincula). Match encounter difficulty and revelation depth to the revelation layer provided.
 """
         
-        # Using the schema logic purely for prompt instruction in Phase 1
-        # In future phases we might pass the schema object directly if LLM library supports it
-        response = await llm_service.generate(
-            system_prompt=ADVENTURE_SYSTEM_PROMPT,
+        cache = not params.get("bypass_cache", False)
+        limit = limit or asyncio.Semaphore(get_settings().ONESHOT_PARALLEL_CALLS)
+        request = dict(
+            system_prompt=OUTLINE_SYSTEM_PROMPT,
             user_prompt=user_prompt,
-            json_schema=AdventureStructure.model_json_schema(),
-            temperature=0.7
+            json_schema=AdventureOutline.model_json_schema(),
+            temperature=0.7,
+            cache=cache,
+            label="outline",
+            validate=AdventureOutline.model_validate,
         )
-        
+        repairs: Dict[int, asyncio.Future] = {}
+        if stream_job is not None:
+            def check_act(path: Path, value: Any) -> None:
+                if len(path) != 2 or path[0] != "acts" or len(repairs) >= get_settings().ONESHOT_MAX_REPAIRS:
+                    return
+                error = _validation_error(value, ActPlan)
+                if error:
+                    repairs[path[1]] = asyncio.ensure_future(
+                        self._repair_item(AdventureOutline, path[1], value, error, user_prompt, cache, limit)
+                    )
+
+            try:
+                text = await self._stream_to_job(stream_job, request, on_value=check_act)
+            except BaseException:
+                for task in repairs.values():
+                    task.cancel()
+                await asyncio.gather(*repairs.values(), return_exceptions=True)
+                raise
+            response = LLMService.parse_json(text, partial=True)
+            _reject_unplanned_truncation(response, "outline")
+        else:
+            response = await llm_service.generate(**request)
+            if isinstance(response, str):
+                # Attempt to parse if returned as string (fallback)
+                response = json.loads(response)
+            _reject_unplanned_truncation(response, "outline")
+        response = await self._repair_items(response, AdventureOutline, user_prompt, cache, limit, started=repairs)
+        return AdventureOutline.model_validate(response).model_dump()
+
+    async def _repair_items(
+        self, response: dict, schema, base_prompt: str, cache: bool, limit: asyncio.Semaphore,
+        where: str = "", expected: Sequence[str] = (), started: Optional[Dict[int, asyncio.Future]] = None,
+        count: Optional[int] = None,
+    ) -> dict:
+        """
+        Validate each item of a stage's list (acts, scenes, NPCs, pregens) on its own and
+        regenerate only those that fail, or that are missing because the output was cut
+        short (`expected` names the items the outline planned; `count` is how many were
+        asked for when they have no names, e.g. one pregen per player). `started` holds
+        repairs already running for items found broken while the output streamed.
+        """
+        key, model, _ = FRAGMENTS[schema]
+        items = response.get(key) if isinstance(response, dict) else None
+        repairs = dict(started or {})
+        if not isinstance(items, list):
+            # Nothing to fix item by item; the stage's own validation reports the problem.
+            await _gather_or_cancel(list(repairs.values()))
+            return response
+
+        broken = {}
+        for i, item in enumerate(items):
+            if i not in repairs:
+                error = _validation_error(item, model)
+                if error:
+                    broken[i] = (item, error)
+        for i in range(len(items), max(len(expected), count or 0)):
+            broken[i] = (None, None)
+        if len(repairs) + len(broken) > get_settings().ONESHOT_MAX_REPAIRS:
+            for task in repairs.values():
+                task.cancel()
+            await asyncio.gather(*repairs.values(), return_exceptions=True)
+            raise ValueError(f"{len(repairs) + len(broken)} invalid {key}{where}; too many to repair one by one")
+        for i, (item, error) in broken.items():
+            name = expected[i] if i < len(expected) else None
+            repairs[i] = asyncio.ensure_future(
+                self._repair_item(schema, i, item, error, base_prompt, cache, limit, where, name)
+            )
+        if not repairs:
+            return response
+
+        logger.info(f"Repairing {key} {sorted(i + 1 for i in repairs)}{where}")
+        results = await _gather_or_cancel(list(repairs.values()))
+        items = list(items) + [None] * (max(repairs) + 1 - len(items))
+        for i, value in zip(repairs, results):
+            items[i] = value
+        return {**response, key: items}
+
+    async def _repair_item(
+        self, schema, index: int, item: Any, error: Optional[str], base_prompt: str, cache: bool,
+        limit: asyncio.Semaphore, where: str = "", name: Optional[str] = None,
+    ) -> dict:
+        """Regenerate item `index` of a stage's list with the repair prompt, given what was wrong with it."""
+        _, model, noun = FRAGMENTS[schema]
+        description = f"{noun} {index + 1}{where}" + (f' ("{name}")' if name else "")
+        if item is None:
+            problem = f"{description[0].upper() + description[1:]} is missing: the output was cut off before it."
+        else:
+            previous = item if isinstance(item, str) else json.dumps(item, indent=2)
+            problem = f"The attempt at {description} was:\n{previous}\n\nIt was rejected because:\n{error}"
+        user_prompt = f"""{base_prompt}
+{problem}
+
+Rewrite {description} now, as one JSON object matching this schema:
+{json.dumps(model.model_json_schema(), indent=2)}
+"""
+        async with limit:
+            response = await llm_service.generate(
+                system_prompt=REPAIR_SYSTEM_PROMPT,
+                user_prompt=user_prompt,
+                json_schema=model.model_json_schema(),
+                temperature=0.7,
+                cache=cache,
+                label="repair",
+                validate=model.model_validate,
+            )
         if isinstance(response, str):
-            # Attempt to parse if returned as string (fallback)
-            return json.loads(response)
-        return response
+            response = json.loads(response)
+        return model.model_validate(response).model_dump()
+
+    async def _stream_to_job(
+        self, job: GeneratedOneShot, request: dict, on_value: Optional[Callable[[Path, Any], None]] = None
+    ) -> str:
+        """
+        Stream a completion, publishing deltas live and flushing the text so far to the job row.
+        `on_value` is called with each top-level field / list item as soon as it is complete.
+        """
+        job_id = job.id
+        progress_hub.start(job_id)
+        parser = JSONStreamParser() if on_value else None
+        parts = []
+        last_flush = time.monotonic()
+        async for delta in await llm_service.generate(**request, stream=True):
+            parts.append(delta)
+            progress_hub.publish(job_id, delta)
+            if parser is not None:
+                for path, value in parser.feed(delta):
+                    on_value(path, value)
+            if time.monotonic() - last_flush >= PROGRESS_FLUSH_SECONDS:
+                job.progress_text = "".join(parts)
+                self.db.commit()
+                last_flush = time.monotonic()
+        return "".join(parts)
 
-    def get_job(self, job_id: int) -> GeneratedOneShot:
-        return self.db.query(GeneratedOneShot).filter(GeneratedOneShot.id == job_id).first()
+    def get_job(self, job_id: int, with_content: bool = True) -> GeneratedOneShot:
+        """The job, with its deferred payload (`content`, `generation_params`, `progress_text`) unless `with_content=False`."""
+        query = self.db.query(GeneratedOneShot).filter(GeneratedOneShot.id == job_id)
+        if with_content:
+            query = query.options(undefer_group("payload"))
+        return query.first()
+
+    def get_foundry_module(self, job: GeneratedOneShot) -> str:
+        """Path of the job's Foundry module ZIP, rebuilding it if it was never written or has gone missing."""
+        if job.foundry_module_path and os.path.isfile(job.foundry_module_path):
+            return job.foundry_module_path
+        job.foundry_module_path = build_foundry_module(job.id, job.content)
+        self.db.commit()
+        return job.foundry_module_path
+
+    def export_campaign_module(self, campaign_id: int) -> str:
+        """Write the campaign's Foundry module ZIP under `ONESHOT_OUTPUT_DIR/exports/` and return its path."""
+        output_dir = os.path.join(get_settings().ONESHOT_OUTPUT_DIR, "exports")
+        return build_campaign_module_zip(self.db, campaign_id, output_dir)
 
     def list_jobs(self, campaign_id: int):
+        # Only the columns OneShotResponse carries
         return self.db.query(GeneratedOneShot)\
+            .options(load_only(
+                GeneratedOneShot.id, GeneratedOneShot.campaign_id, GeneratedOneShot.title,
+                GeneratedOneShot.status, GeneratedOneShot.created_at, GeneratedOneShot.completed_at,
+            ))\
             .filter(GeneratedOneShot.campaign_id == campaign_id)\
             .order_by(GeneratedOneShot.created_at.desc())\
             .all()
+
+    def get_llm_stats(self, campaign_id: int, days: int = 30) -> dict:
+        """Token, cost and latency aggregates for the campaign's LLM calls, overall and per pipeline stage."""
+        since = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=days)
+        calls = self.db.query(LLMCall).filter(
+            LLMCall.campaign_id == campaign_id,
+            LLMCall.created_at >= since,
+        ).all()
+        by_label = {}
+        for c in calls:
+            by_label.setdefault(c.label or "unlabelled", []).append(c)
+        return {
+            "campaign_id": campaign_id,
+            "since": since,
+            "jobs": len({c.job_id for c in calls}),
+            "total": _stage_stats("all", calls),
+            "stages": [_stage_stats(label, group) for label, group in sorted(by_label.items())],
+        }
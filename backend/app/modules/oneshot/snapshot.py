@@ -0,0 +1,158 @@
+"""
+Materialized campaign context snapshots.
+
+The context builder's sections (campaign name, faction standing, missions,
+discovered hexes, recent field reports) are cached per campaign in
+`campaign_context_sections`, so a generation job or a dashboard reads them
+with one query instead of re-running every loader.
+
+A Session `after_flush` hook bumps the `version` of each section whose source
+rows were inserted, changed or deleted, on the same connection, so the
+invalidation commits or rolls back with the change. On read, only sections
+with `built_version < version` are reloaded. A rebuild records the version it
+started from, so a change that lands mid-rebuild leaves the section stale
+rather than hiding it.
+
+As with the search index, bulk `query.update()` / `query.delete()` calls
+bypass the hook; call `invalidate_campaign` (or `invalidate_all`) after them.
+"""
+from datetime import datetime, timezone
+from itertools import chain
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from ... import metrics
+from .context import ContextSources, SECTION_LOADERS, dump_section, load_section, restore_section
+from .models import CampaignContextSection
+from ..campaigns.models import Campaign
+from ..factions.models import FactionReputation
+from ..maps.models import HexMap, Hex
+from ..missions.models import Mission
+from ..sessions.models import GameSession
+
+_sections = CampaignContextSection.__table__
+
+# model -> (section it feeds, columns that affect the section)
+WATCHED: Dict[type, Tuple[str, Tuple[str, ...]]] = {
+    Campaign: ("campaign_name", ("name",)),
+    FactionReputation: ("reputations", ("faction_name", "level", "campaign_id")),
+    Mission: ("missions", ("name", "description", "region", "campaign_id")),
+    HexMap: ("hexes", ("campaign_id",)),
+    Hex: ("hexes", (
+        "q", "r", "terrain", "hex_state", "controlling_faction", "linked_location_name",
+        "linked_mission_id", "note_count", "is_discovered", "map_id",
+    )),
+    GameSession: ("reports", ("name", "status", "field_report", "session_date", "campaign_id")),
+}
+
+
+def _upsert(conn, values: Dict[str, Any], set_: Dict[str, Any]) -> None:
+    insert = pg_insert if conn.dialect.name == "postgresql" else sqlite_insert
+    stmt = insert(_sections).values(**values)
+    conn.execute(stmt.on_conflict_do_update(index_elements=["campaign_id", "section"], set_=set_))
+
+
+def invalidate(conn, campaign_id: int, section: str) -> None:
+    # Upsert rather than update: a rebuild that is in flight for a section with no
+    # row yet must still see its result marked stale.
+    _upsert(
+        conn,
+        {"campaign_id": campaign_id, "section": section, "version": 1, "built_version": 0},
+        {"version": _sections.c.version + 1},
+    )
+
+
+def invalidate_campaign(db: Session, campaign_id: int) -> None:
+    conn = db.connection()
+    for section in SECTION_LOADERS:
+        invalidate(conn, campaign_id, section)
+
+
+def invalidate_all(db: Session) -> None:
+    db.execute(update(_sections).values(version=_sections.c.version + 1))
+
+
+def _store(conn, campaign_id: int, section: str, version: int, data: Any) -> None:
+    built = {"data": data, "built_version": version, "built_at": datetime.now(timezone.utc)}
+    _upsert(conn, {"campaign_id": campaign_id, "section": section, "version": version, **built}, built)
+
+
+def get_snapshot(db: Session, campaign_id: int) -> Dict[str, Any]:
+    """
+    The campaign's context sections as JSON, rebuilding any that are stale.
+    `version` only grows, so callers can use it to tell whether anything changed.
+    """
+    rows = {
+        row.section: row
+        for row in db.execute(select(_sections).where(_sections.c.campaign_id == campaign_id)).all()
+    }
+    sections: Dict[str, Any] = {}
+    rebuilt = False
+    for section in SECTION_LOADERS:
+        row = rows.get(section)
+        if row is not None and row.built_version == row.version:
+            metrics.CACHE_LOOKUPS.labels("context_snapshot", "hit").inc()
+            sections[section] = row.data
+            continue
+        metrics.CACHE_LOOKUPS.labels("context_snapshot", "miss").inc()
+        version = row.version if row is not None else 0
+        sections[section] = dump_section(section, load_section(db, campaign_id, section))
+        _store(db.connection(), campaign_id, section, version, sections[section])
+        rebuilt = True
+    if rebuilt:
+        db.commit()
+
+    version = sum(row.version for row in rows.values())
+    return {"campaign_id": campaign_id, "version": version, "sections": sections}
+
+
+def get_sources(db: Session, campaign_id: int) -> ContextSources:
+    sections = get_snapshot(db, campaign_id)["sections"]
+    return ContextSources(**{name: restore_section(name, data) for name, data in sections.items()})
+
+
+# --- Invalidation hook --------------------------------------------------------
+
+def _changed(obj, columns: Tuple[str, ...]) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in columns)
+
+
+def _campaign_ids(obj, campaign_of_map) -> Iterable[Optional[int]]:
+    if isinstance(obj, Campaign):
+        return [obj.id]
+    if isinstance(obj, Hex):
+        history = inspect(obj).attrs.map_id.history
+        return [campaign_of_map(m) for m in chain(history.unchanged or (), history.added or (), history.deleted or ())]
+    # A record moved between campaigns invalidates both.
+    history = inspect(obj).attrs.campaign_id.history
+    return chain(history.unchanged or (), history.added or (), history.deleted or ())
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_snapshots(session: Session, flush_context) -> None:
+    changed = [o for o in chain(session.new, session.deleted) if type(o) in WATCHED]
+    changed += [o for o in session.dirty if type(o) in WATCHED and _changed(o, WATCHED[type(o)][1])]
+    if not changed:
+        return
+
+    conn = session.connection()
+    maps: Dict[int, Optional[int]] = {}
+
+    def campaign_of_map(map_id: int) -> Optional[int]:
+        if map_id not in maps:
+            maps[map_id] = conn.execute(select(HexMap.campaign_id).where(HexMap.id == map_id)).scalar()
+        return maps[map_id]
+
+    stale: Set[Tuple[int, str]] = set()
+    for obj in changed:
+        section = WATCHED[type(obj)][0]
+        for campaign_id in _campaign_ids(obj, campaign_of_map):
+            if campaign_id is not None:
+                stale.add((campaign_id, section))
+    for campaign_id, section in sorted(stale):
+        invalidate(conn, campaign_id, section)
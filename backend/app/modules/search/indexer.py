@@ -0,0 +1,184 @@
+"""
+Keeps `search_documents` in step with the records it indexes.
+
+A Session `after_flush` hook looks at the flushed missions, items, sessions,
+ledger entries, hexes and hex notes, and upserts or deletes their search documents on the
+same connection, so the index commits or rolls back with the change itself.
+Bulk `query.update()` / `query.delete()` calls bypass the ORM and therefore this
+hook; use `service.reindex_campaign` after those.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, inspect, select, update, delete, insert
+from sqlalchemy.orm import Session
+
+from .models import SearchDocument
+from ..missions.models import Mission
+from ..items.models import Item
+from ..sessions.models import GameSession
+from ..ledger.models import LedgerEntry
+from ..maps.models import Hex, HexMap, HexNote
+
+_docs = SearchDocument.__table__
+
+
+@dataclass
+class Doc:
+    source_type: str
+    source_id: int
+    campaign_id: int
+    title: str
+    body: str
+    visibility: str = "all"
+
+
+def _join(*parts: Optional[str]) -> str:
+    return "\n\n".join(p for p in parts if p)
+
+
+def _mission_docs(m: Mission, campaign_of_map) -> List[Doc]:
+    hidden = bool(m.is_retired) or m.is_discoverable is False
+    return [Doc("mission", m.id, m.campaign_id, m.name, m.description or "", "admin" if hidden else "all")]
+
+
+def _item_docs(i: Item, campaign_of_map) -> List[Doc]:
+    return [Doc("item", i.id, i.campaign_id, i.name, i.description or "")]
+
+
+def _session_docs(s: GameSession, campaign_of_map) -> List[Doc]:
+    return [Doc("session", s.id, s.campaign_id, s.name, _join(s.description, s.field_report, s.after_action_report))]
+
+
+def _ledger_docs(e: LedgerEntry, campaign_of_map) -> List[Doc]:
+    return [Doc("ledger", e.id, e.campaign_id, e.event_type, e.description or "")]
+
+
+def _hex_title(h: Hex) -> str:
+    return h.linked_location_name or f"Hex ({h.q}, {h.r})"
+
+
+def _hex_visibility(h: Hex) -> str:
+    return "all" if h.is_discovered else "admin"
+
+
+def _hex_docs(h: Hex, campaign_of_map) -> List[Doc]:
+    campaign_id = campaign_of_map(h.map_id)
+    if campaign_id is None:
+        return []
+    title = _hex_title(h)
+    docs = [Doc("hex", h.id, campaign_id, title, h.linked_location_name or "", _hex_visibility(h))]
+    if h.notes:
+        docs.append(Doc("hex_dm_notes", h.id, campaign_id, title, h.notes, "admin"))
+    return docs
+
+
+def _hex_note_docs(n: HexNote, campaign_of_map) -> List[Doc]:
+    # One document per note, so adding a note never rewrites the hex's document.
+    # The note takes its hex's title and visibility; see `_restamp_hex_notes`.
+    campaign_id = campaign_of_map(n.hex.map_id)
+    if campaign_id is None:
+        return []
+    return [Doc("hex_note", n.id, campaign_id, _hex_title(n.hex), n.text, _hex_visibility(n.hex))]
+
+
+def _restamp_hex_notes(conn, h: Hex, campaign_of_map) -> None:
+    """Carry a changed hex's title, visibility and campaign over to its note documents in one statement."""
+    note_ids = select(HexNote.id).where(HexNote.hex_id == h.id)
+    notes = (_docs.c.source_type == "hex_note") & _docs.c.source_id.in_(note_ids)
+    campaign_id = campaign_of_map(h.map_id)
+    if campaign_id is None:
+        conn.execute(delete(_docs).where(notes))
+        return
+    conn.execute(update(_docs).where(notes).values(
+        campaign_id=campaign_id, title=_hex_title(h), visibility=_hex_visibility(h),
+        updated_at=datetime.now(timezone.utc),
+    ))
+
+
+# model -> (source types it owns, columns that affect its documents, extractor)
+INDEXED: Dict[type, Tuple[Tuple[str, ...], Tuple[str, ...], Callable]] = {
+    Mission: (("mission",), ("name", "description", "is_retired", "is_discoverable", "campaign_id"), _mission_docs),
+    Item: (("item",), ("name", "description", "campaign_id"), _item_docs),
+    GameSession: (("session",), ("name", "description", "field_report", "after_action_report", "campaign_id"), _session_docs),
+    LedgerEntry: (("ledger",), ("event_type", "description", "campaign_id"), _ledger_docs),
+    Hex: (("hex", "hex_dm_notes"), ("linked_location_name", "notes", "is_discovered", "map_id"), _hex_docs),
+    HexNote: (("hex_note",), ("text", "hex_id"), _hex_note_docs),
+}
+
+
+def _map_campaign_lookup(conn):
+    cache: Dict[int, Optional[int]] = {}
+
+    def lookup(map_id: int) -> Optional[int]:
+        if map_id not in cache:
+            cache[map_id] = conn.execute(
+                select(HexMap.campaign_id).where(HexMap.id == map_id)
+            ).scalar()
+        return cache[map_id]
+
+    return lookup
+
+
+def write_documents(conn, source_types: Tuple[str, ...], source_id: int, docs: List[Doc]) -> None:
+    """Upsert `docs` and drop any of the source's other document types that no longer apply."""
+    now = datetime.now(timezone.utc)
+    kept = set()
+    for doc in docs:
+        kept.add(doc.source_type)
+        values = {
+            "campaign_id": doc.campaign_id,
+            "title": doc.title or "",
+            "body": doc.body or "",
+            "visibility": doc.visibility,
+            "updated_at": now,
+        }
+        result = conn.execute(
+            update(_docs)
+            .where(_docs.c.source_type == doc.source_type, _docs.c.source_id == doc.source_id)
+            .values(**values)
+        )
+        if result.rowcount == 0:
+            conn.execute(insert(_docs).values(source_type=doc.source_type, source_id=doc.source_id, **values))
+    stale = [t for t in source_types if t not in kept]
+    if stale:
+        remove_documents(conn, tuple(stale), source_id)
+
+
+def remove_documents(conn, source_types: Tuple[str, ...], source_id: int) -> None:
+    conn.execute(delete(_docs).where(_docs.c.source_type.in_(source_types), _docs.c.source_id == source_id))
+
+
+def index_object(conn, obj, campaign_of_map=None) -> None:
+    source_types, _, extract = INDEXED[type(obj)]
+    campaign_of_map = campaign_of_map or _map_campaign_lookup(conn)
+    write_documents(conn, source_types, obj.id, extract(obj, campaign_of_map))
+
+
+def _needs_reindex(obj, watched: Tuple[str, ...]) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in watched)
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_search_documents(session: Session, flush_context) -> None:
+    changed = [
+        o for o in session.dirty
+        if type(o) in INDEXED and _needs_reindex(o, INDEXED[type(o)][1])
+    ]
+    pending = [o for o in session.new if type(o) in INDEXED] + changed
+    deleted = [o for o in session.deleted if type(o) in INDEXED]
+    if not pending and not deleted:
+        return
+
+    conn = session.connection()
+    campaign_of_map = _map_campaign_lookup(conn)
+    for obj in pending:
+        index_object(conn, obj, campaign_of_map)
+    # A new hex has no notes yet; an existing one passes its changes on to them.
+    for obj in changed:
+        if type(obj) is Hex:
+            _restamp_hex_notes(conn, obj, campaign_of_map)
+    for obj in deleted:
+        remove_documents(conn, INDEXED[type(obj)][0], obj.id)
@@ -0,0 +1,86 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, UniqueConstraint, DDL, event
+from datetime import datetime, timezone
+from ...database import Base
+
+
+class SearchDocument(Base):
+    """
+    One searchable row per indexed source record (mission, item, session, ...).
+    The dialect-specific full-text index sits on top of this table: an FTS5
+    external-content table on SQLite, a generated tsvector + GIN index on Postgres.
+    """
+    __tablename__ = "search_documents"
+
+    id = Column(Integer, primary_key=True, index=True)
+    campaign_id = Column(Integer, ForeignKey("campaigns.id"), nullable=False, index=True)
+
+    source_type = Column(String, nullable=False)  # mission | item | session | ledger | hex | hex_dm_notes
+    source_id = Column(Integer, nullable=False)
+
+    title = Column(String, nullable=False, default="")
+    body = Column(String, nullable=False, default="")
+
+    # "all" = visible to every campaign member, "admin" = DM only (hidden missions, DM notes)
+    visibility = Column(String, nullable=False, default="all")
+
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("source_type", "source_id", name="uq_search_document_source"),
+    )
+
+
+# --- Dialect-specific full-text index DDL -------------------------------------
+# Shared with the migration so create_all() (tests, fresh dev DBs) and Alembic
+# produce the same structures.
+
+SQLITE_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_documents_fts USING fts5(
+        title, body, content='search_documents', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_documents_ai AFTER INSERT ON search_documents BEGIN
+        INSERT INTO search_documents_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_documents_ad AFTER DELETE ON search_documents BEGIN
+        INSERT INTO search_documents_fts(search_documents_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_documents_au AFTER UPDATE ON search_documents BEGIN
+        INSERT INTO search_documents_fts(search_documents_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO search_documents_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+]
+
+SQLITE_FTS_DROP_DDL = [
+    "DROP TRIGGER IF EXISTS search_documents_au",
+    "DROP TRIGGER IF EXISTS search_documents_ad",
+    "DROP TRIGGER IF EXISTS search_documents_ai",
+    "DROP TABLE IF EXISTS search_documents_fts",
+]
+
+POSTGRES_FTS_DDL = [
+    """
+    ALTER TABLE search_documents ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(body, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_search_documents_search_vector ON search_documents USING GIN (search_vector)",
+]
+
+for _stmt in SQLITE_FTS_DDL:
+    event.listen(SearchDocument.__table__, "after_create", DDL(_stmt).execute_if(dialect="sqlite"))
+for _stmt in SQLITE_FTS_DROP_DDL:
+    event.listen(SearchDocument.__table__, "before_drop", DDL(_stmt).execute_if(dialect="sqlite"))
+for _stmt in POSTGRES_FTS_DDL:
+    event.listen(SearchDocument.__table__, "after_create", DDL(_stmt).execute_if(dialect="postgresql"))
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
+from sqlalchemy.orm import Session
+
+from ...dependencies import get_db, get_current_active_user, get_current_active_admin_user
+from ..auth.schemas import User
+from . import schemas, service
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[schemas.SearchHit], tags=["Search"])
+def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    types: Optional[List[schemas.SourceType]] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Ranked full-text search across the campaign's missions, items, session reports,
+    ledger and hexes. Snippets wrap matched terms in <mark>. Hidden missions,
+    undiscovered hexes and DM notes are only returned to admins.
+    """
+    return service.search(
+        db,
+        campaign_id=current_user.campaign_id,
+        q=q,
+        limit=limit,
+        include_admin=current_user.role == "admin",
+        types=types,
+    )
+
+
+@router.post("/reindex", response_model=schemas.ReindexResult, tags=["Admin"])
+def reindex(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_admin_user),
+):
+    count = service.reindex_campaign(db, campaign_id=current_user.campaign_id)
+    db.commit()
+    return {"indexed": count}
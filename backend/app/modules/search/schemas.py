@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import Literal
+
+SourceType = Literal["mission", "item", "session", "ledger", "hex", "hex_note", "hex_dm_notes"]
+
+
+class SearchHit(BaseModel):
+    """
+    `title` is plain text. `snippet` is an HTML fragment: the document text is
+    HTML-escaped and the only markup is `<mark>...</mark>` around matched terms,
+    so it can be inserted as HTML as is.
+    """
+    source_type: SourceType
+    source_id: int
+    title: str
+    snippet: str
+    score: float
+
+    class Config:
+        from_attributes = True
+
+
+class ReindexResult(BaseModel):
+    indexed: int
@@ -0,0 +1,163 @@
+import html
+import re
+from typing import List, Optional
+
+from sqlalchemy import text, or_
+from sqlalchemy.orm import Session, joinedload, undefer_group
+
+from . import models, indexer
+from ..missions.models import Mission
+from ..items.models import Item
+from ..sessions.models import GameSession
+from ..ledger.models import LedgerEntry
+from ..maps.models import Hex, HexMap, HexNote
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+SNIPPET_OPEN = "<mark>"
+SNIPPET_CLOSE = "</mark>"
+# The database marks matches with these control characters; the text around them is
+# escaped before they become SNIPPET_OPEN / SNIPPET_CLOSE (see `_snippet_html`).
+_MATCH_START = "\x02"
+_MATCH_STOP = "\x03"
+
+
+def _fts5_query(q: str) -> Optional[str]:
+    """Turn free text into a safe FTS5 MATCH expression: every word, prefix-matched."""
+    tokens = _TOKEN_RE.findall(q)
+    if not tokens:
+        return None
+    return " ".join(f'"{t}"*' for t in tokens)
+
+
+def _snippet_html(raw: Optional[str]) -> str:
+    """HTML-escape document text, leaving only the match markers as markup."""
+    escaped = html.escape(raw or "")
+    return escaped.replace(_MATCH_START, SNIPPET_OPEN).replace(_MATCH_STOP, SNIPPET_CLOSE)
+
+
+def _with_html_snippets(rows) -> List[dict]:
+    return [{**row, "snippet": _snippet_html(row["snippet"])} for row in rows]
+
+
+def _filters(include_admin: bool, types: Optional[List[str]]):
+    clauses, params = [], {}
+    if not include_admin:
+        clauses.append("d.visibility = 'all'")
+    if types:
+        names = []
+        for i, t in enumerate(types):
+            params[f"type_{i}"] = t
+            names.append(f":type_{i}")
+        clauses.append(f"d.source_type IN ({', '.join(names)})")
+    return "".join(f" AND {c}" for c in clauses), params
+
+
+def _search_sqlite(db, campaign_id, q, limit, include_admin, types):
+    match = _fts5_query(q)
+    if match is None:
+        return []
+    extra, params = _filters(include_admin, types)
+    # bm25() is lower-is-better; the title column is weighted 10x the body.
+    sql = text(f"""
+        SELECT d.source_type, d.source_id, d.title,
+               snippet(search_documents_fts, -1, :match_start, :match_stop, '…', 16) AS snippet,
+               -bm25(search_documents_fts, 10.0, 1.0) AS score
+        FROM search_documents_fts
+        JOIN search_documents d ON d.id = search_documents_fts.rowid
+        WHERE search_documents_fts MATCH :match AND d.campaign_id = :campaign_id{extra}
+        ORDER BY score DESC
+        LIMIT :limit
+    """)
+    rows = db.execute(sql, {
+        "match": match, "campaign_id": campaign_id, "limit": limit,
+        "match_start": _MATCH_START, "match_stop": _MATCH_STOP, **params,
+    }).mappings().all()
+    return _with_html_snippets(rows)
+
+
+def _search_postgres(db, campaign_id, q, limit, include_admin, types):
+    extra, params = _filters(include_admin, types)
+    sql = text(f"""
+        SELECT d.source_type, d.source_id, d.title,
+               ts_headline('english', d.title || ' ' || d.body, query, :headline_options) AS snippet,
+               ts_rank(d.search_vector, query) AS score
+        FROM search_documents d, websearch_to_tsquery('english', :q) AS query
+        WHERE d.search_vector @@ query AND d.campaign_id = :campaign_id{extra}
+        ORDER BY score DESC
+        LIMIT :limit
+    """)
+    options = f'StartSel="{_MATCH_START}", StopSel="{_MATCH_STOP}", MaxWords=24, MinWords=8'
+    rows = db.execute(sql, {
+        "q": q, "campaign_id": campaign_id, "limit": limit, "headline_options": options, **params,
+    }).mappings().all()
+    return _with_html_snippets(rows)
+
+
+def _search_fallback(db, campaign_id, q, limit, include_admin, types):
+    """Unranked substring match for dialects without a full-text index."""
+    doc = models.SearchDocument
+    pattern = f"%{q}%"
+    query = db.query(doc).filter(
+        doc.campaign_id == campaign_id,
+        or_(doc.title.ilike(pattern), doc.body.ilike(pattern)),
+    )
+    if not include_admin:
+        query = query.filter(doc.visibility == "all")
+    if types:
+        query = query.filter(doc.source_type.in_(types))
+    return [
+        {"source_type": d.source_type, "source_id": d.source_id, "title": d.title,
+         "snippet": _snippet_html(d.body[:160]), "score": 0.0}
+        for d in query.limit(limit).all()
+    ]
+
+
+def search(
+    db: Session,
+    campaign_id: int,
+    q: str,
+    limit: int = 20,
+    include_admin: bool = False,
+    types: Optional[List[str]] = None,
+):
+    """
+    Ranked, campaign-scoped search over every indexed document. Snippets are HTML:
+    the document text is escaped and matches are wrapped in SNIPPET_OPEN / SNIPPET_CLOSE.
+    """
+    if not q.strip():
+        return []
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        return _search_sqlite(db, campaign_id, q, limit, include_admin, types)
+    if dialect == "postgresql":
+        return _search_postgres(db, campaign_id, q, limit, include_admin, types)
+    return _search_fallback(db, campaign_id, q, limit, include_admin, types)
+
+
+def reindex_campaign(db: Session, campaign_id: int) -> int:
+    """
+    Rebuild every search document for a campaign. Needed after any bulk write
+    that bypasses the ORM flush hook.
+    """
+    conn = db.connection()
+    conn.execute(models.SearchDocument.__table__.delete().where(
+        models.SearchDocument.campaign_id == campaign_id
+    ))
+    campaign_of_map = indexer._map_campaign_lookup(conn)
+
+    sources = [
+        db.query(Mission).filter(Mission.campaign_id == campaign_id),
+        db.query(Item).filter(Item.campaign_id == campaign_id),
+        db.query(GameSession).options(undefer_group("reports")).filter(GameSession.campaign_id == campaign_id),
+        db.query(LedgerEntry).filter(LedgerEntry.campaign_id == campaign_id),
+        db.query(Hex).join(HexMap).filter(HexMap.campaign_id == campaign_id),
+        db.query(HexNote).options(joinedload(HexNote.hex)).join(Hex).join(HexMap).filter(HexMap.campaign_id == campaign_id),
+    ]
+    count = 0
+    for query in sources:
+        for obj in query.yield_per(500):
+            indexer.index_object(conn, obj, campaign_of_map)
+            count += 1
+    db.flush()
+    return count
@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, ForeignKey, Table, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from ...database import Base
 
 game_session_players = Table('game_session_players', Base.metadata,
@@ -20,8 +20,9 @@ class GameSession(Base):
     description = Column(String, nullable=True)
     session_date = Column(DateTime, nullable=False)
     status = Column(String, default="Scheduled", nullable=False) # e.g., Open, Contested, Confirmed, Completed, Cancelled
-    after_action_report = Column(String, nullable=True)
-    field_report = Column(String, nullable=True)
+    # Free-text reports can run long; deferred so only queries that return them load them
+    after_action_report = deferred(Column(String, nullable=True), group="reports")
+    field_report = deferred(Column(String, nullable=True), group="reports")
     
     min_players = Column(Integer, default=4)
     max_players = Column(Integer, default=6)
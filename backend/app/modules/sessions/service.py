@@ -1,13 +1,15 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer_group
 from datetime import datetime, timezone
 from . import models, schemas
 from ..characters import models as char_models
 
+# The report columns are deferred on the model; these return them, so load them up front.
 def get_game_session(db: Session, session_id: int):
-    return db.query(models.GameSession).filter(models.GameSession.id == session_id).first()
+    return db.query(models.GameSession).options(undefer_group("reports"))\
+        .filter(models.GameSession.id == session_id).first()
 
 def get_game_sessions(db: Session, campaign_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.GameSession).filter(
+    return db.query(models.GameSession).options(undefer_group("reports")).filter(
         models.GameSession.campaign_id == campaign_id
     ).offset(skip).limit(limit).all()
 
@@ -140,6 +142,7 @@ def complete_session(
     from ..missions import service as mission_service
     from ..ship import service as ship_service
     from ..ledger import service as ledger_service
+    from ..missions import dag as mission_dag
 
     if session.status == "Completed":
         return None, "Session is already completed"
@@ -198,6 +201,8 @@ def complete_session(
     )
 
     db.commit()
+    # Completing the confirmed mission can unlock its dependents.
+    mission_dag.invalidate(campaign_id)
     db.refresh(session)
     return session, None
 
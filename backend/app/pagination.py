@@ -0,0 +1,33 @@
+from typing import Generic, List, Optional, Tuple, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+MAX_PAGE_SIZE = 200
+
+
+class Page(BaseModel, Generic[T]):
+    """A keyset page. Pass `next_cursor` back as `cursor` to fetch the next one."""
+    items: List[T]
+    next_cursor: Optional[int] = None
+
+
+def keyset(query, id_column, cursor: Optional[int] = None, limit: int = 100) -> Tuple[list, Optional[int]]:
+    """
+    Apply `id > cursor ORDER BY id LIMIT n` to a query and work out the next cursor.
+
+    Fetches one extra row to know whether another page exists, so the caller never
+    needs a COUNT(*). Rows may be ORM objects or column rows, as long as they
+    expose the id under the column's key.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if cursor is not None:
+        query = query.filter(id_column > cursor)
+    rows = query.order_by(id_column).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = getattr(rows[-1], id_column.key)
+    return rows, next_cursor
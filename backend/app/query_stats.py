@@ -0,0 +1,75 @@
+"""
+Per-request SQL statistics.
+
+`request_id_middleware` puts a fresh `QueryStats` in `query_stats_var` for each
+request. Cursor-level SQLAlchemy hooks on every Engine count the statements
+run while it is set and the time spent in them, grouped by statement
+template: the SQL text with its bind placeholders, which is the same for
+every execution of one query, so an N+1 loop shows up as one template with a
+high count. Expanded `IN (?, ?, ...)` lists are collapsed so that a query
+doesn't look different for every list length.
+
+`JsonFormatter` adds the totals to the access log line; the middleware logs a
+warning naming the templates that ran `SQL_REPEAT_WARN_THRESHOLD` times or more.
+Work outside a request (the one-shot worker, role sync) is not counted.
+"""
+import contextvars
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_WHITESPACE = re.compile(r"\s+")
+_PARAM = r"\s*(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)\s*"
+_PARAM_LIST = re.compile(rf"\((?:{_PARAM},)+{_PARAM}\)")
+
+# Number of repeated templates shown on the access log line.
+_ACCESS_LOG_REPEATS = 5
+
+
+def statement_template(statement: str) -> str:
+    return _PARAM_LIST.sub("(...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    seconds: float = 0.0
+    templates: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.templates[statement_template(statement)] += 1
+
+    def repeated(self, threshold: int = 2) -> List[Tuple[str, int]]:
+        """Templates run at least `threshold` times, most frequent first."""
+        return [(t, n) for t, n in self.templates.most_common() if n >= threshold]
+
+    def log_fields(self) -> Dict[str, Any]:
+        return {
+            "db_queries": self.count,
+            "db_time_ms": round(self.seconds * 1000, 1),
+            "db_repeated": [{"sql": t, "count": n} for t, n in self.repeated()[:_ACCESS_LOG_REPEATS]],
+        }
+
+
+query_stats_var: contextvars.ContextVar[Optional[QueryStats]] = contextvars.ContextVar("query_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if query_stats_var.get() is not None:
+        conn.info["query_stats_start"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = query_stats_var.get()
+    started = conn.info.pop("query_stats_start", None)
+    if stats is not None and started is not None:
+        stats.record(statement, time.perf_counter() - started)
@@ -1,4 +1,5 @@
 import os
+import shutil
 import multiprocessing
 
 # Gunicorn configuration file
@@ -27,3 +28,19 @@ errorlog = "-"   # stderr
 
 # Keepalive (important for load balancers)
 keepalive = 120
+
+# Prometheus metrics: workers write their samples to files in this directory and
+# /metrics merges them (see app/metrics.py). Must be set before a worker imports the app.
+prometheus_dir = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus_multiproc")
+
+
+def on_starting(server):
+    # Samples from a previous run would otherwise be merged into the new one.
+    shutil.rmtree(prometheus_dir, ignore_errors=True)
+    os.makedirs(prometheus_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    # Drop the dead worker's live gauges (in-flight requests, pool connections).
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
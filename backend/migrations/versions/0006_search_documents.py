@@ -0,0 +1,136 @@
+"""Add search_documents with a dialect-specific full-text index
+
+Revision ID: 0006_search_documents
+Revises: 0005_add_hidden_rewards
+Create Date: 2026-10-19 00:00:00.000000
+
+SQLite gets an FTS5 external-content table kept in sync by triggers; Postgres
+gets a generated tsvector column with a GIN index. Existing rows are indexed
+by the migration, the same way `app.modules.search.indexer` indexed them at
+this revision.
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.modules.search.models import SQLITE_FTS_DDL, SQLITE_FTS_DROP_DDL, POSTGRES_FTS_DDL
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006_search_documents'
+down_revision: Union[str, None] = '0005_add_hidden_rewards'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_BATCH = 1000
+
+_docs = sa.table(
+    'search_documents',
+    sa.column('campaign_id', sa.Integer),
+    sa.column('source_type', sa.String),
+    sa.column('source_id', sa.Integer),
+    sa.column('title', sa.String),
+    sa.column('body', sa.String),
+    sa.column('visibility', sa.String),
+    sa.column('updated_at', sa.DateTime),
+)
+_missions = sa.table(
+    'missions', sa.column('id', sa.Integer), sa.column('campaign_id', sa.Integer), sa.column('name', sa.String),
+    sa.column('description', sa.String), sa.column('is_retired', sa.Boolean), sa.column('is_discoverable', sa.Boolean),
+)
+_items = sa.table(
+    'items', sa.column('id', sa.Integer), sa.column('campaign_id', sa.Integer), sa.column('name', sa.String),
+    sa.column('description', sa.String),
+)
+_sessions = sa.table(
+    'game_sessions', sa.column('id', sa.Integer), sa.column('campaign_id', sa.Integer), sa.column('name', sa.String),
+    sa.column('description', sa.String), sa.column('field_report', sa.String), sa.column('after_action_report', sa.String),
+)
+_ledger = sa.table(
+    'ledger_entries', sa.column('id', sa.Integer), sa.column('campaign_id', sa.Integer),
+    sa.column('event_type', sa.String), sa.column('description', sa.String),
+)
+_maps = sa.table('hex_maps', sa.column('id', sa.Integer), sa.column('campaign_id', sa.Integer))
+_hexes = sa.table(
+    'hexes', sa.column('id', sa.Integer), sa.column('map_id', sa.Integer), sa.column('q', sa.Integer),
+    sa.column('r', sa.Integer), sa.column('is_discovered', sa.Boolean), sa.column('notes', sa.String),
+    sa.column('player_notes', sa.JSON), sa.column('linked_location_name', sa.String),
+)
+
+
+def _join(*parts):
+    return "\n\n".join(p for p in parts if p)
+
+
+def _documents(conn):
+    """(campaign_id, source_type, source_id, title, body, visibility) for every existing indexed row."""
+    for m in conn.execute(sa.select(_missions)):
+        hidden = bool(m.is_retired) or m.is_discoverable is False
+        yield m.campaign_id, 'mission', m.id, m.name, m.description or '', 'admin' if hidden else 'all'
+    for i in conn.execute(sa.select(_items)):
+        yield i.campaign_id, 'item', i.id, i.name, i.description or '', 'all'
+    for s in conn.execute(sa.select(_sessions)):
+        yield s.campaign_id, 'session', s.id, s.name, _join(s.description, s.field_report, s.after_action_report), 'all'
+    for e in conn.execute(sa.select(_ledger)):
+        yield e.campaign_id, 'ledger', e.id, e.event_type, e.description or '', 'all'
+    hexes = sa.select(_hexes, _maps.c.campaign_id).join(_maps, _maps.c.id == _hexes.c.map_id)
+    for h in conn.execute(hexes):
+        title = h.linked_location_name or f"Hex ({h.q}, {h.r})"
+        player_text = [n.get("text", "") for n in (h.player_notes or []) if isinstance(n, dict)]
+        body = _join(h.linked_location_name, *player_text)
+        yield h.campaign_id, 'hex', h.id, title, body, 'all' if h.is_discovered else 'admin'
+        if h.notes:
+            yield h.campaign_id, 'hex_dm_notes', h.id, title, h.notes, 'admin'
+
+
+def _backfill(conn) -> None:
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    columns = ('campaign_id', 'source_type', 'source_id', 'title', 'body', 'visibility')
+    batch = []
+    for doc in _documents(conn):
+        batch.append(dict(zip(columns, doc), updated_at=now))
+        if len(batch) >= _BATCH:
+            conn.execute(sa.insert(_docs), batch)
+            batch = []
+    if batch:
+        conn.execute(sa.insert(_docs), batch)
+
+
+def upgrade() -> None:
+    op.create_table('search_documents',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('campaign_id', sa.Integer(), nullable=False),
+        sa.Column('source_type', sa.String(), nullable=False),
+        sa.Column('source_id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('body', sa.String(), nullable=False),
+        sa.Column('visibility', sa.String(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('source_type', 'source_id', name='uq_search_document_source'),
+    )
+    op.create_index(op.f('ix_search_documents_id'), 'search_documents', ['id'], unique=False)
+    op.create_index(op.f('ix_search_documents_campaign_id'), 'search_documents', ['campaign_id'], unique=False)
+
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for stmt in SQLITE_FTS_DDL:
+            op.execute(stmt)
+    elif dialect == 'postgresql':
+        for stmt in POSTGRES_FTS_DDL:
+            op.execute(stmt)
+
+    # After the FTS DDL, so SQLite's triggers index the backfilled rows.
+    _backfill(op.get_bind())
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        for stmt in SQLITE_FTS_DROP_DDL:
+            op.execute(stmt)
+    op.drop_index(op.f('ix_search_documents_campaign_id'), table_name='search_documents')
+    op.drop_index(op.f('ix_search_documents_id'), table_name='search_documents')
+    op.drop_table('search_documents')
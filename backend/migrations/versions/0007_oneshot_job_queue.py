@@ -0,0 +1,34 @@
+"""Add job queue columns to generated one-shots
+
+Revision ID: 0007_oneshot_job_queue
+Revises: 0006_search_documents
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007_oneshot_job_queue'
+down_revision: Union[str, None] = '0006_search_documents'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('generated_oneshots', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('claimed_by', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_generated_oneshots_status', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('generated_oneshots', schema=None) as batch_op:
+        batch_op.drop_index('ix_generated_oneshots_status')
+        batch_op.drop_column('heartbeat_at')
+        batch_op.drop_column('claimed_by')
+        batch_op.drop_column('attempts')
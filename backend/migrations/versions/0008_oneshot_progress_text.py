@@ -0,0 +1,28 @@
+"""Add streamed progress text to generated one-shots
+
+Revision ID: 0008_oneshot_progress_text
+Revises: 0007_oneshot_job_queue
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008_oneshot_progress_text'
+down_revision: Union[str, None] = '0007_oneshot_job_queue'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('generated_oneshots', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('progress_text', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('generated_oneshots', schema=None) as batch_op:
+        batch_op.drop_column('progress_text')
@@ -0,0 +1,36 @@
+"""Add campaign_context_sections for cached one-shot context snapshots
+
+Revision ID: 0009_campaign_context_sections
+Revises: 0008_oneshot_progress_text
+Create Date: 2026-10-19 00:00:00.000000
+
+Sections are built lazily on first use, so no backfill is needed.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009_campaign_context_sections'
+down_revision: Union[str, None] = '0008_oneshot_progress_text'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('campaign_context_sections',
+        sa.Column('campaign_id', sa.Integer(), nullable=False),
+        sa.Column('section', sa.String(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('built_version', sa.Integer(), nullable=False),
+        sa.Column('data', sa.JSON(), nullable=True),
+        sa.Column('built_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id'], ),
+        sa.PrimaryKeyConstraint('campaign_id', 'section'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('campaign_context_sections')
@@ -0,0 +1,176 @@
+"""Move hex player notes out of the hexes.player_notes JSON column into hex_notes
+
+Revision ID: 0011_hex_notes
+Revises: 0010_llm_calls
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011_hex_notes'
+down_revision: Union[str, None] = '0010_llm_calls'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_hexes = sa.table(
+    'hexes',
+    sa.column('id', sa.Integer),
+    sa.column('map_id', sa.Integer),
+    sa.column('q', sa.Integer),
+    sa.column('r', sa.Integer),
+    sa.column('linked_location_name', sa.String),
+    sa.column('is_discovered', sa.Boolean),
+    sa.column('player_notes', sa.JSON),
+    sa.column('note_count', sa.Integer),
+)
+_notes = sa.table(
+    'hex_notes',
+    sa.column('id', sa.Integer),
+    sa.column('hex_id', sa.Integer),
+    sa.column('author_character_id', sa.Integer),
+    sa.column('session_id', sa.Integer),
+    sa.column('text', sa.String),
+    sa.column('created_at', sa.DateTime),
+)
+_maps = sa.table('hex_maps', sa.column('id', sa.Integer), sa.column('campaign_id', sa.Integer))
+_docs = sa.table(
+    'search_documents',
+    sa.column('campaign_id', sa.Integer),
+    sa.column('source_type', sa.String),
+    sa.column('source_id', sa.Integer),
+    sa.column('title', sa.String),
+    sa.column('body', sa.String),
+    sa.column('visibility', sa.String),
+    sa.column('updated_at', sa.DateTime),
+)
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _parse_time(value):
+    try:
+        return datetime.fromisoformat(value).astimezone(timezone.utc).replace(tzinfo=None)
+    except (TypeError, ValueError):
+        return _now()
+
+
+def _reindex_hex_notes(conn) -> None:
+    """
+    Search used to put a hex's player notes in its `hex` document; they are now one
+    `hex_note` document per note. Rewrite the hex documents without the note text and
+    add the note documents, for every hex that has a document (0006 indexed them all).
+    Notes on an undiscovered hex are admin-only, like the hex itself.
+    """
+    h = _hexes
+    indexed = sa.select(_docs.c.source_id).where(_docs.c.source_type == 'hex')
+    conn.execute(
+        sa.update(_docs)
+        .where(_docs.c.source_type == 'hex')
+        .values(
+            body=sa.func.coalesce(
+                sa.select(h.c.linked_location_name).where(h.c.id == _docs.c.source_id).scalar_subquery(), ''
+            ),
+            updated_at=_now(),
+        )
+    )
+    title = sa.func.coalesce(
+        sa.func.nullif(h.c.linked_location_name, ''),
+        'Hex (' + sa.cast(h.c.q, sa.String) + ', ' + sa.cast(h.c.r, sa.String) + ')',
+    )
+    conn.execute(sa.insert(_docs).from_select(
+        ['campaign_id', 'source_type', 'source_id', 'title', 'body', 'visibility', 'updated_at'],
+        sa.select(
+            _maps.c.campaign_id, sa.literal('hex_note'), _notes.c.id, title, _notes.c.text,
+            sa.case((h.c.is_discovered, 'all'), else_='admin'), sa.literal(_now(), sa.DateTime),
+        )
+        .select_from(_notes.join(h, h.c.id == _notes.c.hex_id).join(_maps, _maps.c.id == h.c.map_id))
+        .where(h.c.id.in_(indexed)),
+    ))
+
+
+def upgrade() -> None:
+    op.create_table('hex_notes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('hex_id', sa.Integer(), nullable=False),
+        sa.Column('author_character_id', sa.Integer(), nullable=True),
+        sa.Column('session_id', sa.Integer(), nullable=True),
+        sa.Column('text', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['hex_id'], ['hexes.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['author_character_id'], ['characters.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['session_id'], ['game_sessions.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_hex_notes_id'), 'hex_notes', ['id'], unique=False)
+    op.create_index('ix_hex_notes_hex_id_id', 'hex_notes', ['hex_id', 'id'], unique=False)
+    with op.batch_alter_table('hexes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('note_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Copy the JSON notes across in their original order. Author and session ids
+    # that no longer exist are dropped rather than violating the new foreign keys.
+    conn = op.get_bind()
+    characters = set(conn.execute(sa.text("SELECT id FROM characters")).scalars())
+    sessions = set(conn.execute(sa.text("SELECT id FROM game_sessions")).scalars())
+    rows = conn.execute(sa.select(_hexes.c.id, _hexes.c.player_notes).where(_hexes.c.player_notes.isnot(None)))
+    for hex_id, notes in rows.all():
+        values = []
+        for note in notes or []:
+            if isinstance(note, str):
+                note = {"text": note}
+            if not isinstance(note, dict) or not note.get("text"):
+                continue
+            author, session = note.get("author_character_id"), note.get("session_id")
+            values.append({
+                "hex_id": hex_id,
+                "author_character_id": author if author in characters else None,
+                "session_id": session if session in sessions else None,
+                "text": str(note["text"]),
+                "created_at": _parse_time(note.get("created_at")),
+            })
+        if values:
+            conn.execute(sa.insert(_notes), values)
+            conn.execute(sa.update(_hexes).where(_hexes.c.id == hex_id).values(note_count=len(values)))
+
+    _reindex_hex_notes(conn)
+
+    with op.batch_alter_table('hexes', schema=None) as batch_op:
+        batch_op.drop_column('player_notes')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('hexes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('player_notes', sa.JSON(), nullable=True))
+
+    conn = op.get_bind()
+    notes = {}
+    for row in conn.execute(sa.select(_notes).order_by(_notes.c.hex_id, _notes.c.created_at)).mappings():
+        notes.setdefault(row["hex_id"], []).append({
+            "author_character_id": row["author_character_id"],
+            "text": row["text"],
+            "session_id": row["session_id"],
+            "created_at": row["created_at"].replace(tzinfo=timezone.utc).isoformat(),
+        })
+    for hex_id, hex_notes in notes.items():
+        conn.execute(sa.update(_hexes).where(_hexes.c.id == hex_id).values(player_notes=hex_notes))
+        # Fold the note text back into the hex's search document, as search did before.
+        name = conn.execute(sa.select(_hexes.c.linked_location_name).where(_hexes.c.id == hex_id)).scalar()
+        conn.execute(
+            sa.update(_docs)
+            .where(_docs.c.source_type == 'hex', _docs.c.source_id == hex_id)
+            .values(body="\n\n".join(p for p in [name, *(n["text"] for n in hex_notes)] if p), updated_at=_now())
+        )
+    conn.execute(sa.delete(_docs).where(_docs.c.source_type == 'hex_note'))
+
+    with op.batch_alter_table('hexes', schema=None) as batch_op:
+        batch_op.drop_column('note_count')
+    op.drop_index('ix_hex_notes_hex_id_id', table_name='hex_notes')
+    op.drop_index(op.f('ix_hex_notes_id'), table_name='hex_notes')
+    op.drop_table('hex_notes')
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+One-shot generation throughput benchmark.
+
+Submits N concurrent `POST /api/oneshot/generate` jobs to a running backend,
+polls each job until it completes or fails, and reports queue wait,
+generation latency and end-to-end percentiles plus completed jobs per minute.
+
+Usage (against the LLM stub, see scripts/llm_stub.py):
+    cd backend && uv run python scripts/llm_stub.py --latency 1 --chunk-delay 0.01 &
+    LLM_API_BASE=http://localhost:9100/v1 uv run uvicorn app.main:app --port 8000 &
+    uv run python scripts/bench_oneshot.py --jobs 50 --discord-id <admin discord id> --campaign-id 1
+
+A token is minted with the backend's SECRET_KEY from --discord-id / --campaign-id
+(the user must exist and be allowed to generate), or passed as --token.
+
+Times are observed by polling every --poll seconds: queue wait runs from
+submission until the job is first seen `processing`, generation from then until
+it is seen finished, so each figure is accurate to about one poll interval.
+Jobs are submitted with `bypass_cache` so every run reaches the LLM.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+TERMINAL = ("completed", "failed")
+
+
+@dataclass
+class JobTiming:
+    id: Optional[int] = None
+    submitted: float = 0.0
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    status: str = "unsubmitted"
+    error: Optional[str] = None
+
+    @property
+    def queue_wait(self) -> Optional[float]:
+        return self.started - self.submitted if self.started is not None else None
+
+    @property
+    def generation(self) -> Optional[float]:
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+    @property
+    def end_to_end(self) -> Optional[float]:
+        return self.finished - self.submitted if self.finished is not None else None
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile (the same method as the LLM stats endpoint)."""
+    if not values:
+        return None
+    values = sorted(values)
+    return values[max(math.ceil(p / 100 * len(values)) - 1, 0)]
+
+
+def summarize(jobs: List[JobTiming], wall: float) -> Dict[str, object]:
+    completed = [j for j in jobs if j.status == "completed"]
+    report: Dict[str, object] = {
+        "submitted": sum(1 for j in jobs if j.id is not None),
+        "completed": len(completed),
+        "failed": sum(1 for j in jobs if j.status == "failed"),
+        "unfinished": sum(1 for j in jobs if j.id is not None and j.status not in TERMINAL),
+        "wall_seconds": round(wall, 2),
+        "jobs_per_minute": round(len(completed) / wall * 60, 2) if wall > 0 else None,
+    }
+    for name in ("queue_wait", "generation", "end_to_end"):
+        values = [getattr(j, name) for j in completed if getattr(j, name) is not None]
+        report[name] = {
+            f"p{p}": (round(v, 2) if v is not None else None)
+            for p in (50, 90, 95, 99) for v in [percentile(values, p)]
+        }
+        report[name]["max"] = round(max(values), 2) if values else None
+    return report
+
+
+async def run_job(
+    client: httpx.AsyncClient, timing: JobTiming, params: dict, poll: float, deadline: float
+) -> None:
+    timing.submitted = time.monotonic()
+    res = await client.post("/api/oneshot/generate", json=params)
+    if res.status_code != 200:
+        timing.status, timing.error = "rejected", f"{res.status_code}: {res.text[:200]}"
+        return
+    timing.id = res.json()["id"]
+    timing.status = res.json()["status"]
+
+    while time.monotonic() < deadline:
+        await asyncio.sleep(poll)
+        res = await client.get(f"/api/oneshot/{timing.id}")
+        if res.status_code != 200:
+            continue
+        status = res.json()["status"]
+        now = time.monotonic()
+        if status != "pending" and timing.started is None:
+            timing.started = now
+        timing.status = status
+        if status in TERMINAL:
+            timing.finished = now
+            if status == "failed":
+                timing.error = str((res.json().get("content") or {}).get("error"))
+            return
+
+
+async def run_benchmark(
+    client: httpx.AsyncClient, jobs: int, params: dict, poll: float = 0.25, timeout: float = 900.0
+) -> Dict[str, object]:
+    timings = [JobTiming() for _ in range(jobs)]
+    start = time.monotonic()
+    deadline = start + timeout
+    await asyncio.gather(*(run_job(client, t, params, poll, deadline) for t in timings))
+    wall = max((t.finished for t in timings if t.finished is not None), default=time.monotonic()) - start
+    report = summarize(timings, wall)
+    report["errors"] = sorted({t.error for t in timings if t.error})[:10]
+    return report
+
+
+def _token(args) -> str:
+    if args.token:
+        return args.token
+    if not (args.discord_id and args.campaign_id):
+        sys.exit("Pass --token, or --discord-id and --campaign-id to mint one.")
+    from app.security import create_access_token
+    return create_access_token({"sub": args.discord_id, "campaign_id": args.campaign_id, "role": "admin"})
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark one-shot generation throughput.")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--poll", type=float, default=0.25, help="seconds between status polls")
+    parser.add_argument("--timeout", type=float, default=900.0, help="give up on unfinished jobs after this long")
+    parser.add_argument("--params", default="{}", help="extra JSON fields for the generate request")
+    parser.add_argument("--token")
+    parser.add_argument("--discord-id")
+    parser.add_argument("--campaign-id", type=int)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    params = {"bypass_cache": True, **json.loads(args.params)}
+    headers = {"Authorization": f"Bearer {_token(args)}"}
+    limits = httpx.Limits(max_connections=max(args.jobs, 10))
+
+    async def run():
+        async with httpx.AsyncClient(base_url=args.base_url, headers=headers, limits=limits, timeout=30.0) as client:
+            return await run_benchmark(client, args.jobs, params, args.poll, args.timeout)
+
+    report = asyncio.run(run())
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"jobs: {report['submitted']} submitted, {report['completed']} completed, "
+          f"{report['failed']} failed, {report['unfinished']} unfinished")
+    print(f"wall: {report['wall_seconds']}s  throughput: {report['jobs_per_minute']} jobs/min")
+    print(f"{'seconds':<12}" + "".join(f"{k:>9}" for k in ("p50", "p90", "p95", "p99", "max")))
+    for name in ("queue_wait", "generation", "end_to_end"):
+        row = report[name]
+        print(f"{name:<12}" + "".join(f"{'-' if row[k] is None else row[k]:>9}" for k in ("p50", "p90", "p95", "p99", "max")))
+    for error in report["errors"]:
+        print(f"error: {error}")
+
+
+if __name__ == "__main__":
+    main()
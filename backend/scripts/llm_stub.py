@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+OpenAI-compatible `/chat/completions` stand-in for load-testing one-shot generation.
+
+Usage:
+    cd backend && uv run python scripts/llm_stub.py --port 9100 --latency 1.5 --chunk-delay 0.02
+    LLM_API_BASE=http://localhost:9100/v1 LLM_CACHE_ENABLED=false uv run uvicorn app.main:app
+
+Answers are canned and deterministic: the stub recognises each pipeline stage
+by the JSON schema in its system prompt (outline, act scenes, NPCs, pregens)
+and returns a valid document for it, so a whole job runs end to end without
+OpenRouter. Anything else gets a short plain-text reply.
+
+Timing and faults (all flags also read from LLM_STUB_* environment variables):
+
+    --latency       seconds before the response headers (time to first byte)
+    --chunk-delay   seconds between streamed SSE chunks
+    --chunk-size    characters per streamed chunk
+    --error-rate    fraction of requests answered 429 with Retry-After
+    --timeout-rate  fraction of requests that stall for --stall seconds, so the
+                    client's read timeout fires
+    --seed          seed for fault selection, so a run's fault sequence repeats
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+@dataclass
+class StubConfig:
+    latency: float = 0.0
+    chunk_delay: float = 0.0
+    chunk_size: int = 32
+    error_rate: float = 0.0
+    timeout_rate: float = 0.0
+    stall: float = 600.0
+    retry_after: int = 1
+    seed: int = 0
+
+    @classmethod
+    def from_env(cls) -> "StubConfig":
+        values = {}
+        for f in fields(cls):
+            raw = os.environ.get(f"LLM_STUB_{f.name.upper()}")
+            if raw is not None:
+                values[f.name] = type(f.default)(raw)
+        return cls(**values)
+
+
+# --- Canned answers ----------------------------------------------------------------
+
+ACTS = 3
+SCENES_PER_ACT = 2
+SCENE_TYPES = ["exploration", "social", "combat", "puzzle", "boss"]
+NPCS = ["Quartermaster Ilse", "Archivist Venn"]
+
+_ACT_NUMBER = re.compile(r"full scenes for Act (\d+)")
+_PARTY_SIZE = re.compile(r"Create (\d+) pregenerated")
+
+
+def _outline() -> Dict[str, Any]:
+    return {
+        "title": "The Quiet Convoy",
+        "hook": "Why did the grain convoy stop answering past the Limes?",
+        "acts": [
+            {
+                "title": f"Act {n}",
+                "summary": f"The crew works through part {n} of the question.",
+                "key_npcs": NPCS,
+                "scene_names": [f"Scene {n}.{s}" for s in range(1, SCENES_PER_ACT + 1)],
+            }
+            for n in range(1, ACTS + 1)
+        ],
+        "climax": "The convoy's Vinculum wakes and must be answered.",
+        "resolution": "The hex is marked; Meridian logs what the crew learned.",
+    }
+
+
+def _act_scenes(number: int) -> Dict[str, Any]:
+    return {
+        "scenes": [
+            {
+                "name": f"Scene {number}.{s}",
+                "type": SCENE_TYPES[(number + s) % len(SCENE_TYPES)],
+                "description": f"What happens in scene {s} of act {number}. " * 4,
+                "encounters": [f"Encounter {number}.{s}"],
+                "transitions": [f"Scene {number}.{s + 1}"] if s < SCENES_PER_ACT else [],
+            }
+            for s in range(1, SCENES_PER_ACT + 1)
+        ]
+    }
+
+
+def _npcs() -> Dict[str, Any]:
+    return {
+        "npcs": [
+            {"name": name, "role": "Patron", "description": "Weathered and precise.",
+             "motivation": "Get the convoy moving.", "secret": "Sold the route."}
+            for name in NPCS
+        ]
+    }
+
+
+def _pregens(count: int) -> Dict[str, Any]:
+    return {
+        "pregens": [
+            {"name": f"Crew Member {i}", "species": "Human", "class_name": "Fighter", "level": 3,
+             "background": "Deckhand aboard Meridian.", "hook": "Owes the convoy master a favour."}
+            for i in range(1, count + 1)
+        ]
+    }
+
+
+def canned_answer(messages: List[Dict[str, str]]) -> str:
+    """The stub's reply to a chat, picked by the schema the system prompt asks for."""
+    system = next((m["content"] for m in messages if m["role"] == "system"), "")
+    user = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+    if '"scene_names"' in system:
+        answer = _outline()
+    elif '"pregens"' in system:
+        match = _PARTY_SIZE.search(user)
+        answer = _pregens(int(match.group(1)) if match else 4)
+    elif '"npcs"' in system:
+        answer = _npcs()
+    elif '"scenes"' in system:
+        match = _ACT_NUMBER.search(user)
+        answer = _act_scenes(int(match.group(1)) if match else 1)
+    else:
+        return "Hello from the LLM stub."
+    return json.dumps(answer, indent=2)
+
+
+# --- Server ----------------------------------------------------------------------
+
+def _usage(messages: List[Dict[str, str]], content: str) -> Dict[str, int]:
+    # Four characters per token, like tests/fake_llm.py.
+    prompt = sum(len(m["content"]) for m in messages) // 4
+    completion = len(content) // 4
+    return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+
+def create_app(config: Optional[StubConfig] = None) -> FastAPI:
+    config = config or StubConfig.from_env()
+    faults = random.Random(config.seed)
+    app = FastAPI(title="LLM stub")
+    app.state.config = config
+    app.state.requests = 0
+
+    @app.post("/v1/chat/completions")
+    async def completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        roll = faults.random()
+
+        if roll < config.error_rate:
+            return JSONResponse(
+                {"error": {"message": "stub rate limit", "type": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"Retry-After": str(config.retry_after)},
+            )
+        if roll < config.error_rate + config.timeout_rate:
+            await asyncio.sleep(config.stall)
+
+        await asyncio.sleep(config.latency)
+        content = canned_answer(body["messages"])
+        usage = _usage(body["messages"], content)
+
+        if not body.get("stream"):
+            return {
+                "id": "stub",
+                "object": "chat.completion",
+                "model": body.get("model", "stub"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage,
+            }
+
+        async def chunks():
+            for i in range(0, len(content), config.chunk_size):
+                delta = {"content": content[i:i + config.chunk_size]}
+                yield f"data: {json.dumps({'choices': [{'index': 0, 'delta': delta}]})}\n\n"
+                if config.chunk_delay:
+                    await asyncio.sleep(config.chunk_delay)
+            yield f"data: {json.dumps({'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]})}\n\n"
+            if (body.get("stream_options") or {}).get("include_usage"):
+                yield f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    @app.get("/v1/models")
+    def models():
+        return {"object": "list", "data": [{"id": "stub-model", "object": "model"}]}
+
+    return app
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    defaults = StubConfig.from_env()
+    parser = argparse.ArgumentParser(description="OpenAI-compatible LLM stub for load tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    for f in fields(StubConfig):
+        parser.add_argument(f"--{f.name.replace('_', '-')}", type=type(f.default), default=getattr(defaults, f.name))
+    args = parser.parse_args(argv)
+
+    import uvicorn
+    config = StubConfig(**{f.name: getattr(args, f.name) for f in fields(StubConfig)})
+    print(f"LLM stub on http://{args.host}:{args.port}/v1 ({config})", file=sys.stderr)
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,9 @@
+import os
+
+# Tests drive the one-shot queue explicitly; don't let the app lifespan start a pool
+# polling the default database. Must be set before app settings are first loaded.
+os.environ.setdefault("ONESHOT_WORKER_ENABLED", "false")
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -22,6 +28,13 @@ def db_session():
     transaction.rollback()
     connection.close()
 
+@pytest.fixture(autouse=True)
+def oneshot_output_dir(tmp_path, monkeypatch):
+    """Keep generated files (module ZIPs, LLM cache) out of the real ONESHOT_OUTPUT_DIR."""
+    from app.config import get_settings
+    monkeypatch.setattr(get_settings(), "ONESHOT_OUTPUT_DIR", str(tmp_path / "oneshots"))
+    return tmp_path / "oneshots"
+
 @pytest.fixture(scope="function")
 def client(db_session):
     def override_get_db():
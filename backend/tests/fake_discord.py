@@ -0,0 +1,127 @@
+"""
+Local stand-in for the parts of the Discord REST API the backend uses.
+
+Point a DiscordClient at it with an ASGI transport:
+
+    fake = FakeDiscord()
+    client = fake.client()
+
+State (users, guilds, members) lives on the FakeDiscord instance so tests can
+seed it directly. `rate_limit_next()` makes the next N requests answer 429, and
+`bucket_remaining` controls the X-RateLimit-* headers sent back; `latency`
+delays every response.
+"""
+import asyncio
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import httpx
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
+
+from app.discord_client import DiscordClient
+
+
+@dataclass
+class FakeDiscord:
+    # access token -> user object
+    users: Dict[str, dict] = field(default_factory=dict)
+    # access token -> list of partial guild objects
+    user_guilds: Dict[str, List[dict]] = field(default_factory=dict)
+    # guild id -> {user id -> member object}
+    members: Dict[str, Dict[str, dict]] = field(default_factory=dict)
+
+    bucket_remaining: Optional[int] = None
+    bucket_reset_after: float = 0.05
+    retry_after: float = 0.01
+    latency: float = 0.0
+    requests: List[str] = field(default_factory=list)
+    _pending_429s: int = 0
+
+    def rate_limit_next(self, count: int = 1, retry_after: Optional[float] = None) -> None:
+        self._pending_429s += count
+        if retry_after is not None:
+            self.retry_after = retry_after
+
+    def add_member(self, guild_id: str, user_id: str, roles: List[str], username: str = "") -> dict:
+        member = {"user": {"id": user_id, "username": username or f"user{user_id}"}, "roles": roles}
+        self.members.setdefault(str(guild_id), {})[str(user_id)] = member
+        return member
+
+    def app(self) -> FastAPI:
+        app = FastAPI()
+        fake = self
+
+        @app.middleware("http")
+        async def rate_limits(request: Request, call_next):
+            fake.requests.append(f"{request.method} {request.url.path}")
+            if fake.latency:
+                await asyncio.sleep(fake.latency)
+            if fake._pending_429s > 0:
+                fake._pending_429s -= 1
+                return JSONResponse(
+                    {"message": "You are being rate limited.", "retry_after": fake.retry_after, "global": False},
+                    status_code=429,
+                    headers={"Retry-After": str(fake.retry_after)},
+                )
+            response = await call_next(request)
+            if fake.bucket_remaining is not None:
+                response.headers["X-RateLimit-Remaining"] = str(fake.bucket_remaining)
+                response.headers["X-RateLimit-Reset-After"] = str(fake.bucket_reset_after)
+                response.headers["X-RateLimit-Bucket"] = "fakebucket"
+            return response
+
+        def _bearer(authorization: Optional[str]) -> str:
+            if not authorization or not authorization.startswith("Bearer "):
+                raise HTTPException(status_code=401, detail="401: Unauthorized")
+            token = authorization.removeprefix("Bearer ")
+            if token not in fake.users:
+                raise HTTPException(status_code=401, detail="401: Unauthorized")
+            return token
+
+        @app.post("/api/oauth2/token")
+        async def token(request: Request):
+            form = await request.form()
+            code = form.get("code")
+            if code not in fake.users:
+                return JSONResponse({"error": "invalid_grant"}, status_code=400)
+            return {"access_token": code, "token_type": "Bearer"}
+
+        @app.get("/api/users/@me")
+        async def me(authorization: Optional[str] = Header(None)):
+            return fake.users[_bearer(authorization)]
+
+        @app.get("/api/users/@me/guilds")
+        async def my_guilds(authorization: Optional[str] = Header(None)):
+            return fake.user_guilds.get(_bearer(authorization), [])
+
+        @app.get("/api/guilds/{guild_id}/members/{user_id}")
+        async def guild_member(guild_id: str, user_id: str):
+            member = fake.members.get(guild_id, {}).get(user_id)
+            if member is None:
+                return JSONResponse({"message": "Unknown Member", "code": 10007}, status_code=404)
+            return member
+
+        @app.get("/api/guilds/{guild_id}/members")
+        async def list_members(guild_id: str, limit: int = Query(1, ge=1, le=1000), after: str = "0"):
+            if guild_id not in fake.members:
+                return JSONResponse({"message": "Unknown Guild", "code": 10004}, status_code=404)
+            # Snowflake order; (length, text) also copes with the non-numeric ids used in tests.
+            def key(user_id: str):
+                return (len(user_id), user_id)
+
+            ordered = sorted(fake.members[guild_id].values(), key=lambda m: key(m["user"]["id"]))
+            return [m for m in ordered if key(m["user"]["id"]) > key(after)][:limit]
+
+        @app.get("/api/v10/gateway")
+        async def gateway():
+            return {"url": "wss://gateway.discord.gg"}
+
+        return app
+
+    def client(self, **kwargs) -> DiscordClient:
+        return DiscordClient(
+            base_url="http://fake-discord/api",
+            transport=httpx.ASGITransport(app=self.app()),
+            **kwargs,
+        )
@@ -0,0 +1,88 @@
+"""
+Local stand-in for an OpenAI-compatible `/chat/completions` endpoint.
+
+    fake = FakeLLM(content='{"title": "..."}')
+    service = fake.service()
+
+Non-streaming requests get the whole `content` in one message; `stream: true`
+requests get it as SSE chunks of `chunk_size` characters. Token usage is
+reported at four characters per token (as a final chunk when streaming with
+`stream_options.include_usage`). `delay` holds back the response headers.
+"""
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import List
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.llm_service import LLMProvider, LLMService
+
+
+@dataclass
+class FakeLLM:
+    content: str = "Hello from the stub."
+    chunk_size: int = 8
+    status_code: int = 200
+    delay: float = 0.0
+    requests: List[dict] = field(default_factory=list)
+
+    def app(self) -> FastAPI:
+        app = FastAPI()
+        fake = self
+
+        @app.post("/v1/chat/completions")
+        async def completions(request: Request):
+            body = await request.json()
+            fake.requests.append(body)
+            await asyncio.sleep(fake.delay)
+            usage = {
+                "prompt_tokens": sum(len(m["content"]) for m in body["messages"]) // 4,
+                "completion_tokens": len(fake.content) // 4,
+            }
+            usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+            if fake.status_code != 200:
+                return JSONResponse({"error": {"message": "stub failure"}}, status_code=fake.status_code)
+
+            if not body.get("stream"):
+                return {
+                    "id": "stub",
+                    "model": body["model"],
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": fake.content}}],
+                    "usage": usage,
+                }
+
+            async def chunks():
+                yield ": keep-alive\n\n"
+                for i in range(0, len(fake.content), fake.chunk_size):
+                    delta = {"content": fake.content[i:i + fake.chunk_size]}
+                    yield f"data: {json.dumps({'choices': [{'index': 0, 'delta': delta}]})}\n\n"
+                yield f"data: {json.dumps({'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]})}\n\n"
+                if (body.get("stream_options") or {}).get("include_usage"):
+                    yield f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(chunks(), media_type="text/event-stream")
+
+        return app
+
+    def service(self, **kwargs) -> LLMService:
+        return LLMService(
+            base_url="http://fake-llm/v1",
+            api_key="test-key",
+            model="stub-model",
+            transport=httpx.ASGITransport(app=self.app()),
+            **kwargs,
+        )
+
+    def provider(self, model: str = "stub-fallback", **kwargs) -> LLMProvider:
+        """This stub as a fallback provider for another FakeLLM's service."""
+        return LLMProvider(
+            model=model,
+            base_url="http://fake-llm/v1",
+            api_key="test-key",
+            transport=httpx.ASGITransport(app=self.app()),
+            **kwargs,
+        )
@@ -0,0 +1,219 @@
+import json
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.modules.admin import service as admin_service
+from app.modules.admin.importer import ImportFormatError, import_campaign
+from app.modules.auth.models import User
+from app.modules.campaigns.models import Campaign
+from app.modules.campaigns.tables import CAMPAIGN_TABLES
+from app.modules.items.models import InventoryItem, Item
+from app.modules.maps.models import HexMap, Hex, HexNote
+from app.modules.missions.models import Mission
+from app.modules.oneshot.models import GeneratedOneShot
+from app.modules.search.models import SearchDocument
+from app.modules.ship.models import Ship
+
+
+def _sections(text: str):
+    """Parse an NDJSON export into (header, {table: [row dicts]}, footer)."""
+    lines = [json.loads(line) for line in text.splitlines()]
+    header, footer = lines[0], lines[-1]
+    tables, columns, current = {}, None, None
+    for line in lines[1:-1]:
+        if isinstance(line, dict):
+            current, columns = line["table"], line["columns"]
+            tables[current] = []
+        else:
+            tables[current].append(dict(zip(columns, line)))
+    return header, tables, footer
+
+
+def _stock(db_session: Session, campaign: Campaign):
+    db_session.add(Item(name="Lantern", campaign_id=campaign.id))
+    db_session.add(Ship(campaign_id=campaign.id, name="Meridian"))
+    hex_map = HexMap(campaign_id=campaign.id, name="Sphere")
+    db_session.add(hex_map)
+    db_session.flush()
+    db_session.add(Hex(map_id=hex_map.id, q=0, r=0, is_discovered=True, note_count=1,
+                       player_notes=[HexNote(text="Cave")]))
+    other = Campaign(name="Other", discord_guild_id="other_export")
+    db_session.add(other)
+    db_session.flush()
+    db_session.add(Item(name="Foreign Relic", campaign_id=other.id))
+    db_session.commit()
+
+
+def _stock_jobs(db_session: Session, campaign: Campaign):
+    """A job another server was running when the data was taken, and one it finished."""
+    from datetime import datetime
+    db_session.add_all([
+        GeneratedOneShot(campaign_id=campaign.id, title="Running", status="processing", generation_params={},
+                         claimed_by="elsewhere:1:abc", heartbeat_at=datetime(2026, 1, 1)),
+        GeneratedOneShot(campaign_id=campaign.id, title="Done", status="completed", generation_params={},
+                         foundry_module_path="/srv/modules/oneshot_1.zip"),
+    ])
+    db_session.commit()
+
+
+def _assert_jobs_reset(db_session: Session, campaign_id: int):
+    jobs = {j.title: j for j in db_session.query(GeneratedOneShot).filter_by(campaign_id=campaign_id)}
+    assert jobs["Running"].status == "failed" and jobs["Done"].status == "completed"
+    for job in jobs.values():
+        assert job.claimed_by is None and job.heartbeat_at is None and job.foundry_module_path is None
+
+
+def test_export_streams_only_the_admins_campaign(client, db_session, campaign, admin_auth_headers, player_auth_headers):
+    _stock(db_session, campaign)
+    assert client.get("/api/admin/export", headers=player_auth_headers).status_code == 403
+
+    res = client.get("/api/admin/export", headers=admin_auth_headers)
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "application/x-ndjson"
+    assert res.headers["content-disposition"] == f'attachment; filename="campaign-{campaign.id}.ndjson"'
+
+    header, tables, footer = _sections(res.text)
+    assert header["format"] == "campaign-export" and header["campaign_id"] == campaign.id
+    assert footer == {"end": True, "counts": {name: len(rows) for name, rows in tables.items()}}
+    assert [i["name"] for i in tables["items"]] == ["Lantern"]
+    assert [s["name"] for s in tables["ships"]] == ["Meridian"]
+    assert [n["text"] for n in tables["hex_notes"]] == ["Cave"]
+    assert tables["hex_notes"][0]["hex_id"] == tables["hexes"][0]["id"]
+    assert [c["id"] for c in tables["campaigns"]] == [campaign.id]
+
+
+def test_export_yields_a_chunk_per_batch(db_session, campaign):
+    for i in range(5):
+        db_session.add(Item(name=f"Item {i}", campaign_id=campaign.id))
+    db_session.commit()
+
+    chunks = list(admin_service.export_campaign(db_session, campaign.id, batch_size=2))
+    item_batches = [c for c in chunks if '"Item ' in c]
+    assert [c.count("\n") for c in item_batches] == [2, 2, 1]
+
+
+def test_import_replaces_the_campaign_with_an_export(client, db_session, campaign, admin_auth_headers):
+    _stock(db_session, campaign)
+    later = Mission(name="Later", campaign_id=campaign.id)
+    first = Mission(name="First", campaign_id=campaign.id)
+    db_session.add_all([later, first])
+    db_session.flush()
+    later.prerequisite_id = first.id  # points at a row exported after it
+    db_session.commit()
+    admin = db_session.query(User).filter_by(discord_id="admin_discord_456").one()
+    export = client.get("/api/admin/export", headers=admin_auth_headers).text
+    first.name = "Renamed after the export"
+    db_session.commit()
+    assert client.get("/api/missions/graph", headers=admin_auth_headers).status_code == 200  # cache the graph
+
+    res = client.post(
+        "/api/admin/import", headers=admin_auth_headers,
+        files={"file": ("campaign.ndjson", export, "application/x-ndjson")},
+    )
+    assert res.status_code == 200
+    progress = [json.loads(line) for line in res.text.splitlines()]
+    assert {"table": "items", "rows": 1} in progress
+    assert progress[-1]["done"] is True and progress[-1]["skipped"] == {}
+
+    db_session.expire_all()
+    admin = db_session.query(User).filter_by(discord_id="admin_discord_456").one()
+    assert db_session.query(User).filter_by(campaign_id=campaign.id).count() == 1
+    assert admin.active_character_id is not None
+    assert admin.active_character.name == "AdminUser's Character"
+
+    missions = {m.name: m for m in db_session.query(Mission).filter_by(campaign_id=campaign.id)}
+    assert missions["Later"].prerequisite_id == missions["First"].id
+    graph = client.get("/api/missions/graph", headers=admin_auth_headers).json()
+    assert {n["id"]: n["name"] for n in graph} == {m.id: name for name, m in missions.items()}
+    assert [i.name for i in db_session.query(Item).filter_by(campaign_id=campaign.id)] == ["Lantern"]
+    hex_ = db_session.query(Hex).join(HexMap).filter(HexMap.campaign_id == campaign.id).one()
+    assert [n.text for n in hex_.player_notes] == ["Cave"]
+    assert db_session.query(Item).filter_by(name="Foreign Relic").count() == 1
+
+
+def test_import_fails_unfinished_jobs_and_drops_their_server_state(db_session, campaign):
+    _stock_jobs(db_session, campaign)
+    export = "".join(admin_service.export_campaign(db_session, campaign.id)).splitlines()
+    list(import_campaign(db_session, campaign.id, export))
+    db_session.commit()
+
+    db_session.expire_all()
+    _assert_jobs_reset(db_session, campaign.id)
+
+
+def test_import_rejects_files_that_are_not_complete_exports(client, db_session, campaign, admin_auth_headers):
+    _stock(db_session, campaign)
+    export = "".join(admin_service.export_campaign(db_session, campaign.id)).splitlines()
+    with pytest.raises(ImportFormatError, match="truncated"), db_session.begin_nested():
+        list(import_campaign(db_session, campaign.id, export[:-1]))
+    assert [i.name for i in db_session.query(Item).filter_by(campaign_id=campaign.id)] == ["Lantern"]
+
+    res = client.post("/api/admin/import", headers=admin_auth_headers,
+                      files={"file": ("x.json", '{"factions": []}', "application/json")})
+    assert res.status_code == 400
+    assert res.json()["detail"] == "Not a campaign export."
+
+
+def test_clone_copies_the_campaign_with_remapped_ids(client, db_session, campaign, admin_auth_headers):
+    _stock(db_session, campaign)
+    later = Mission(name="Later", campaign_id=campaign.id)
+    first = Mission(name="First", campaign_id=campaign.id)
+    db_session.add_all([later, first])
+    db_session.flush()
+    later.prerequisite_id = first.id
+    admin = db_session.query(User).filter_by(discord_id="admin_discord_456").one()
+    lantern = db_session.query(Item).filter_by(name="Lantern").one()
+    db_session.add(InventoryItem(character_id=admin.active_character_id, item_id=lantern.id, quantity=3))
+    db_session.commit()
+
+    statements = []
+    listen = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+    event.listen(db_session.bind, "before_cursor_execute", listen)
+    try:
+        res = client.post("/api/admin/clone", headers=admin_auth_headers, json={"name": "What If"})
+    finally:
+        event.remove(db_session.bind, "before_cursor_execute", listen)
+    assert res.status_code == 200
+    clone_id = res.json()["id"]
+    assert res.json()["name"] == "What If" and clone_id != campaign.id
+
+    db_session.expire_all()
+    copy = db_session.query(User).filter_by(discord_id="admin_discord_456", campaign_id=clone_id).one()
+    assert copy.id != admin.id and copy.role == "admin"
+    assert copy.active_character.campaign_id == clone_id
+    assert copy.active_character.owner_id == copy.id
+    [held] = copy.active_character.inventory
+    assert held.quantity == 3 and held.item.campaign_id == clone_id and held.item.name == "Lantern"
+
+    missions = {m.name: m for m in db_session.query(Mission).filter_by(campaign_id=clone_id)}
+    assert missions["Later"].prerequisite_id == missions["First"].id
+    assert db_session.query(Ship).filter_by(campaign_id=clone_id).one().name == "Meridian"
+    hex_ = db_session.query(Hex).join(HexMap).filter(HexMap.campaign_id == clone_id).one()
+    assert [n.text for n in hex_.player_notes] == ["Cave"]
+    assert db_session.query(Item).filter_by(name="Foreign Relic").count() == 1
+    assert db_session.query(Mission).filter_by(campaign_id=campaign.id).count() == 2
+    docs = db_session.query(SearchDocument).filter_by(campaign_id=clone_id, source_type="mission")
+    assert {d.source_id for d in docs} == {m.id for m in missions.values()}
+
+    # One INSERT ... SELECT per table, however many rows there are.
+    copies = [s.split()[2] for s in statements if s.startswith("INSERT") and "SELECT" in s]
+    assert copies == [t.name for t in CAMPAIGN_TABLES[1:]] + ["search_documents"]
+
+
+def test_clone_fails_unfinished_jobs_and_drops_their_server_state(client, db_session, campaign, admin_auth_headers):
+    _stock_jobs(db_session, campaign)
+    clone_id = client.post("/api/admin/clone", headers=admin_auth_headers, json={"name": "Fork"}).json()["id"]
+
+    db_session.expire_all()
+    _assert_jobs_reset(db_session, clone_id)
+    assert db_session.query(GeneratedOneShot).filter_by(campaign_id=campaign.id, status="processing").count() == 1
+
+
+def test_clone_cannot_claim_a_guild(client, db_session, campaign, admin_auth_headers):
+    res = client.post("/api/admin/clone", headers=admin_auth_headers,
+                      json={"name": "Squat", "discord_guild_id": "someone_elses_guild"})
+    assert res.status_code == 200
+    assert res.json()["discord_guild_id"].startswith(f"{campaign.discord_guild_id}:clone-")
+    assert db_session.query(Campaign).filter_by(discord_guild_id="someone_elses_guild").count() == 0
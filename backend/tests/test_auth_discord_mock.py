@@ -28,6 +28,8 @@ app.dependency_overrides[get_db] = override_get_db
 
 @pytest.fixture(scope="module")
 def client():
+    # Re-apply: conftest's `client` fixture replaces the override for tests that ran earlier
+    app.dependency_overrides[get_db] = override_get_db
     Base.metadata.create_all(bind=engine)
     with TestClient(app) as c:
         yield c
@@ -41,15 +43,11 @@ def db():
 
 # Mocks
 @pytest.fixture
-def mock_httpx_client():
-    with patch("httpx.AsyncClient") as MockClient:
-        mock_instance = AsyncMock()
-        MockClient.return_value = mock_instance
-        mock_instance.__aenter__.return_value = mock_instance
-        mock_instance.__aexit__.return_value = None
+def mock_discord_client():
+    with patch("app.modules.campaigns.router.discord_cache", new_callable=AsyncMock) as mock_instance:
         yield mock_instance
 
-def test_campaign_join_flow(client, db, mock_httpx_client):
+def test_campaign_join_flow(client, db, mock_discord_client):
     # 1. Create Campaign
     camp = campaign_models.Campaign(name="Joinable", discord_guild_id="55555", dm_role_id="111", player_role_id="222")
     db.add(camp)
@@ -63,8 +61,8 @@ def test_campaign_join_flow(client, db, mock_httpx_client):
     mock_response.status_code = 200
     mock_response.json.return_value = {"roles": ["222"]}
 
-    # Configure the async get method to return the synchronous mock response
-    mock_httpx_client.get.return_value = mock_response
+    # Configure the async member lookup to return the synchronous mock response
+    mock_discord_client.get_guild_member.return_value = mock_response
 
     # For join flow, we also need to verify the user identity.
     original_overrides = app.dependency_overrides.copy()
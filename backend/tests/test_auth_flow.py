@@ -8,54 +8,27 @@ Covers:
 - Global vs campaign-scoped token enforcement
 """
 from unittest.mock import patch, MagicMock
+import httpx
 from jose import jwt
 from app.config import get_settings
+from app.discord_client import DiscordClient
 
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
-class _MockResponse:
-    def __init__(self, status_code: int, data: dict):
-        self.status_code = status_code
-        self._data = data
-        self.text = str(data)
-
-    def json(self):
-        return self._data
-
-
-class _MockHttpxClient:
-    """Async context manager that mocks both POST and GET calls to the Discord API."""
-
-    def __init__(self, post_status=200, get_status=200):
-        self._post_response = _MockResponse(
-            post_status,
-            {"access_token": "disc_access_token"} if post_status == 200 else {"error": "invalid_grant"},
-        )
-        self._get_response = _MockResponse(
-            get_status,
-            {"id": "disc123", "username": "HeroUser", "avatar": "avhash"} if get_status == 200 else {},
-        )
-
-    async def __aenter__(self):
-        return self
-
-    async def __aexit__(self, *args):
-        pass
-
-    async def post(self, *args, **kwargs):
-        return self._post_response
-
-    async def get(self, *args, **kwargs):
-        return self._get_response
-
-
 def _patch_httpx(post_status=200, get_status=200):
-    """Return a patch context manager for httpx.AsyncClient in auth router."""
-    mock_client = _MockHttpxClient(post_status=post_status, get_status=get_status)
-    return patch("app.modules.auth.router.httpx.AsyncClient", return_value=mock_client)
+    """Patch the auth router's DiscordClient with one that mocks the token exchange and /users/@me."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "POST":
+            data = {"access_token": "disc_access_token"} if post_status == 200 else {"error": "invalid_grant"}
+            return httpx.Response(post_status, json=data)
+        data = {"id": "disc123", "username": "HeroUser", "avatar": "avhash"} if get_status == 200 else {}
+        return httpx.Response(get_status, json=data)
+
+    client = DiscordClient(base_url="http://discord.test/api", transport=httpx.MockTransport(handler))
+    return patch("app.modules.auth.router.discord_client", client)
 
 
 # ---------------------------------------------------------------------------
@@ -3,10 +3,14 @@ Campaign endpoint integration tests.
 
 Covers /setup, /available, /join, /login, and /mine paths.
 These endpoints use global (pre-campaign) tokens and interact with the Discord
-API, so Discord calls are mocked via httpx.AsyncClient patches.
+API, so the router's Discord cache is swapped for a fresh one whose client is
+backed by an httpx.MockTransport.
 """
 from unittest.mock import patch, AsyncMock
+import httpx
 from app import security
+from app.discord_cache import DiscordCache
+from app.discord_client import DiscordClient
 
 
 # ---------------------------------------------------------------------------
@@ -19,39 +23,22 @@ def _global_token(discord_id: str, username: str = "TestUser", avatar: str = Non
     )
 
 
-class _MockResponse:
-    def __init__(self, status_code: int, data):
-        self.status_code = status_code
-        self._data = data
-
-    def json(self):
-        return self._data
-
-
-def _make_httpx_mock(responses: dict):
+def _make_discord_mock(responses: dict) -> DiscordClient:
     """
-    Returns an async context manager whose .get() dispatches by URL prefix.
+    Returns a DiscordClient whose transport dispatches by URL substring.
     `responses` maps URL substrings to (status_code, data) tuples.
     """
-    class _Client:
-        async def __aenter__(self):
-            return self
-
-        async def __aexit__(self, *args):
-            pass
-
-        async def get(self, url, **kwargs):
-            for key, (code, data) in responses.items():
-                if key in url:
-                    return _MockResponse(code, data)
-            return _MockResponse(404, {})
+    def handler(request: httpx.Request) -> httpx.Response:
+        for key, (code, data) in responses.items():
+            if key in str(request.url):
+                return httpx.Response(code, json=data)
+        return httpx.Response(404, json={})
 
-    return _Client()
+    return DiscordClient(base_url="http://discord.test/api", transport=httpx.MockTransport(handler))
 
 
 def _patch_campaigns_httpx(responses: dict):
-    client = _make_httpx_mock(responses)
-    return patch("app.modules.campaigns.router.httpx.AsyncClient", return_value=client)
+    return patch("app.modules.campaigns.router.discord_cache", DiscordCache(_make_discord_mock(responses)))
 
 
 # ---------------------------------------------------------------------------
@@ -135,3 +135,32 @@ def test_delete_active_character_clears_active_id(client, db_session, campaign):
     client.delete(f"/api/characters/{char_id}", headers=headers)
     db_session.refresh(user)
     assert user.active_character_id is None
+
+
+def test_list_characters_loads_sessions_without_a_query_each(client, db_session, campaign, player_auth_headers):
+    from datetime import datetime
+    from sqlalchemy import event
+    from app.modules.characters.models import Character
+    from app.modules.sessions.models import GameSession
+    char_id = client.get("/api/auth/me", headers=player_auth_headers).json()["characters"][0]["id"]
+    character = db_session.get(Character, char_id)
+    for i in range(5):
+        character.game_sessions.append(GameSession(
+            name=f"Session {i}", session_date=datetime(2026, 1, i + 1), campaign_id=campaign.id,
+            after_action_report=f"Report {i}",
+        ))
+    db_session.commit()
+    db_session.expunge_all()
+
+    statements = []
+    listen = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+    event.listen(db_session.bind, "before_cursor_execute", listen)
+    try:
+        res = client.get("/api/characters/", headers=player_auth_headers)
+    finally:
+        event.remove(db_session.bind, "before_cursor_execute", listen)
+
+    assert res.status_code == 200
+    [mine] = [c for c in res.json() if c["id"] == char_id]
+    assert [s["after_action_report"] for s in mine["game_sessions"]] == [f"Report {i}" for i in range(5)]
+    assert sum("FROM game_sessions" in s for s in statements) == 1
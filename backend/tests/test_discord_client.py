@@ -0,0 +1,141 @@
+import asyncio
+import time
+
+from app.discord_cache import DiscordCache
+from tests.fake_discord import FakeDiscord
+
+
+def _fake_with_member():
+    fake = FakeDiscord()
+    fake.users["tok_a"] = {"id": "1", "username": "Alice"}
+    fake.user_guilds["tok_a"] = [{"id": "g1", "name": "Guild", "owner": True, "permissions": "8"}]
+    fake.add_member("g1", "1", roles=["222"])
+    return fake
+
+
+async def test_requests_share_one_pooled_client():
+    fake = _fake_with_member()
+    client = fake.client()
+    try:
+        first = await client.get_current_user("tok_a")
+        pooled = client.client
+        second = await client.get_current_user_guilds("tok_a")
+        assert first.status_code == 200 and second.status_code == 200
+        assert client.client is pooled
+        assert second.json()[0]["id"] == "g1"
+    finally:
+        await client.aclose()
+
+
+async def test_retries_after_429():
+    fake = _fake_with_member()
+    fake.rate_limit_next(2, retry_after=0.01)
+    client = fake.client()
+    try:
+        res = await client.get_guild_member("g1", "1")
+        assert res.status_code == 200
+        assert res.json()["roles"] == ["222"]
+        assert len(fake.requests) == 3
+    finally:
+        await client.aclose()
+
+
+async def test_gives_up_when_retry_after_is_too_long():
+    fake = _fake_with_member()
+    fake.rate_limit_next(1, retry_after=120)
+    client = fake.client(max_retry_after=1.0)
+    try:
+        res = await client.get_guild_member("g1", "1")
+        assert res.status_code == 429
+        assert len(fake.requests) == 1
+    finally:
+        await client.aclose()
+
+
+async def test_waits_for_exhausted_bucket_to_reset():
+    fake = _fake_with_member()
+    fake.bucket_remaining = 0
+    fake.bucket_reset_after = 0.1
+    client = fake.client()
+    try:
+        await client.get_guild_member("g1", "1")
+        started = time.monotonic()
+        res = await client.get_guild_member("g1", "1")
+        assert res.status_code == 200
+        assert time.monotonic() - started >= 0.08
+    finally:
+        await client.aclose()
+
+
+async def test_buckets_are_split_by_guild():
+    fake = _fake_with_member()
+    fake.add_member("g2", "1", roles=[])
+    fake.bucket_remaining = 0
+    fake.bucket_reset_after = 5.0
+    client = fake.client()
+    try:
+        await client.get_guild_member("g1", "1")
+        started = time.monotonic()
+        # A different guild is a different bucket, so this must not wait on g1's reset.
+        res = await client.get_guild_member("g2", "1")
+        assert res.status_code == 200
+        assert time.monotonic() - started < 1.0
+    finally:
+        await client.aclose()
+
+
+async def test_unknown_member_is_404():
+    fake = _fake_with_member()
+    client = fake.client()
+    try:
+        res = await client.get_guild_member("g1", "999")
+        assert res.status_code == 404
+    finally:
+        await client.aclose()
+
+
+async def test_cache_coalesces_concurrent_member_lookups():
+    fake = _fake_with_member()
+    fake.latency = 0.05
+    client = fake.client()
+    cache = DiscordCache(client)
+    try:
+        results = await asyncio.gather(*[cache.get_guild_member("g1", "1") for _ in range(20)])
+        assert all(r.status_code == 200 for r in results)
+        assert len(fake.requests) == 1
+        assert cache.stats()["coalesced"] == 19
+
+        await cache.get_guild_member("g1", "1")
+        assert len(fake.requests) == 1
+        assert cache.hits == 1
+    finally:
+        await client.aclose()
+
+
+async def test_cache_remembers_unknown_members_briefly():
+    fake = _fake_with_member()
+    client = fake.client()
+    cache = DiscordCache(client, negative_ttl=0.05)
+    try:
+        assert (await cache.get_guild_member("g1", "404")).status_code == 404
+        assert (await cache.get_guild_member("g1", "404")).status_code == 404
+        assert len(fake.requests) == 1
+
+        await asyncio.sleep(0.06)
+        await cache.get_guild_member("g1", "404")
+        assert len(fake.requests) == 2
+    finally:
+        await client.aclose()
+
+
+async def test_cache_does_not_keep_auth_failures():
+    fake = _fake_with_member()
+    client = fake.client()
+    cache = DiscordCache(client)
+    try:
+        assert (await cache.get_user_guilds("1", "bad_token")).status_code == 401
+        fake.users["bad_token"] = {"id": "1", "username": "Alice"}
+        assert (await cache.get_user_guilds("1", "bad_token")).status_code == 200
+        assert len(fake.requests) == 2
+    finally:
+        await client.aclose()
@@ -0,0 +1,37 @@
+def _create_item(client, headers, name):
+    res = client.post("/api/items/", json={"name": name}, headers=headers)
+    assert res.status_code == 200
+    return res.json()
+
+
+def test_item_summary_keyset_pages(client, campaign, admin_auth_headers, player_auth_headers):
+    ids = [_create_item(client, admin_auth_headers, f"Item {i}")["id"] for i in range(3)]
+
+    first = client.get("/api/items/summary?limit=2", headers=player_auth_headers).json()
+    assert first["items"] == [{"id": ids[0], "name": "Item 0"}, {"id": ids[1], "name": "Item 1"}]
+
+    second = client.get(
+        f"/api/items/summary?limit=2&cursor={first['next_cursor']}", headers=player_auth_headers
+    ).json()
+    assert [i["id"] for i in second["items"]] == ids[2:]
+    assert second["next_cursor"] is None
+
+
+def test_store_summary_inlines_item_name(client, campaign, admin_auth_headers, player_auth_headers):
+    item = _create_item(client, admin_auth_headers, "Rope")
+    res = client.post(
+        "/api/store/items/",
+        json={"item_id": item["id"], "price": 5, "quantity_available": -1},
+        headers=admin_auth_headers,
+    )
+    assert res.status_code == 200
+
+    page = client.get("/api/store/items/summary", headers=player_auth_headers).json()
+    assert page["next_cursor"] is None
+    assert page["items"] == [
+        {"id": res.json()["id"], "item_id": item["id"], "name": "Rope", "price": 5, "quantity_available": -1}
+    ]
+
+    # The full listing still nests the item, now loaded in the same query.
+    full = client.get("/api/store/items/", headers=player_auth_headers).json()
+    assert full[0]["item"]["name"] == "Rope"
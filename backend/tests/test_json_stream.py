@@ -0,0 +1,54 @@
+import json
+
+from app.json_stream import JSONStreamParser, MalformedValue, parse_partial
+
+ADVENTURE = {
+    "title": "The Quiet Convoy",
+    "hook": "Why did it stop \"answering\"? {really}",
+    "acts": [
+        {"title": "Act 1", "scene_names": ["Dock", "Hold"]},
+        {"title": "Act 2", "scene_names": []},
+        {"title": "Act 3", "level": -1.5e2, "final": True},
+    ],
+    "climax": None,
+    "resolution": "Done.",
+}
+
+
+def test_values_are_reported_as_they_complete():
+    text = "```json\n" + json.dumps(ADVENTURE, indent=2) + "\n```"
+    parser = JSONStreamParser()
+    seen = []
+    for i in range(0, len(text), 7):
+        for path, value in parser.feed(text[i:i + 7]):
+            seen.append(path)
+            if path == ("acts", 0):
+                # Act 1 is reported before the later acts have arrived.
+                assert '"Act 3"' not in parser.text
+
+    assert seen == [
+        ("title",), ("hook",), ("acts", 0), ("acts", 1), ("acts", 2), ("acts",), ("climax",), ("resolution",),
+    ]
+    assert parser.done
+    assert parser.result() == ADVENTURE
+
+
+def test_cut_off_output_keeps_finished_items():
+    text = json.dumps(ADVENTURE)
+    cut = text[: text.index('"Act 3"') + 3]
+    assert parse_partial(cut) == {
+        "title": ADVENTURE["title"], "hook": ADVENTURE["hook"], "acts": ADVENTURE["acts"][:2],
+    }
+    assert parse_partial("no json here") == {}
+
+
+def test_malformed_item_does_not_spoil_its_neighbours():
+    text = '{"title": "T", "acts": [{"title": "A1"}, {"title": "A2" "summary": "x"}, {"title": "A3"},], "resolution": "R"}'
+    parser = JSONStreamParser()
+    events = dict(parser.feed(text))
+    assert isinstance(events[("acts", 1)], MalformedValue)
+    assert parser.result() == {
+        "title": "T",
+        "acts": [{"title": "A1"}, '{"title": "A2" "summary": "x"}', {"title": "A3"}],
+        "resolution": "R",
+    }
@@ -0,0 +1,393 @@
+import os
+import time
+
+import httpx
+import pytest
+
+from app.llm_cache import LLMResponseCache
+from tests.fake_llm import FakeLLM
+
+
+async def test_generate_parses_fenced_json():
+    fake = FakeLLM(content='Here you go:\n```json\n{"title": "Stub"}\n```')
+    service = fake.service()
+    try:
+        result = await service.generate("sys", "user", json_schema={"type": "object"})
+        assert result == {"title": "Stub"}
+        assert fake.requests[0]["response_format"] == {"type": "json_object"}
+        assert "stream" not in fake.requests[0]
+    finally:
+        await service.aclose()
+
+
+async def test_calls_reuse_one_pooled_client():
+    fake = FakeLLM()
+    service = fake.service()
+    try:
+        await service.generate("sys", "one")
+        pooled = service.client
+        await service.generate("sys", "two")
+        assert service.client is pooled
+    finally:
+        await service.aclose()
+
+
+async def test_stream_yields_deltas():
+    fake = FakeLLM(content="The lighthouse keeper is lying.", chunk_size=5)
+    service = fake.service()
+    try:
+        deltas = [d async for d in await service.generate("sys", "user", stream=True)]
+        assert len(deltas) == 7
+        assert "".join(deltas) == fake.content
+        assert fake.requests[0]["stream"] is True
+    finally:
+        await service.aclose()
+
+
+async def test_stream_raises_on_error_status():
+    fake = FakeLLM(status_code=503)
+    service = fake.service()
+    try:
+        with pytest.raises(httpx.HTTPStatusError):
+            async for _ in await service.generate("sys", "user", stream=True):
+                pass
+    finally:
+        await service.aclose()
+
+
+def _cache(tmp_path, **kwargs):
+    return LLMResponseCache(str(tmp_path), max_bytes=kwargs.pop("max_bytes", 10_000_000), max_age=kwargs.pop("max_age", 3600), **kwargs)
+
+
+async def test_identical_requests_hit_the_cache(tmp_path):
+    fake = FakeLLM(content='{"title": "Cached"}')
+    cache = _cache(tmp_path)
+    service = fake.service(response_cache=cache)
+    try:
+        first = await service.generate("sys", "user", json_schema={"type": "object"})
+        second = await service.generate("sys", "user", json_schema={"type": "object"})
+        other = await service.generate("sys", "user", json_schema={"type": "object"}, temperature=0.2)
+    finally:
+        await service.aclose()
+
+    assert first == second == other == {"title": "Cached"}
+    assert len(fake.requests) == 2
+    assert cache.stats() == {"hits": 1, "misses": 2, "writes": 2, "evictions": 0}
+
+
+async def test_bypass_skips_lookup_but_refreshes_entry(tmp_path):
+    fake = FakeLLM(content="v1")
+    cache = _cache(tmp_path)
+    service = fake.service(response_cache=cache)
+    try:
+        await service.generate("sys", "user")
+        fake.content = "v2"
+        assert await service.generate("sys", "user", cache=False) == "v2"
+        assert await service.generate("sys", "user") == "v2"
+    finally:
+        await service.aclose()
+    assert len(fake.requests) == 2
+
+
+async def test_streamed_completion_is_cached_and_replayed(tmp_path):
+    fake = FakeLLM(content='{"title": "Streamed"}', chunk_size=4)
+    cache = _cache(tmp_path)
+    service = fake.service(response_cache=cache)
+    try:
+        first = "".join([d async for d in await service.generate("sys", "u", json_schema={}, stream=True)])
+        replay = [d async for d in await service.generate("sys", "u", json_schema={}, stream=True)]
+    finally:
+        await service.aclose()
+    assert replay == [first]
+    assert len(fake.requests) == 1
+
+
+async def test_malformed_json_is_not_cached(tmp_path):
+    fake = FakeLLM(content="not json at all")
+    cache = _cache(tmp_path)
+    service = fake.service(response_cache=cache)
+    try:
+        with pytest.raises(ValueError):
+            await service.generate("sys", "user", json_schema={"type": "object"})
+    finally:
+        await service.aclose()
+    assert cache.writes == 0
+
+
+async def test_response_the_caller_rejects_is_not_cached(tmp_path):
+    from pydantic import BaseModel
+
+    class Titled(BaseModel):
+        title: str
+
+    fake = FakeLLM(content='{"name": "No title"}')
+    cache = _cache(tmp_path)
+    service = fake.service(response_cache=cache)
+    request = dict(json_schema=Titled.model_json_schema(), validate=Titled.model_validate)
+    try:
+        assert await service.generate("sys", "user", **request) == {"name": "No title"}
+        streamed = "".join([d async for d in await service.generate("sys", "user", stream=True, **request)])
+        assert streamed == fake.content and cache.writes == 0
+
+        fake.content = '{"title": "Fixed"}'
+        assert await service.generate("sys", "user", **request) == {"title": "Fixed"}
+        assert await service.generate("sys", "user", **request) == {"title": "Fixed"}
+    finally:
+        await service.aclose()
+    assert len(fake.requests) == 3
+    assert cache.writes == 1
+
+
+async def test_cut_off_json_is_salvaged_but_not_cached(tmp_path):
+    fake = FakeLLM(content='```json\n{"title": "T", "acts": [{"n": 1}, {"n": 2}, {"n": ')
+    cache = _cache(tmp_path)
+    service = fake.service(response_cache=cache)
+    try:
+        result = await service.generate("sys", "user", json_schema={"type": "object"})
+    finally:
+        await service.aclose()
+    assert result == {"title": "T", "acts": [{"n": 1}, {"n": 2}]}
+    assert cache.writes == 0
+
+
+def test_eviction_by_age_and_size(tmp_path):
+    cache = _cache(tmp_path, max_bytes=250, max_age=60)
+    for name in ("old", "a", "b", "c"):
+        cache.put(LLMResponseCache.key("m", name, "", None, 0.7, 10), "x" * 50, "m")
+    stale = cache._path(LLMResponseCache.key("m", "old", "", None, 0.7, 10))
+    os.utime(stale, (time.time() - 120, time.time() - 120))
+    # "a" is the least recently used of the live entries.
+    lru = cache._path(LLMResponseCache.key("m", "a", "", None, 0.7, 10))
+    os.utime(lru, (time.time() - 30, time.time() - 30))
+
+    removed = cache.evict()
+
+    assert not stale.exists()
+    assert not lru.exists()
+    assert removed == 2
+    assert cache.get(LLMResponseCache.key("m", "c", "", None, 0.7, 10)) == "x" * 50
+
+
+def test_eviction_sweeps_leftover_temp_files(tmp_path):
+    cache = _cache(tmp_path, max_bytes=250, max_age=3600)
+    key = LLMResponseCache.key("m", "a", "", None, 0.7, 10)
+    cache.put(key, "x" * 50, "m")
+    leftover = cache._path(key).parent / "abandoned.tmp"
+    leftover.write_text("y" * 500)
+    os.utime(leftover, (time.time() - 600, time.time() - 600))
+    writing = cache._path(key).parent / "writing.tmp"
+    writing.write_text("z" * 220)
+
+    assert cache.evict() == 2
+    assert not leftover.exists() and writing.exists()
+    # The in-progress write counts toward the budget, so the entry went too.
+    assert not cache._path(key).exists()
+
+
+# --- Call stats ----------------------------------------------------------------
+
+from app.llm_service import record_llm_calls
+
+
+async def test_call_stats_capture_usage_and_timing():
+    fake = FakeLLM(content='{"title": "Stub"}', delay=0.05)
+    service = fake.service()
+    try:
+        with record_llm_calls() as calls:
+            await service.generate("sys", "user", json_schema={"type": "object"}, label="outline")
+        [stats] = calls
+        assert stats.label == "outline" and stats.model == "stub-model"
+        assert stats.prompt_tokens > 0 and stats.completion_tokens == len('{"title": "Stub"}') // 4
+        assert stats.ttfb >= 0.05 and stats.latency >= stats.ttfb
+        assert stats.retries == 0 and stats.error is None and not stats.cached
+    finally:
+        await service.aclose()
+
+
+async def test_streamed_call_stats_fill_in_when_stream_ends():
+    fake = FakeLLM(content="x" * 40, chunk_size=10)
+    service = fake.service()
+    try:
+        with record_llm_calls() as calls:
+            stream = await service.generate("sys", "user", stream=True)
+            [stats] = calls
+            assert stats.latency is None
+            assert "".join([d async for d in stream]) == "x" * 40
+        assert fake.requests[0]["stream_options"] == {"include_usage": True}
+        assert stats.stream and stats.completion_tokens == 10
+        assert stats.ttfb is not None and stats.latency >= stats.ttfb
+    finally:
+        await service.aclose()
+
+
+async def test_failed_and_cached_calls_are_recorded(tmp_path):
+    failing = FakeLLM(status_code=500)
+    service = failing.service()
+    try:
+        with record_llm_calls() as calls:
+            with pytest.raises(httpx.HTTPStatusError):
+                await service.generate("sys", "user")
+        assert "500" in calls[0].error
+    finally:
+        await service.aclose()
+
+    fake = FakeLLM(content="cached text")
+    service = fake.service(response_cache=LLMResponseCache(str(tmp_path), max_bytes=10**6, max_age=3600))
+    try:
+        await service.generate("sys", "user")
+        with record_llm_calls() as calls:
+            assert await service.generate("sys", "user") == "cached text"
+        assert calls[0].cached and calls[0].latency == 0.0
+        assert len(fake.requests) == 1
+    finally:
+        await service.aclose()
+
+
+async def test_recording_is_scoped_to_the_block():
+    fake = FakeLLM()
+    service = fake.service()
+    try:
+        with record_llm_calls() as calls:
+            pass
+        await service.generate("sys", "user")
+        assert calls == []
+    finally:
+        await service.aclose()
+
+
+# --- Fallback, hedging and circuit breaking ------------------------------------
+
+import asyncio
+
+from app.config import get_settings
+from app.llm_service import CircuitBreaker, LLMService, LLMUnavailableError
+
+
+@pytest.fixture
+def hedge_after(monkeypatch):
+    def set_delay(seconds: float):
+        monkeypatch.setattr(get_settings(), "LLM_HEDGE_DELAY", seconds)
+        monkeypatch.setattr(get_settings(), "LLM_HEDGE_MIN_DELAY", 0.0)
+    return set_delay
+
+
+async def test_falls_back_to_next_provider_on_server_error():
+    primary, backup = FakeLLM(status_code=503), FakeLLM(content="from backup")
+    service = primary.service(fallbacks=[backup.provider()])
+    try:
+        with record_llm_calls() as calls:
+            assert await service.generate("sys", "user") == "from backup"
+        assert len(primary.requests) == 1 and backup.requests[0]["model"] == "stub-fallback"
+        assert calls[0].model == "stub-fallback" and not calls[0].hedged
+        assert service.providers[0].breaker.failures == 1
+    finally:
+        await service.aclose()
+
+
+async def test_hedges_when_first_byte_is_late(hedge_after):
+    hedge_after(0.05)
+    slow, fast = FakeLLM(content="slow", delay=2.0), FakeLLM(content="fast")
+    service = slow.service(fallbacks=[fast.provider()])
+    try:
+        with record_llm_calls() as calls:
+            started = asyncio.get_running_loop().time()
+            assert await service.generate("sys", "user") == "fast"
+            assert asyncio.get_running_loop().time() - started < 1.0
+        assert calls[0].hedged and calls[0].model == "stub-fallback"
+        # The loser was cancelled, which says nothing about its health.
+        assert service.providers[0].breaker.failures == 0
+    finally:
+        await service.aclose()
+
+
+async def test_no_hedge_when_primary_is_fast(hedge_after):
+    hedge_after(0.5)
+    primary, backup = FakeLLM(content="primary"), FakeLLM(content="backup")
+    service = primary.service(fallbacks=[backup.provider()])
+    try:
+        assert await service.generate("sys", "user") == "primary"
+        assert backup.requests == []
+        assert len(service.providers[0].ttfb) == 1
+    finally:
+        await service.aclose()
+
+
+async def test_hedge_delay_follows_primary_ttfb_p95(hedge_after):
+    hedge_after(30.0)
+    service = FakeLLM().service(fallbacks=[FakeLLM().provider()])
+    assert service._hedge_delay() == 30.0
+    service.providers[0].ttfb.extend([0.1] * 19 + [0.9])
+    assert service._hedge_delay() == pytest.approx(0.1)
+    service.providers[0].ttfb.extend([0.9] * 5)
+    assert service._hedge_delay() == pytest.approx(0.9)
+
+    assert FakeLLM().service(fallbacks=[])._hedge_delay() is None
+
+
+async def test_streams_are_hedged_too(hedge_after):
+    hedge_after(0.05)
+    slow, fast = FakeLLM(content="slow" * 5, delay=2.0), FakeLLM(content="quick stream", chunk_size=3)
+    service = slow.service(fallbacks=[fast.provider()])
+    try:
+        with record_llm_calls() as calls:
+            stream = await service.generate("sys", "user", stream=True)
+            assert "".join([d async for d in stream]) == "quick stream"
+        assert calls[0].hedged and calls[0].completion_tokens == len("quick stream") // 4
+    finally:
+        await service.aclose()
+
+
+async def test_breaker_skips_failing_provider_until_cooldown(monkeypatch):
+    now = [0.0]
+    primary, backup = FakeLLM(status_code=500), FakeLLM(content="backup")
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=60, clock=lambda: now[0])
+    service = primary.service(fallbacks=[backup.provider()])
+    service.providers[0].breaker = breaker
+    try:
+        for _ in range(4):
+            assert await service.generate("sys", "user") == "backup"
+        assert len(primary.requests) == 2 and breaker.state == "open"
+
+        # Half-open: one trial request; a success closes the breaker again.
+        now[0] = 61.0
+        primary.status_code = 200
+        primary.content = "primary again"
+        assert await service.generate("sys", "user") == "primary again"
+        assert breaker.state == "closed"
+    finally:
+        await service.aclose()
+
+
+async def test_all_breakers_open_fails_fast():
+    fake = FakeLLM(status_code=500)
+    service = fake.service(fallbacks=[])
+    service.providers[0].breaker = CircuitBreaker(failure_threshold=1, cooldown=60)
+    try:
+        with pytest.raises(httpx.HTTPStatusError):
+            await service.generate("sys", "user")
+        with pytest.raises(LLMUnavailableError):
+            await service.generate("sys", "user")
+        assert len(fake.requests) == 1
+    finally:
+        await service.aclose()
+
+
+def test_breaker_reopens_when_trial_fails():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert not breaker.allow()
+    now[0] = 11.0
+    assert breaker.allow() and not breaker.allow()  # a single trial at a time
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_fallback_models_are_read_from_settings(monkeypatch):
+    monkeypatch.setattr(get_settings(), "LLM_FALLBACK_MODELS", "openai/gpt-4o-mini, local/llama@http://vllm:8000/v1/")
+    service = LLMService(base_url="https://openrouter.ai/api/v1", api_key="k", model="deepseek/deepseek-chat")
+    assert [p.name for p in service.providers] == [
+        "deepseek/deepseek-chat@https://openrouter.ai/api/v1",
+        "openai/gpt-4o-mini@https://openrouter.ai/api/v1",
+        "local/llama@http://vllm:8000/v1",
+    ]
@@ -0,0 +1,79 @@
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.llm_service import LLMService
+from app.modules.campaigns.models import Campaign
+from app.modules.oneshot.schemas import OneShotGenerateRequest
+from app.modules.oneshot.service import OneShotService
+from scripts.bench_oneshot import JobTiming, percentile, summarize
+from scripts.llm_stub import StubConfig, create_app
+
+
+def _stub_service(config: StubConfig) -> LLMService:
+    return LLMService(
+        base_url="http://llm-stub/v1",
+        api_key="test-key",
+        model="stub-model",
+        transport=httpx.ASGITransport(app=create_app(config)),
+    )
+
+
+async def test_stub_drives_a_whole_generation(db_session: Session, campaign: Campaign):
+    service = OneShotService(db_session)
+    request = OneShotGenerateRequest(party_size=5, generate_npcs=True, generate_pregens=True)
+    job = service.create_generation_job(campaign.id, request)
+
+    llm = _stub_service(StubConfig(chunk_size=7))
+    try:
+        with patch("app.modules.oneshot.service.llm_service", llm):
+            await service.process_generation(job.id, stream=True)
+    finally:
+        await llm.aclose()
+
+    db_session.refresh(job)
+    assert job.status == "completed", job.content
+    assert [len(act["scenes"]) for act in job.content["acts"]] == [2, 2, 2]
+    assert job.content["acts"][2]["scenes"][0]["name"] == "Scene 3.1"
+    assert len(job.content["pregens"]) == 5 and len(job.content["npcs"]) == 2
+    assert job.tokens_used > 0
+
+
+async def test_stub_injects_rate_limits_and_stalls():
+    app = create_app(StubConfig(error_rate=1.0, retry_after=7))
+    body = {"model": "m", "messages": [{"role": "user", "content": "hi"}]}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://stub") as client:
+        res = await client.post("/v1/chat/completions", json=body)
+        assert res.status_code == 429 and res.headers["retry-after"] == "7"
+
+    app = create_app(StubConfig(timeout_rate=1.0, stall=5.0))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://stub") as client:
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(client.post("/v1/chat/completions", json=body), timeout=0.2)
+
+
+def test_stub_fault_sequence_is_seeded():
+    def statuses(seed):
+        app = create_app(StubConfig(error_rate=0.5, seed=seed))
+        body = {"model": "m", "messages": [{"role": "user", "content": "hi"}]}
+        with TestClient(app) as client:
+            return [client.post("/v1/chat/completions", json=body).status_code for _ in range(20)]
+
+    assert statuses(1) == statuses(1)
+    assert {200, 429} <= set(statuses(1))
+
+
+def test_benchmark_summary():
+    jobs = [JobTiming(id=i, submitted=0.0, started=i * 1.0, finished=i * 1.0 + 10, status="completed") for i in range(10)]
+    jobs.append(JobTiming(id=10, submitted=0.0, status="failed"))
+    report = summarize(jobs, wall=30.0)
+
+    assert report["completed"] == 10 and report["failed"] == 1
+    assert report["jobs_per_minute"] == 20.0
+    assert report["queue_wait"]["p50"] == 4.0 and report["queue_wait"]["max"] == 9.0
+    assert report["generation"]["p99"] == 10.0
+    assert percentile([], 50) is None
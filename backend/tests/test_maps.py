@@ -108,7 +108,10 @@ def test_add_player_note_on_discovered_hex(client, campaign, player_auth_headers
         headers=player_auth_headers,
     )
     assert res.status_code == 200
-    assert any(n["text"] == "There's a cave here" for n in res.json()["player_notes"])
+    assert res.json()["text"] == "There's a cave here"
+
+    hexes = client.get(f"/api/maps/{map_id}", headers=player_auth_headers).json()["hexes"]
+    assert next(h for h in hexes if (h["q"], h["r"]) == (0, 0))["note_count"] == 1
 
 
 def test_add_player_note_on_undiscovered_hex(client, campaign, player_auth_headers):
@@ -143,3 +146,40 @@ def test_add_note_wrong_campaign(client, db_session, campaign, player_auth_heade
         headers=player_auth_headers,
     )
     assert res.status_code == 404
+
+
+
+def test_hex_notes_are_paginated(client, campaign, player_auth_headers):
+    map_id = client.get("/api/maps/", headers=player_auth_headers).json()[0]["id"]
+    for i in range(5):
+        client.post(f"/api/maps/{map_id}/hexes/0/0/notes", json={"text": f"Note {i}"}, headers=player_auth_headers)
+
+    first = client.get(f"/api/maps/{map_id}/hexes/0/0/notes?limit=3", headers=player_auth_headers).json()
+    assert [n["text"] for n in first["items"]] == ["Note 0", "Note 1", "Note 2"]
+    rest = client.get(
+        f"/api/maps/{map_id}/hexes/0/0/notes?limit=3&cursor={first['next_cursor']}", headers=player_auth_headers
+    ).json()
+    assert [n["text"] for n in rest["items"]] == ["Note 3", "Note 4"] and rest["next_cursor"] is None
+
+    assert client.get(f"/api/maps/{map_id}/hexes/50/50/notes", headers=player_auth_headers).status_code == 404
+
+
+def test_map_read_loads_hexes_in_one_query(client, db_session, campaign, player_auth_headers):
+    from sqlalchemy import event
+    map_id = client.get("/api/maps/", headers=player_auth_headers).json()[0]["id"]
+    client.post(f"/api/maps/{map_id}/hexes/0/0/notes", json={"text": "Cave"}, headers=player_auth_headers)
+    db_session.expunge_all()
+
+    statements = []
+    listen = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+    event.listen(db_session.bind, "before_cursor_execute", listen)
+    try:
+        res = client.get(f"/api/maps/{map_id}", headers=player_auth_headers)
+    finally:
+        event.remove(db_session.bind, "before_cursor_execute", listen)
+
+    assert res.status_code == 200
+    assert sum(h["note_count"] for h in res.json()["hexes"]) == 1
+    assert "player_notes" not in res.json()["hexes"][0]
+    assert sum("FROM hexes" in s for s in statements) == 1
+    assert not any("hex_notes" in s for s in statements)
@@ -0,0 +1,68 @@
+from prometheus_client import REGISTRY
+
+from app.discord_cache import DiscordCache
+from app.modules.oneshot.models import GeneratedOneShot
+from tests.fake_discord import FakeDiscord
+
+
+def _value(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_requests_are_counted_by_route_template(client, db_session, campaign, player_auth_headers):
+    route = {"method": "GET", "route": "/api/maps/{map_id}"}
+    before = _value("http_requests_total", status="404", **route)
+    seen = _value("http_request_duration_seconds_count", **route)
+
+    for map_id in (9001, 9002):
+        assert client.get(f"/api/maps/{map_id}", headers=player_auth_headers).status_code == 404
+    client.get("/no/such/path")
+
+    assert _value("http_requests_total", status="404", **route) == before + 2
+    assert _value("http_request_duration_seconds_count", **route) == seen + 2
+    assert _value("http_requests_total", method="GET", route="unmatched", status="404") >= 1
+    assert _value("http_requests_in_progress", method="GET") == 0
+
+
+def test_metrics_endpoint_requires_the_token_when_set(client, monkeypatch):
+    from app.config import get_settings
+    monkeypatch.setattr(get_settings(), "METRICS_TOKEN", "scrape-secret")
+
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
+
+
+def test_metrics_endpoint_reports_queue_depth(client, db_session, campaign):
+    db_session.add_all([
+        GeneratedOneShot(campaign_id=campaign.id, status="pending", generation_params={}),
+        GeneratedOneShot(campaign_id=campaign.id, status="pending", generation_params={}),
+        GeneratedOneShot(campaign_id=campaign.id, status="processing", generation_params={}),
+    ])
+    db_session.commit()
+
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    assert 'oneshot_jobs{status="pending"} 2.0' in res.text
+    assert 'oneshot_jobs{status="processing"} 1.0' in res.text
+    assert "http_request_duration_seconds_bucket" in res.text
+
+
+async def test_discord_calls_and_cache_lookups_are_measured():
+    fake = FakeDiscord()
+    fake.add_member("g1", "1", roles=["222"])
+    client = fake.client()
+    cache = DiscordCache(client)
+    route = {"method": "GET", "route": "/guilds/{guild_id}/members/{user_id}", "status": "200"}
+    calls = _value("discord_request_duration_seconds_count", **route)
+    hits, misses = _value("cache_lookups_total", cache="discord", result="hit"), _value("cache_lookups_total", cache="discord", result="miss")
+    try:
+        await cache.get_guild_member("g1", "1")
+        await cache.get_guild_member("g1", "1")
+    finally:
+        await client.aclose()
+
+    assert _value("discord_request_duration_seconds_count", **route) == calls + 1
+    assert _value("cache_lookups_total", cache="discord", result="miss") == misses + 1
+    assert _value("cache_lookups_total", cache="discord", result="hit") == hits + 1
@@ -0,0 +1,124 @@
+import pytest
+from app.modules.missions import dag, models as mission_models
+
+
+@pytest.fixture(autouse=True)
+def _clear_graph_cache():
+    # Campaign ids are reused across rolled-back tests, so start every test cold.
+    dag._cache.clear()
+    yield
+    dag._cache.clear()
+
+
+def _create_mission(client, headers, name, prerequisite_id=None, **extra):
+    res = client.post(
+        "/api/missions/",
+        json={"name": name, "prerequisite_id": prerequisite_id, "rewards": [], **extra},
+        headers=headers,
+    )
+    assert res.status_code == 200, res.text
+    return res.json()
+
+
+def test_graph_orders_by_prerequisite_and_locks_chain(client, campaign, admin_auth_headers, player_auth_headers):
+    root = _create_mission(client, admin_auth_headers, "Root")
+    mid = _create_mission(client, admin_auth_headers, "Middle", prerequisite_id=root["id"])
+    leaf = _create_mission(client, admin_auth_headers, "Leaf", prerequisite_id=mid["id"])
+
+    res = client.get("/api/missions/graph", headers=player_auth_headers)
+    assert res.status_code == 200
+    nodes = res.json()
+    assert [n["id"] for n in nodes] == [root["id"], mid["id"], leaf["id"]]
+    by_id = {n["id"]: n for n in nodes}
+    assert by_id[root["id"]]["depth"] == 0 and by_id[root["id"]]["unlocked"] is True
+    assert by_id[mid["id"]]["depth"] == 1 and by_id[mid["id"]]["unlocked"] is False
+    assert by_id[leaf["id"]]["depth"] == 2 and by_id[leaf["id"]]["unlocked"] is False
+
+
+def test_status_change_invalidates_cached_graph(client, campaign, admin_auth_headers, player_auth_headers):
+    root = _create_mission(client, admin_auth_headers, "Root")
+    child = _create_mission(client, admin_auth_headers, "Child", prerequisite_id=root["id"])
+
+    nodes = {n["id"]: n for n in client.get("/api/missions/graph", headers=player_auth_headers).json()}
+    assert nodes[child["id"]]["unlocked"] is False
+
+    res = client.put(f"/api/missions/{root['id']}/status?status=Completed", headers=admin_auth_headers)
+    assert res.status_code == 200
+
+    nodes = {n["id"]: n for n in client.get("/api/missions/graph", headers=player_auth_headers).json()}
+    assert nodes[child["id"]]["unlocked"] is True
+
+
+def test_graph_hides_undiscoverable_missions_from_players(client, campaign, admin_auth_headers, player_auth_headers):
+    _create_mission(client, admin_auth_headers, "Visible")
+    hidden = _create_mission(client, admin_auth_headers, "Secret", is_discoverable=False)
+
+    player_ids = [n["id"] for n in client.get("/api/missions/graph", headers=player_auth_headers).json()]
+    assert hidden["id"] not in player_ids
+
+    admin_ids = [
+        n["id"]
+        for n in client.get("/api/missions/graph?include_hidden=true", headers=admin_auth_headers).json()
+    ]
+    assert hidden["id"] in admin_ids
+
+
+def test_update_rejects_prerequisite_cycle(client, campaign, admin_auth_headers):
+    a = _create_mission(client, admin_auth_headers, "A")
+    b = _create_mission(client, admin_auth_headers, "B", prerequisite_id=a["id"])
+
+    res = client.put(
+        f"/api/missions/{a['id']}",
+        json={"name": "A", "prerequisite_id": b["id"], "rewards": []},
+        headers=admin_auth_headers,
+    )
+    assert res.status_code == 400
+    assert "cycle" in res.json()["detail"]
+
+
+def test_create_rejects_unknown_prerequisite(client, campaign, admin_auth_headers):
+    res = client.post(
+        "/api/missions/",
+        json={"name": "Orphan", "prerequisite_id": 99999, "rewards": []},
+        headers=admin_auth_headers,
+    )
+    assert res.status_code == 400
+
+
+def test_existing_cycle_is_flagged_and_locked(db_session, campaign):
+    a = mission_models.Mission(name="A", campaign_id=campaign.id)
+    b = mission_models.Mission(name="B", campaign_id=campaign.id)
+    db_session.add_all([a, b])
+    db_session.flush()
+    a.prerequisite_id = b.id
+    b.prerequisite_id = a.id
+    db_session.commit()
+
+    graph = dag.build_graph(db_session, campaign.id)
+    assert graph.nodes[a.id].in_cycle and graph.nodes[b.id].in_cycle
+    assert not graph.nodes[a.id].unlocked and not graph.nodes[b.id].unlocked
+
+
+def test_summary_pages_with_counts(client, campaign, admin_auth_headers, player_auth_headers):
+    ids = [_create_mission(client, admin_auth_headers, f"M{i}")["id"] for i in range(3)]
+    res = client.post(f"/api/missions/{ids[0]}/signup", headers=player_auth_headers)
+    assert res.status_code == 200
+
+    first = client.get("/api/missions/summary?limit=2", headers=player_auth_headers).json()
+    assert [m["id"] for m in first["items"]] == ids[:2]
+    assert first["items"][0]["player_count"] == 1
+    assert first["items"][0]["reward_count"] == 0
+    assert "players" not in first["items"][0]
+    assert first["next_cursor"] == ids[1]
+
+    second = client.get(
+        f"/api/missions/summary?limit=2&cursor={first['next_cursor']}", headers=player_auth_headers
+    ).json()
+    assert [m["id"] for m in second["items"]] == ids[2:]
+    assert second["next_cursor"] is None
+
+
+def test_full_list_accepts_cursor(client, campaign, admin_auth_headers, player_auth_headers):
+    ids = [_create_mission(client, admin_auth_headers, f"M{i}")["id"] for i in range(3)]
+    res = client.get(f"/api/missions/?cursor={ids[0]}&limit=1", headers=player_auth_headers)
+    assert [m["id"] for m in res.json()] == [ids[1]]
@@ -16,6 +16,33 @@ def campaign(db_session: Session):
     db_session.refresh(camp)
     return camp
 
+def _staged_responses(adventure, npcs=(), pregens=()):
+    """Answer each pipeline stage (picked by the schema it asks for) from one full adventure dict."""
+    calls = []
+
+    async def generate(**kwargs):
+        calls.append(kwargs)
+        stage = kwargs["json_schema"]["title"]
+        if stage == "AdventureOutline":
+            return {
+                **adventure,
+                "acts": [
+                    {**act, "scene_names": [s["name"] for s in act["scenes"]], "scenes": None}
+                    for act in adventure["acts"]
+                ],
+            }
+        if stage == "ActScenes":
+            number = int(kwargs["user_prompt"].split("Write the full scenes for Act ")[1].split()[0])
+            return {"scenes": adventure["acts"][number - 1]["scenes"]}
+        if stage == "NPCRoster":
+            return {"npcs": list(npcs)}
+        if stage == "PregenRoster":
+            return {"pregens": list(pregens)}
+        raise AssertionError(f"unexpected stage {stage}")
+
+    return generate, calls
+
+
 @pytest.mark.asyncio
 async def test_generate_adventure_outline(db_session: Session, campaign: Campaign):
     # Mock LLM Response
@@ -43,7 +70,7 @@ async def test_generate_adventure_outline(db_session: Session, campaign: Campaig
     }
     
     with patch("app.modules.oneshot.service.llm_service") as mock_llm:
-        mock_llm.generate = AsyncMock(return_value=mock_adventure)
+        mock_llm.generate = AsyncMock(side_effect=_staged_responses(mock_adventure)[0])
         
         service = OneShotService(db_session)
         request = OneShotGenerateRequest(party_size=4, party_level=1)
@@ -61,8 +88,10 @@ async def test_generate_adventure_outline(db_session: Session, campaign: Campaig
         assert job.title == "The Dark Cave"
         assert job.content["title"] == "The Dark Cave"
         
-        # Verify LLM called
-        mock_llm.generate.assert_called_once()
+        assert job.content["acts"][0]["scenes"][0]["name"] == "Entrance"
+        
+        # Verify LLM called: the outline, then one call per act
+        assert mock_llm.generate.call_count == 2
         call_args = mock_llm.generate.call_args
         assert "JSON" in call_args.kwargs.get("system_prompt", "") or call_args.kwargs.get("json_schema")
         
@@ -71,3 +100,682 @@ async def test_generate_adventure_outline(db_session: Session, campaign: Campaig
         journal = create_journal_entry_data(adventure_struct)
         assert journal["name"] == "The Dark Cave"
         assert len(journal["pages"]) >= 3 # Overview, Act 1, Conclusion
+
+
+def _three_act_adventure():
+    return {
+        "title": "The Quiet Convoy",
+        "hook": "Why did the grain convoy stop answering?",
+        "acts": [
+            {
+                "title": f"Act {n}",
+                "summary": f"Summary {n}.",
+                "key_npcs": ["Quartermaster Ilse"],
+                "scenes": [{"name": f"Scene {n}", "type": "exploration", "description": "..."}],
+            }
+            for n in (1, 2, 3)
+        ],
+        "climax": "The convoy's Vinculum wakes.",
+        "resolution": "The hex is marked.",
+    }
+
+
+@pytest.mark.asyncio
+async def test_phase_flags_add_npc_and_pregen_stages(db_session: Session, campaign: Campaign):
+    npcs = [{"name": "Quartermaster Ilse", "role": "Patron", "secret": "She sold the route."}]
+    pregens = [{"name": "Tam", "species": "Tiefling", "class_name": "Rogue", "level": 3}]
+    generate, calls = _staged_responses(_three_act_adventure(), npcs=npcs, pregens=pregens)
+
+    with patch("app.modules.oneshot.service.llm_service") as mock_llm:
+        mock_llm.generate = AsyncMock(side_effect=generate)
+        service = OneShotService(db_session)
+        job = service.create_generation_job(
+            campaign.id, OneShotGenerateRequest(party_size=1, party_level=3, generate_npcs=True, generate_pregens=True)
+        )
+        await service.process_generation(job.id)
+
+    db_session.refresh(job)
+    assert job.status == "completed"
+    stages = [c["json_schema"]["title"] for c in calls]
+    assert stages[0] == "AdventureOutline"
+    assert sorted(stages[1:]) == ["ActScenes"] * 3 + ["NPCRoster", "PregenRoster"]
+    assert [a["scenes"][0]["name"] for a in job.content["acts"]] == ["Scene 1", "Scene 2", "Scene 3"]
+    assert job.content["npcs"][0]["secret"] == "She sold the route."
+    assert job.content["pregens"][0]["class_name"] == "Rogue"
+
+    pages = create_journal_entry_data(AdventureStructure(**job.content))["pages"]
+    assert [p["name"] for p in pages][-3:] == ["NPCs", "Pregenerated Characters", "Conclusion"]
+
+
+@pytest.mark.asyncio
+async def test_act_stages_run_concurrently_under_the_limit(db_session: Session, campaign: Campaign, monkeypatch):
+    from app.config import get_settings
+    monkeypatch.setattr(get_settings(), "ONESHOT_PARALLEL_CALLS", 2)
+    generate, _ = _staged_responses(_three_act_adventure())
+    in_flight = peak = 0
+
+    async def slow_generate(**kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return await generate(**kwargs)
+
+    with patch("app.modules.oneshot.service.llm_service") as mock_llm:
+        mock_llm.generate = AsyncMock(side_effect=slow_generate)
+        service = OneShotService(db_session)
+        job = service.create_generation_job(campaign.id, OneShotGenerateRequest(generate_npcs=True))
+        await service.process_generation(job.id)
+
+    db_session.refresh(job)
+    assert job.status == "completed"
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_act_stage_fails_the_job(db_session: Session, campaign: Campaign):
+    generate, _ = _staged_responses(_three_act_adventure())
+
+    async def flaky_generate(**kwargs):
+        if "Write the full scenes for Act 2 " in kwargs["user_prompt"]:
+            raise ValueError("LLM output was not valid JSON")
+        return await generate(**kwargs)
+
+    with patch("app.modules.oneshot.service.llm_service") as mock_llm:
+        mock_llm.generate = AsyncMock(side_effect=flaky_generate)
+        service = OneShotService(db_session)
+        job = service.create_generation_job(campaign.id, OneShotGenerateRequest())
+        await service.process_generation(job.id)
+
+    db_session.refresh(job)
+    assert job.status == "failed"
+    assert "not valid JSON" in job.content["error"]
+
+
+# --- Job queue ---------------------------------------------------------------
+
+import asyncio
+from datetime import timedelta
+from sqlalchemy.orm import sessionmaker
+from app.modules.oneshot import queue
+
+
+def _pending_jobs(db_session, campaign, count):
+    service = OneShotService(db_session)
+    return [service.create_generation_job(campaign.id, OneShotGenerateRequest()) for _ in range(count)]
+
+
+def test_claim_respects_global_concurrency_cap(db_session: Session, campaign: Campaign):
+    jobs = _pending_jobs(db_session, campaign, 3)
+
+    assert queue.claim_next(db_session, max_concurrent=2, worker_id="w1") == jobs[0].id
+    assert queue.claim_next(db_session, max_concurrent=2, worker_id="w2") == jobs[1].id
+    assert queue.claim_next(db_session, max_concurrent=2, worker_id="w1") is None
+
+    db_session.refresh(jobs[0])
+    assert jobs[0].status == "processing" and jobs[0].claimed_by == "w1" and jobs[0].attempts == 1
+    jobs[0].status = "completed"
+    db_session.commit()
+
+    assert queue.claim_next(db_session, max_concurrent=2, worker_id="w1") == jobs[2].id
+    assert queue.queue_depth(db_session) == 0
+
+
+def test_stale_processing_jobs_are_recovered(db_session: Session, campaign: Campaign):
+    retry, exhausted, alive = _pending_jobs(db_session, campaign, 3)
+    old = queue._utcnow() - timedelta(minutes=10)
+    for job, attempts, beat in ((retry, 1, old), (exhausted, 3, old), (alive, 1, queue._utcnow())):
+        job.status, job.attempts, job.heartbeat_at, job.claimed_by = "processing", attempts, beat, "dead-worker"
+    db_session.commit()
+
+    assert queue.recover_stale_jobs(db_session, stale_after=300, max_attempts=3) == 2
+
+    db_session.expire_all()
+    assert retry.status == "pending" and retry.claimed_by is None
+    assert exhausted.status == "failed" and "interrupted" in exhausted.content["error"]
+    assert alive.status == "processing"
+
+
+async def test_worker_pool_runs_queued_jobs_under_the_cap(db_session: Session, campaign: Campaign):
+    jobs = _pending_jobs(db_session, campaign, 4)
+    in_flight = 0
+    peak = 0
+
+    async def slow_generate(**kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+
+        async def deltas():
+            yield '{"title": "Queued", "hook": "", '
+            yield '"acts": [], "resolution": ""}'
+        return deltas()
+
+    pool = queue.OneShotWorkerPool(
+        session_factory=sessionmaker(bind=db_session.get_bind()),
+        max_concurrent=2,
+        poll_interval=0.01,
+        worker_id="test-pool",
+    )
+    with patch("app.modules.oneshot.service.llm_service") as mock_llm:
+        mock_llm.generate = AsyncMock(side_effect=slow_generate)
+        await pool.start()
+        try:
+            for _ in range(200):
+                await asyncio.sleep(0.01)
+                db_session.expire_all()
+                if all(j.status == "completed" for j in jobs):
+                    break
+        finally:
+            await pool.stop()
+
+    assert [j.status for j in jobs] == ["completed"] * 4
+    assert peak == 2
+
+
+async def test_worker_that_loses_its_claim_stops_and_writes_nothing(db_session: Session, campaign: Campaign):
+    [job] = _pending_jobs(db_session, campaign, 1)
+    started, cancelled = asyncio.Event(), asyncio.Event()
+
+    async def hanging_generate(**kwargs):
+        started.set()
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    pool = queue.OneShotWorkerPool(
+        session_factory=sessionmaker(bind=db_session.get_bind()),
+        max_concurrent=1, poll_interval=0.01, stale_after=0.05, worker_id="test-pool",
+    )
+    with patch("app.modules.oneshot.service.llm_service") as mock_llm:
+        mock_llm.generate = AsyncMock(side_effect=hanging_generate)
+        await pool.start()
+        try:
+            await asyncio.wait_for(started.wait(), 1)
+            # Recovered and claimed by another worker, which is alive.
+            job.claimed_by, job.heartbeat_at = "other-worker", queue._utcnow() + timedelta(hours=1)
+            db_session.commit()
+            await asyncio.wait_for(cancelled.wait(), 1)
+            for _ in range(100):
+                if not pool.running:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await pool.stop()
+
+    db_session.expire_all()
+    assert job.status == "processing" and job.claimed_by == "other-worker" and job.content is None
+
+
+async def test_result_is_not_written_without_the_claim(db_session: Session, campaign: Campaign):
+    [job] = _pending_jobs(db_session, campaign, 1)
+    assert queue.claim_next(db_session, max_concurrent=1, worker_id="w2") == job.id
+    generate, _ = _staged_responses(_three_act_adventure())
+
+    with patch("app.modules.oneshot.service.llm_service") as mock_llm:
+        mock_llm.generate = AsyncMock(side_effect=generate)
+        await OneShotService(db_session).process_generation(job.id, worker_id="w1")
+
+    db_session.expire_all()
+    assert job.status == "processing" and job.claimed_by == "w2" and job.content is None
+
+
+async def test_failed_run_is_requeued_until_out_of_attempts(db_session: Session, campaign: Campaign, monkeypatch):
+    from app.config import get_settings
+    monkeypatch.setattr(get_settings(), "ONESHOT_MAX_ATTEMPTS", 2)
+    [job] = _pending_jobs(db_session, campaign, 1)
+
+    with patch("app.modules.oneshot.service.llm_service") as mock_llm:
+        mock_llm.generate = AsyncMock(side_effect=ValueError("LLM output was not valid JSON"))
+        for expected in ("pending", "failed"):
+            assert queue.claim_next(db_session, max_concurrent=1, worker_id="w1") == job.id
+            await OneShotService(db_session).process_generation(job.id, worker_id="w1")
+            db_session.expire_all()
+            assert job.status == expected
+
+    assert job.attempts == 2 and mock_llm.generate.await_count == 2
+    assert "not valid JSON" in job.content["error"]
+
+
+def test_generate_endpoint_queues_job(client, campaign, admin_auth_headers):
+    with patch.object(queue.oneshot_worker, "notify") as notify:
+        res = client.post("/api/oneshot/generate", json={"party_size": 3}, headers=admin_auth_headers)
+    assert res.status_code == 200, res.text
+    assert res.json()["status"] == "pending"
+    notify.assert_called_once()
+
+
+# --- Streaming ---------------------------------------------------------------
+
+import json
+from app.modules.oneshot.progress import progress_hub
+from tests.fake_llm import FakeLLM
+
+_ADVENTURE = {
+    "title": "Streamed",
+    "hook": "It arrives piece by piece.",
+    "acts": [],
+    "resolution": "Done.",
+}
+
+
+async def test_streamed_generation_fills_job(db_session: Session, campaign: Campaign):
+    fake = FakeLLM(content=json.dumps(_ADVENTURE), chunk_size=10)
+    service = OneShotService(db_session)
+    job = service.create_generation_job(campaign.id, OneShotGenerateRequest())
+
+    llm = fake.service()
+    try:
+        with patch("app.modules.oneshot.service.llm_service", llm):
+            await service.process_generation(job.id, stream=True)
+    finally:
+        await llm.aclose()
+
+    db_session.refresh(job)
+    assert job.status == "completed"
+    assert job.content["title"] == "Streamed"
+    assert job.progress_text is None
+    assert fake.requests[0]["stream"] is True
+    assert progress_hub.text(job.id) is None
+
+
+def _parse_sse(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_stream_endpoint_relays_progress_until_complete(client, db_session, campaign, admin_auth_headers):
+    job = OneShotService(db_session).create_generation_job(campaign.id, OneShotGenerateRequest())
+    job.status = "processing"
+    job.progress_text = '{"title": "Str'
+    db_session.commit()
+
+    async def worker_finishes(job_id, timeout):
+        job.status = "completed"
+        job.title = "Streamed"
+        job.progress_text = None
+        db_session.commit()
+
+    with patch.object(progress_hub, "wait", side_effect=worker_finishes):
+        res = client.get(f"/api/oneshot/{job.id}/stream", headers=admin_auth_headers)
+
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/event-stream")
+    assert _parse_sse(res.text) == [
+        ("status", {"status": "processing"}),
+        ("delta", {"text": '{"title": "Str'}),
+        ("status", {"status": "completed"}),
+        ("complete", {"id": job.id, "title": "Streamed"}),
+    ]
+
+
+def test_stream_endpoint_reports_failure(client, db_session, campaign, admin_auth_headers):
+    job = OneShotService(db_session).create_generation_job(campaign.id, OneShotGenerateRequest())
+    job.status = "failed"
+    job.content = {"error": "model refused"}
+    db_session.commit()
+
+    res = client.get(f"/api/oneshot/{job.id}/stream", headers=admin_auth_headers)
+    assert _parse_sse(res.text)[-1] == ("error", {"error": "model refused"})
+
+
+# --- LLM usage accounting ------------------------------------------------------
+
+from app.modules.oneshot.models import LLMCall
+
+
+async def test_generation_records_llm_usage(db_session: Session, campaign: Campaign):
+    fake = FakeLLM(content=json.dumps(_ADVENTURE), chunk_size=10)
+    service = OneShotService(db_session)
+    job = service.create_generation_job(campaign.id, OneShotGenerateRequest())
+
+    llm = fake.service()
+    try:
+        with patch("app.modules.oneshot.service.llm_service", llm):
+            await service.process_generation(job.id, stream=True)
+    finally:
+        await llm.aclose()
+
+    db_session.refresh(job)
+    [call] = db_session.query(LLMCall).filter(LLMCall.job_id == job.id).all()
+    assert call.label == "outline" and call.stream and call.campaign_id == campaign.id
+    assert call.prompt_tokens > 0 and call.completion_tokens == len(json.dumps(_ADVENTURE)) // 4
+    assert call.latency_ms is not None and call.ttfb_ms is not None
+    assert job.tokens_used == call.prompt_tokens + call.completion_tokens
+    assert job.llm_model_used == "stub-model"
+
+
+async def test_failed_generation_still_records_usage(db_session: Session, campaign: Campaign):
+    fake = FakeLLM(status_code=502)
+    service = OneShotService(db_session)
+    job = service.create_generation_job(campaign.id, OneShotGenerateRequest())
+
+    llm = fake.service()
+    try:
+        with patch("app.modules.oneshot.service.llm_service", llm):
+            await service.process_generation(job.id)
+    finally:
+        await llm.aclose()
+
+    db_session.refresh(job)
+    assert job.status == "failed"
+    [call] = job.llm_calls
+    assert call.label == "outline" and "502" in call.error
+
+
+def test_llm_stats_endpoint_aggregates_by_stage(client, db_session, campaign, admin_auth_headers, monkeypatch):
+    from app.config import get_settings
+    monkeypatch.setattr(get_settings(), "LLM_PROMPT_PRICE_PER_MTOK", 1.0)
+    monkeypatch.setattr(get_settings(), "LLM_COMPLETION_PRICE_PER_MTOK", 2.0)
+    job = OneShotService(db_session).create_generation_job(campaign.id, OneShotGenerateRequest())
+    rows = [("outline", 400, 100), ("act_scenes", 1200, 300), ("act_scenes", 800, 3000), ("act_scenes", None, None)]
+    for label, latency, ttfb in rows:
+        db_session.add(LLMCall(
+            job_id=job.id, campaign_id=campaign.id, label=label, model="stub-model",
+            prompt_tokens=1000, completion_tokens=500, latency_ms=latency, ttfb_ms=ttfb,
+            cached=latency is None,
+        ))
+    db_session.commit()
+
+    res = client.get("/api/oneshot/llm-stats", headers=admin_auth_headers)
+    assert res.status_code == 200
+    body = res.json()
+    assert body["jobs"] == 1
+    assert body["total"]["calls"] == 4 and body["total"]["cached"] == 1
+    assert body["total"]["prompt_tokens"] == 4000
+    assert body["total"]["estimated_cost"] == pytest.approx(4000 * 1e-6 + 2000 * 2e-6)
+
+    acts = next(s for s in body["stages"] if s["label"] == "act_scenes")
+    assert acts["latency_ms"]["count"] == 2
+    assert acts["latency_ms"]["p50"] == 800 and acts["latency_ms"]["max"] == 1200
+    buckets = {b["le"]: b["count"] for b in acts["latency_ms"]["histogram"]}
+    assert buckets[1000] == 1 and buckets[2500] == 1 and sum(buckets.values()) == 2
+    assert [s["label"] for s in body["stages"]] == ["act_scenes", "outline"]
+
+
+def test_llm_stats_requires_admin(client, player_auth_headers):
+    assert client.get("/api/oneshot/llm-stats", headers=player_auth_headers).status_code == 403
+
+
+# --- Foundry module package ----------------------------------------------------
+
+import os
+import zipfile
+
+
+@pytest.mark.asyncio
+async def test_completed_generation_writes_foundry_module(db_session: Session, campaign: Campaign, oneshot_output_dir):
+    with patch("app.modules.oneshot.service.llm_service") as mock_llm:
+        mock_llm.generate = AsyncMock(side_effect=_staged_responses(_three_act_adventure())[0])
+        service = OneShotService(db_session)
+        job = service.create_generation_job(campaign.id, OneShotGenerateRequest())
+        await service.process_generation(job.id)
+
+    db_session.refresh(job)
+    assert job.foundry_module_path == str(oneshot_output_dir / "modules" / f"oneshot-{job.id}.zip")
+    with zipfile.ZipFile(job.foundry_module_path) as zf:
+        assert sorted(zf.namelist()) == ["module.json", "packs/adventures.db"]
+        manifest = json.loads(zf.read("module.json"))
+        lines = zf.read("packs/adventures.db").decode().splitlines()
+
+    assert manifest["id"] == f"oneshot-{job.id}" and manifest["title"] == "The Quiet Convoy"
+    assert manifest["packs"][0]["path"] == "packs/adventures.db"
+    entry = json.loads(lines[0])
+    assert len(lines) == 1 and entry["name"] == "The Quiet Convoy"
+    assert len(entry["_id"]) == 16
+    assert len({page["_id"] for page in entry["pages"]}) == len(entry["pages"]) == 5
+    assert not [f for f in os.listdir(oneshot_output_dir / "modules") if f.endswith(".tmp")]
+
+
+def _completed_job(db_session, campaign_id):
+    job = OneShotService(db_session).create_generation_job(campaign_id, OneShotGenerateRequest())
+    job.status = "completed"
+    job.content = _three_act_adventure()
+    db_session.commit()
+    return job
+
+
+def test_foundry_module_endpoint_serves_cached_zip(client, db_session, campaign, player_auth_headers):
+    job = _completed_job(db_session, campaign.id)
+
+    res = client.get(f"/api/oneshot/{job.id}/foundry-module", headers=player_auth_headers)
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "application/zip"
+    assert f'filename="oneshot-{job.id}.zip"' in res.headers["content-disposition"]
+    assert "max-age" in res.headers["cache-control"]
+    db_session.refresh(job)
+    assert job.foundry_module_path
+
+    # Served from disk, not rebuilt: the bytes (and their random ids) don't change.
+    with patch("app.modules.oneshot.service.build_module_zip") as build:
+        again = client.get(f"/api/oneshot/{job.id}/foundry-module", headers=player_auth_headers)
+        partial = client.get(
+            f"/api/oneshot/{job.id}/foundry-module", headers={**player_auth_headers, "Range": "bytes=0-9"}
+        )
+        cached = client.get(
+            f"/api/oneshot/{job.id}/foundry-module",
+            headers={**player_auth_headers, "If-None-Match": res.headers["etag"]},
+        )
+    build.assert_not_called()
+    assert again.content == res.content
+    assert partial.status_code == 206 and partial.content == res.content[:10]
+    assert partial.headers["content-range"] == f"bytes 0-9/{len(res.content)}"
+    assert cached.status_code == 304 and cached.headers["etag"] == res.headers["etag"]
+
+
+def test_foundry_module_endpoint_rebuilds_missing_zip(client, db_session, campaign, player_auth_headers):
+    job = _completed_job(db_session, campaign.id)
+    job.foundry_module_path = "/nonexistent/oneshot.zip"
+    db_session.commit()
+
+    res = client.get(f"/api/oneshot/{job.id}/foundry-module", headers=player_auth_headers)
+    assert res.status_code == 200
+    db_session.refresh(job)
+    assert os.path.isfile(job.foundry_module_path)
+
+
+def test_foundry_module_endpoint_checks_job(client, db_session, campaign, player_auth_headers):
+    pending = OneShotService(db_session).create_generation_job(campaign.id, OneShotGenerateRequest())
+    other = Campaign(name="Other", discord_guild_id="999")
+    db_session.add(other)
+    db_session.commit()
+    foreign = _completed_job(db_session, other.id)
+
+    assert client.get(f"/api/oneshot/{pending.id}/foundry-module", headers=player_auth_headers).status_code == 400
+    assert client.get(f"/api/oneshot/{foreign.id}/foundry-module", headers=player_auth_headers).status_code == 403
+    assert client.get("/api/oneshot/99999/foundry-module", headers=player_auth_headers).status_code == 404
+
+
+# --- Per-item validation and repair ----------------------------------------------
+
+def _repairing(generate, calls, fix):
+    """Wrap a staged `generate` so repair calls are recorded and answered with `fix(kwargs)`."""
+    async def wrapped(**kwargs):
+        if kwargs.get("label") == "repair":
+            calls.append(kwargs)
+            return fix(kwargs)
+        return await generate(**kwargs)
+    return wrapped
+
+
+async def test_invalid_scene_is_repaired_alone(db_session: Session, campaign: Campaign):
+    base, calls = _staged_responses(_three_act_adventure())
+    fixed = {"name": "Scene 2", "type": "social", "description": "Fixed."}
+
+    async def generate(**kwargs):
+        response = await base(**kwargs)
+        if "Write the full scenes for Act 2 " in kwargs["user_prompt"]:
+            return {"scenes": [{"name": "Scene 2", "type": "dance-off"}]}
+        return response
+
+    with patch("app.modules.oneshot.service.llm_service") as mock_llm:
+        mock_llm.generate = AsyncMock(side_effect=_repairing(generate, calls, lambda kw: fixed))
+        service = OneShotService(db_session)
+        job = service.create_generation_job(campaign.id, OneShotGenerateRequest())
+        await service.process_generation(job.id)
+
+    db_session.refresh(job)
+    assert job.status == "completed", job.content
+    assert job.content["acts"][1]["scenes"] == [{**fixed, "encounters": [], "transitions": []}]
+    assert job.content["acts"][0]["scenes"][0]["name"] == "Scene 1"
+
+    repairs = [c for c in calls if c.get("label") == "repair"]
+    assert len(repairs) == 1 and repairs[0]["json_schema"]["title"] == "SceneOutline"
+    assert 'scene 1 of Act 2 ("Scene 2")' in repairs[0]["user_prompt"]
+    assert "dance-off" in repairs[0]["user_prompt"]
+    # The act itself was not regenerated.
+    assert [c["json_schema"]["title"] for c in calls].count("ActScenes") == 3
+
+
+async def test_scenes_cut_off_are_written_from_the_outline(db_session: Session, campaign: Campaign):
+    base, calls = _staged_responses(_three_act_adventure())
+
+    async def generate(**kwargs):
+        response = await base(**kwargs)
+        if "Write the full scenes for Act 3 " in kwargs["user_prompt"]:
+            return {"scenes": []}  # what survives of an output that stopped early
+        return response
+
+    fix = lambda kw: {"name": "Scene 3", "type": "boss", "description": "Written on repair."}  # noqa: E731
+    with patch("app.modules.oneshot.service.llm_service") as mock_llm:
+        mock_llm.generate = AsyncMock(side_effect=_repairing(generate, calls, fix))
+        service = OneShotService(db_session)
+        job = service.create_generation_job(campaign.id, OneShotGenerateRequest())
+        await service.process_generation(job.id)
+
+    db_session.refresh(job)
+    assert job.status == "completed", job.content
+    assert job.content["acts"][2]["scenes"][0]["description"] == "Written on repair."
+    [repair] = [c for c in calls if c.get("label") == "repair"]
+    assert "is missing" in repair["user_prompt"]
+
+
+async def test_cut_off_pregen_roster_is_completed_to_the_party_size(db_session: Session, campaign: Campaign):
+    from app.llm_service import LLMService
+    pregen = {"name": "Tam", "species": "Tiefling", "class_name": "Rogue", "level": 3}
+    cut = json.dumps({"pregens": [pregen, {**pregen, "name": "Bo"}, pregen]})[:-40]
+    base, calls = _staged_responses(_three_act_adventure())
+
+    async def generate(**kwargs):
+        if kwargs["json_schema"]["title"] == "PregenRoster":
+            return LLMService.parse_json(cut, partial=True)
+        return await base(**kwargs)
+
+    fix = lambda kw: {**pregen, "name": "Repaired"}  # noqa: E731
+    with patch("app.modules.oneshot.service.llm_service") as mock_llm:
+        mock_llm.generate = AsyncMock(side_effect=_repairing(generate, calls, fix))
+        service = OneShotService(db_session)
+        job = service.create_generation_job(
+            campaign.id, OneShotGenerateRequest(party_size=5, party_level=3, generate_pregens=True)
+        )
+        await service.process_generation(job.id)
+
+    db_session.refresh(job)
+    assert job.status == "completed", job.content
+    assert [p["name"] for p in job.content["pregens"]] == ["Tam", "Bo", "Repaired", "Repaired", "Repaired"]
+    repairs = [c for c in calls if c.get("label") == "repair"]
+    assert len(repairs) == 3 and all("is missing" in r["user_prompt"] for r in repairs)
+
+
+async def test_cut_off_npc_roster_fails_the_stage(db_session: Session, campaign: Campaign):
+    from app.llm_service import LLMService
+    npc = {"name": "Quartermaster Ilse", "role": "Patron"}
+    cut = json.dumps({"npcs": [npc, npc]})[:-10]
+    base, _ = _staged_responses(_three_act_adventure())
+
+    async def generate(**kwargs):
+        if kwargs["json_schema"]["title"] == "NPCRoster":
+            return LLMService.parse_json(cut, partial=True)
+        return await base(**kwargs)
+
+    with patch("app.modules.oneshot.service.llm_service") as mock_llm:
+        mock_llm.generate = AsyncMock(side_effect=generate)
+        service = OneShotService(db_session)
+        job = service.create_generation_job(campaign.id, OneShotGenerateRequest(generate_npcs=True))
+        await service.process_generation(job.id)
+
+    db_session.refresh(job)
+    assert job.status == "failed"
+    assert "npcs output was cut off" in job.content["error"]
+
+
+async def test_too_many_invalid_items_fail_the_stage(db_session: Session, campaign: Campaign, monkeypatch):
+    from app.config import get_settings
+    monkeypatch.setattr(get_settings(), "ONESHOT_MAX_REPAIRS", 1)
+    base, calls = _staged_responses(_three_act_adventure())
+
+    async def generate(**kwargs):
+        response = await base(**kwargs)
+        if kwargs["json_schema"]["title"] == "ActScenes":
+            return {"scenes": ["not json", "also not json"]}
+        return response
+
+    with patch("app.modules.oneshot.service.llm_service") as mock_llm:
+        mock_llm.generate = AsyncMock(side_effect=_repairing(generate, calls, lambda kw: {}))
+        service = OneShotService(db_session)
+        job = service.create_generation_job(campaign.id, OneShotGenerateRequest())
+        await service.process_generation(job.id)
+
+    db_session.refresh(job)
+    assert job.status == "failed"
+    assert "too many to repair" in job.content["error"]
+
+
+async def test_streamed_outline_repairs_a_bad_act_before_the_stream_ends(db_session: Session, campaign: Campaign):
+    adventure = _three_act_adventure()
+    base, calls = _staged_responses(adventure)
+    outline = await base(json_schema={"title": "AdventureOutline"}, user_prompt="")
+    outline["acts"][1] = {"title": "Act 2"}  # no summary
+    text = json.dumps(outline)
+    events = []
+
+    async def generate(**kwargs):
+        if kwargs.get("stream"):
+            async def chunks():
+                for i in range(0, len(text), 16):
+                    await asyncio.sleep(0)
+                    yield text[i:i + 16]
+                events.append("stream ended")
+            return chunks()
+        if kwargs.get("label") == "repair":
+            events.append("repair")
+            return {"title": "Act 2", "summary": "Repaired.", "scene_names": ["Scene 2"]}
+        return await base(**kwargs)
+
+    with patch("app.modules.oneshot.service.llm_service") as mock_llm:
+        mock_llm.generate = AsyncMock(side_effect=generate)
+        service = OneShotService(db_session)
+        job = service.create_generation_job(campaign.id, OneShotGenerateRequest())
+        await service.process_generation(job.id, stream=True)
+
+    db_session.refresh(job)
+    assert job.status == "completed", job.content
+    assert job.content["acts"][1]["summary"] == "Repaired."
+    assert events == ["repair", "stream ended"]
+
+
+def test_job_payload_is_loaded_only_when_asked_for(db_session: Session, campaign: Campaign):
+    from sqlalchemy import inspect
+    campaign_id = campaign.id
+    service = OneShotService(db_session)
+    job = service.create_generation_job(campaign_id, OneShotGenerateRequest())
+    job_id = job.id
+    job.content = {"title": "Big"}
+    db_session.commit()
+    db_session.expunge_all()
+
+    [listed] = service.list_jobs(campaign_id)
+    assert {"content", "generation_params", "progress_text", "summary"} <= inspect(listed).unloaded
+    db_session.expunge_all()
+
+    detail = service.get_job(job_id)
+    assert not {"content", "generation_params"} & inspect(detail).unloaded
+    assert detail.content == {"title": "Big"}
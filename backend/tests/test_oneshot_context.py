@@ -0,0 +1,186 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.modules.campaigns.models import Campaign
+from app.modules.factions.models import FactionReputation
+from app.modules.maps.models import HexMap, Hex
+from app.modules.missions.models import Mission
+from app.modules.sessions.models import GameSession
+from app.modules.oneshot.context import (
+    build_campaign_context, estimate_tokens, load_sources, render_context, tfidf_similarity,
+)
+
+
+@pytest.fixture
+def campaign(db_session: Session):
+    camp = Campaign(name="Context Campaign", discord_guild_id="ctx-1")
+    db_session.add(camp)
+    db_session.commit()
+    db_session.refresh(camp)
+    return camp
+
+
+@pytest.fixture
+def big_campaign(db_session: Session, campaign: Campaign):
+    hex_map = HexMap(campaign_id=campaign.id, name="Sphere")
+    db_session.add(hex_map)
+    db_session.flush()
+    for q in range(10):
+        for r in range(10):
+            db_session.add(Hex(map_id=hex_map.id, q=q, r=r, terrain="void", is_discovered=True))
+    db_session.add(Hex(
+        map_id=hex_map.id, q=20, r=20, terrain="asteroid", is_discovered=True,
+        linked_location_name="Saltreach Waystation", controlling_faction="Collegium", hex_state="contested",
+    ))
+    db_session.add(FactionReputation(campaign_id=campaign.id, faction_name="Collegium", level=-2))
+    start = datetime(2026, 1, 1)
+    for i in range(8):
+        db_session.add(GameSession(
+            name=f"Session {i}", campaign_id=campaign.id, status="Completed",
+            session_date=start + timedelta(days=i), field_report=f"Report {i}: the crew hauled scrap.",
+        ))
+    db_session.commit()
+    return campaign
+
+
+def test_estimate_tokens_is_roughly_bpe_sized():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("crew") == 1
+    assert estimate_tokens("Saltreach Waystation, (4,-2).") == 3 + 3 + 1 + 7
+    text = "The convoy stopped answering somewhere past the Limes. " * 20
+    assert len(text) // 6 < estimate_tokens(text) < len(text) // 2
+
+
+def test_tfidf_prefers_rare_matching_terms():
+    docs = ["void void", "asteroid Saltreach Waystation", "void asteroid"]
+    scores = tfidf_similarity("Saltreach", docs)
+    assert scores[1] > 0 and scores[0] == scores[2] == 0
+    assert tfidf_similarity("", docs) == [0.0, 0.0, 0.0]
+
+
+def test_context_respects_token_budget(db_session: Session, big_campaign: Campaign):
+    context = build_campaign_context(db_session, big_campaign.id, {}, token_budget=100)
+    assert estimate_tokens(context) <= 100
+    assert "Campaign: Context Campaign" in context
+    assert "Current Faction Standing" in context
+    # The newest reports win the recency ranking.
+    assert "Report 7" in context and "Report 0" not in context
+
+
+def test_region_focus_pulls_in_nearby_and_matching_hexes(db_session: Session, big_campaign: Campaign):
+    sources = load_sources(db_session, big_campaign.id)
+
+    near = render_context(sources, {"hex_region": "9,9"}, token_budget=200)
+    assert "(9,9) void" in near and "(0,0) void" not in near
+
+    named = render_context(sources, {"hex_region": "Saltreach"}, token_budget=200)
+    assert "Saltreach Waystation" in named
+
+
+def test_mission_seeds_are_pinned_and_boost_linked_hexes(db_session: Session, big_campaign: Campaign):
+    mission = Mission(name="The Quiet Convoy", description="Find the grain convoy.", campaign_id=big_campaign.id)
+    db_session.add(mission)
+    db_session.flush()
+    linked = db_session.query(Hex).filter(Hex.q == 5, Hex.r == 5).one()
+    linked.linked_mission_id = mission.id
+    db_session.commit()
+
+    context = build_campaign_context(db_session, big_campaign.id, {"mission_ids": [mission.id]}, token_budget=150)
+    assert "Mission Seed: The Quiet Convoy — Find the grain convoy." in context
+    assert "(5,5) void" in context
+
+
+def test_small_campaign_fits_whole(db_session: Session, campaign: Campaign):
+    hex_map = HexMap(campaign_id=campaign.id, name="Sphere")
+    db_session.add(hex_map)
+    db_session.flush()
+    db_session.add(Hex(map_id=hex_map.id, q=0, r=0, terrain="void", is_discovered=True, note_count=2))
+    db_session.add(Hex(map_id=hex_map.id, q=1, r=0, terrain="void", is_discovered=False))
+    db_session.commit()
+
+    context = build_campaign_context(db_session, campaign.id, {"revelation_layer": "mid"})
+    assert "Revelation Layer: Mid — Hidden Threads" in context
+    assert "Known Hex Map (discovered hexes):\n  - (0,0) void (2 player note(s))" in context
+    assert "(1,0)" not in context
+    assert "Field Reports" not in context
+
+
+# --- Snapshots -----------------------------------------------------------------
+
+from unittest.mock import patch
+
+from app.modules.oneshot import snapshot
+
+
+def _loads(db_session, campaign_id):
+    with patch.object(snapshot, "load_section", wraps=snapshot.load_section) as loader:
+        doc = snapshot.get_snapshot(db_session, campaign_id)
+    return doc, sorted(call.args[2] for call in loader.call_args_list)
+
+
+def test_snapshot_is_built_once_then_served_from_cache(db_session: Session, big_campaign: Campaign):
+    doc, loaded = _loads(db_session, big_campaign.id)
+    assert loaded == ["campaign_name", "hexes", "missions", "reports", "reputations"]
+    assert doc["sections"]["campaign_name"] == "Context Campaign"
+    assert len(doc["sections"]["hexes"]) == 101
+
+    again, loaded = _loads(db_session, big_campaign.id)
+    assert loaded == []
+    assert again == doc
+    assert snapshot.get_sources(db_session, big_campaign.id) == load_sources(db_session, big_campaign.id)
+
+
+def test_changes_rebuild_only_the_affected_sections(db_session: Session, big_campaign: Campaign):
+    first, _ = _loads(db_session, big_campaign.id)
+
+    hex_ = db_session.query(Hex).filter(Hex.q == 0, Hex.r == 0).one()
+    hex_.linked_location_name = "Gallowglass Drift"
+    db_session.commit()
+    doc, loaded = _loads(db_session, big_campaign.id)
+    assert loaded == ["hexes"]
+    assert doc["version"] > first["version"]
+    assert doc["sections"]["hexes"][0]["linked_location_name"] == "Gallowglass Drift"
+
+    rep = db_session.query(FactionReputation).filter(FactionReputation.campaign_id == big_campaign.id).one()
+    db_session.delete(rep)
+    db_session.add(GameSession(
+        name="Session 9", campaign_id=big_campaign.id, status="Completed",
+        session_date=datetime(2026, 2, 1), field_report="Newest report.",
+    ))
+    db_session.commit()
+    doc, loaded = _loads(db_session, big_campaign.id)
+    assert loaded == ["reports", "reputations"]
+    assert doc["sections"]["reputations"] == []
+    assert doc["sections"]["reports"][0]["field_report"] == "Newest report."
+
+    # Columns the context doesn't use don't invalidate anything.
+    hex_.notes = "DM only"
+    db_session.commit()
+    assert _loads(db_session, big_campaign.id)[1] == []
+
+
+def test_change_during_rebuild_leaves_section_stale(db_session: Session, big_campaign: Campaign):
+    real_load = snapshot.load_section
+
+    def load_then_race(db, campaign_id, section):
+        value = real_load(db, campaign_id, section)
+        if section == "missions":
+            snapshot.invalidate(db.connection(), campaign_id, "missions")
+        return value
+
+    with patch.object(snapshot, "load_section", side_effect=load_then_race):
+        snapshot.get_snapshot(db_session, big_campaign.id)
+    assert _loads(db_session, big_campaign.id)[1] == ["missions"]
+
+
+def test_context_snapshot_endpoint(client, player_auth_headers, admin_auth_headers, db_session: Session):
+    # Players don't get it: the missions section includes hidden missions.
+    assert client.get("/api/oneshot/context", headers=player_auth_headers).status_code == 403
+
+    response = client.get("/api/oneshot/context", headers=admin_auth_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert set(body["sections"]) == {"campaign_name", "reputations", "missions", "hexes", "reports"}
+    assert isinstance(body["version"], int)
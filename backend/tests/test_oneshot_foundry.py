@@ -0,0 +1,122 @@
+import io
+import json
+import zipfile
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.modules.campaigns.models import Campaign
+from app.modules.factions.models import FactionReputation, FactionReputationEvent
+from app.modules.maps.models import HexMap, Hex, HexNote
+from app.modules.missions.models import Mission
+from app.modules.oneshot.models import GeneratedOneShot
+from app.modules.oneshot.foundry.package import encode_document
+from app.modules.oneshot.foundry.world import build_campaign_module_zip, HexLayout
+
+ADVENTURE = {
+    "title": "The Quiet Convoy",
+    "hook": "Why did the grain convoy stop answering?",
+    "acts": [],
+    "climax": "The convoy's Vinculum wakes.",
+    "resolution": "The hex is marked.",
+}
+
+
+@pytest.fixture
+def stocked_campaign(db_session: Session, campaign: Campaign):
+    db_session.add(GeneratedOneShot(campaign_id=campaign.id, status="completed", content=ADVENTURE, generation_params={}))
+    db_session.add(GeneratedOneShot(campaign_id=campaign.id, status="pending", generation_params={}))
+    db_session.add(Mission(name="Salvage <Run>", description="Strip the wreck.", tier="Tier 1", campaign_id=campaign.id))
+    rep = FactionReputation(campaign_id=campaign.id, faction_name="Collegium", level=2, color="#3b82f6")
+    db_session.add(rep)
+    db_session.flush()
+    db_session.add(FactionReputationEvent(reputation_id=rep.id, delta=2, description="Returned the archive."))
+
+    hex_map = HexMap(campaign_id=campaign.id, name="Sphere", hex_size=60)
+    db_session.add(hex_map)
+    db_session.flush()
+    db_session.add_all([
+        Hex(map_id=hex_map.id, q=-2, r=1, terrain="forest", is_discovered=True),
+        Hex(map_id=hex_map.id, q=0, r=0, terrain="plains", is_discovered=True, linked_location_name="Saltreach",
+            notes="Smugglers' cache.", note_count=1, player_notes=[HexNote(text="Friendly dockmaster")]),
+        Hex(map_id=hex_map.id, q=3, r=-1, terrain="water", is_discovered=False, notes="Secret."),
+    ])
+    db_session.commit()
+    return campaign
+
+
+def _read(path):
+    with zipfile.ZipFile(path) as zf:
+        manifest = json.loads(zf.read("module.json"))
+        packs = {
+            p["name"]: [json.loads(line) for line in zf.read(p["path"]).decode().splitlines()]
+            for p in manifest["packs"]
+        }
+    return manifest, packs
+
+
+def test_campaign_export_packs_journals_and_scene(db_session, stocked_campaign, tmp_path):
+    path = build_campaign_module_zip(db_session, stocked_campaign.id, str(tmp_path))
+    manifest, packs = _read(path)
+
+    assert manifest["id"] == f"campaign-{stocked_campaign.id}"
+    assert [a["name"] for a in packs["adventures"]] == ["The Quiet Convoy"]
+    assert "Salvage &lt;Run&gt;" in packs["missions"][0]["pages"][0]["text"]["content"]
+    faction = packs["factions"][0]["pages"][0]["text"]["content"]
+    assert "+2" in faction and "Returned the archive." in faction
+
+    # Only discovered hexes are drawn; only noted ones get a page and a map note.
+    [notes_entry] = packs["hex-notes"]
+    [page] = notes_entry["pages"]
+    assert "Smugglers&#x27; cache." in page["text"]["content"] and "Friendly dockmaster" in page["text"]["content"]
+    assert "Secret." not in json.dumps(packs)
+
+    [scene] = packs["scenes"]
+    assert scene["grid"]["type"] in (4, 5) and scene["grid"]["size"] == 104
+    assert len(scene["drawings"]) == 2
+    for d in scene["drawings"]:
+        assert 0 <= d["x"] and d["x"] + d["shape"]["width"] <= scene["width"] + 1
+        assert 0 <= d["y"] and d["y"] + d["shape"]["height"] <= scene["height"] + 1
+    [note] = scene["notes"]
+    assert note["text"] == "Saltreach"
+    assert (note["entryId"], note["pageId"]) == (notes_entry["_id"], page["_id"])
+
+
+def test_campaign_export_ids_are_stable(db_session, stocked_campaign, tmp_path):
+    _, first = _read(build_campaign_module_zip(db_session, stocked_campaign.id, str(tmp_path / "a")))
+    _, second = _read(build_campaign_module_zip(db_session, stocked_campaign.id, str(tmp_path / "b")))
+    assert first == second
+
+
+def test_hex_layout_matches_foundry_column_offsets():
+    layout = HexLayout(60, min_q=0, max_q=3, min_s=0, max_s=6)
+    # Neighbours in a column are one grid size apart; odd columns sit half a hex lower.
+    assert layout.center(0, 1)[1] - layout.center(0, 0)[1] == layout.grid_size
+    assert layout.center(1, 0)[1] - layout.center(0, 0)[1] == layout.grid_size / 2
+    assert layout.grid_type == 4
+    assert HexLayout(60, min_q=1, max_q=3, min_s=0, max_s=6).grid_type == 5
+
+
+def test_document_fields_are_streamed_lazily():
+    produced = []
+
+    def drawings():
+        for i in range(3):
+            produced.append(i)
+            yield {"i": i}
+
+    pieces = encode_document({"_id": "x", "drawings": drawings()})
+    head = "".join(next(pieces) for _ in range(4))
+    assert head == '{"_id":"x","drawings":' and produced == []
+    assert json.loads(head + "".join(pieces)) == {"_id": "x", "drawings": [{"i": 0}, {"i": 1}, {"i": 2}]}
+
+
+def test_foundry_world_endpoint(client, db_session, stocked_campaign, admin_auth_headers, player_auth_headers):
+    assert client.get("/api/oneshot/foundry-world", headers=player_auth_headers).status_code == 403
+
+    res = client.get("/api/oneshot/foundry-world", headers=admin_auth_headers)
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "application/zip"
+    assert res.headers["cache-control"] == "no-store"
+    with zipfile.ZipFile(io.BytesIO(res.content)) as zf:
+        assert "packs/scenes.db" in zf.namelist()
@@ -0,0 +1,61 @@
+import json
+import logging
+
+from sqlalchemy import text
+
+from app.config import get_settings
+from app.logging_config import JsonFormatter
+from app.query_stats import QueryStats, query_stats_var, statement_template
+
+
+def test_templates_collapse_whitespace_and_in_lists():
+    assert statement_template("SELECT *\n  FROM items WHERE id IN (?, ?, ?)") == "SELECT * FROM items WHERE id IN (...)"
+    assert statement_template("SELECT 1 WHERE a IN (%(a_1)s, %(a_2)s)") == "SELECT 1 WHERE a IN (...)"
+    assert statement_template("INSERT INTO t (a, b) VALUES (?, ?)") == "INSERT INTO t (a, b) VALUES (...)"
+
+
+def test_statements_are_counted_only_inside_a_request_scope(db_session):
+    db_session.execute(text("SELECT 1"))
+    stats = QueryStats()
+    token = query_stats_var.set(stats)
+    try:
+        for i in range(3):
+            db_session.execute(text("SELECT :n"), {"n": i})
+        db_session.execute(text("SELECT 2"))
+    finally:
+        query_stats_var.reset(token)
+    db_session.execute(text("SELECT 1"))
+
+    assert stats.count == 4 and stats.seconds > 0
+    assert stats.repeated() == [("SELECT ?", 3)]
+
+
+def test_access_log_line_carries_the_request_totals():
+    stats = QueryStats()
+    stats.record("SELECT * FROM hexes WHERE id = ?", 0.002)
+    stats.record("SELECT * FROM hexes WHERE id = ?", 0.001)
+    token = query_stats_var.set(stats)
+    try:
+        access = logging.LogRecord("uvicorn.access", logging.INFO, __file__, 1, "GET /api/maps/1", None, None)
+        other = logging.LogRecord("app.main", logging.INFO, __file__, 1, "hello", None, None)
+        line, plain = json.loads(JsonFormatter().format(access)), json.loads(JsonFormatter().format(other))
+    finally:
+        query_stats_var.reset(token)
+
+    assert line["db_queries"] == 2 and line["db_time_ms"] == 3.0
+    assert line["db_repeated"] == [{"sql": "SELECT * FROM hexes WHERE id = ?", "count": 2}]
+    assert "db_queries" not in plain
+
+
+def test_repeated_statements_log_a_warning(client, player_auth_headers, monkeypatch, caplog):
+    monkeypatch.setattr(get_settings(), "SQL_REPEAT_WARN_THRESHOLD", 0)
+    with caplog.at_level(logging.WARNING, logger="app.main"):
+        assert client.get("/api/missions/", headers=player_auth_headers).status_code == 200
+    assert not [r for r in caplog.records if r.name == "app.main"]
+
+    monkeypatch.setattr(get_settings(), "SQL_REPEAT_WARN_THRESHOLD", 1)
+    with caplog.at_level(logging.WARNING, logger="app.main"):
+        assert client.get("/api/missions/", headers=player_auth_headers).status_code == 200
+    [warning] = [r for r in caplog.records if r.name == "app.main"]
+    assert warning.path == "/api/missions/" and warning.db_queries >= 1
+    assert any("FROM users" in r["sql"] for r in warning.db_repeated)
@@ -0,0 +1,118 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.modules.auth import models as auth_models
+from app.modules.campaigns import role_sync
+from tests.fake_discord import FakeDiscord
+
+DM_ROLE = "900"
+PLAYER_ROLE = "901"
+
+
+@pytest.fixture
+def role_campaign(db_session, campaign):
+    campaign.dm_role_id = DM_ROLE
+    campaign.player_role_id = PLAYER_ROLE
+    db_session.commit()
+    return campaign
+
+
+def _user(db_session, campaign, discord_id, role="player", is_active=True):
+    user = auth_models.User(
+        username=f"u{discord_id}", discord_id=discord_id, campaign_id=campaign.id, role=role, is_active=is_active
+    )
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+async def test_sync_applies_role_changes_and_deactivations(db_session, role_campaign):
+    stays = _user(db_session, role_campaign, "1")
+    promoted = _user(db_session, role_campaign, "2")
+    lost_role = _user(db_session, role_campaign, "3")
+    left_guild = _user(db_session, role_campaign, "4")
+    returning = _user(db_session, role_campaign, "5", is_active=False)
+
+    fake = FakeDiscord()
+    guild = role_campaign.discord_guild_id
+    fake.add_member(guild, "1", roles=[PLAYER_ROLE])
+    fake.add_member(guild, "2", roles=[PLAYER_ROLE, DM_ROLE])
+    fake.add_member(guild, "3", roles=[])
+    fake.add_member(guild, "5", roles=[PLAYER_ROLE])
+    client = fake.client()
+    try:
+        result = await role_sync.sync_campaign(db_session, role_campaign, client)
+    finally:
+        await client.aclose()
+
+    assert result.members_seen == 4
+    assert result.role_changed == 1
+    assert result.deactivated == 2
+    assert result.reactivated == 1
+
+    db_session.expire_all()
+    assert (stays.role, stays.is_active) == ("player", True)
+    assert (promoted.role, promoted.is_active) == ("admin", True)
+    assert lost_role.is_active is False
+    assert left_guild.is_active is False
+    assert returning.is_active is True
+
+
+async def test_sync_pages_through_members(db_session, role_campaign):
+    fake = FakeDiscord()
+    for i in range(1, 8):
+        fake.add_member(role_campaign.discord_guild_id, str(i), roles=[PLAYER_ROLE])
+    _user(db_session, role_campaign, "7", is_active=False)
+
+    client = fake.client()
+    try:
+        with patch.object(role_sync, "PAGE_SIZE", 3):
+            result = await role_sync.sync_campaign(db_session, role_campaign, client)
+    finally:
+        await client.aclose()
+
+    assert result.members_seen == 7
+    assert result.reactivated == 1
+    assert len(fake.requests) == 3
+
+
+async def test_sync_leaves_protected_admins_alone(db_session, role_campaign):
+    owner = _user(db_session, role_campaign, "42", role="admin")
+    fake = FakeDiscord()
+    fake.members[role_campaign.discord_guild_id] = {}
+    client = fake.client()
+    try:
+        with patch.object(role_sync.get_settings(), "ADMIN_DISCORD_IDS", "42"):
+            await role_sync.sync_campaign(db_session, role_campaign, client)
+    finally:
+        await client.aclose()
+
+    db_session.expire_all()
+    assert (owner.role, owner.is_active) == ("admin", True)
+
+
+async def test_sync_skips_campaign_without_roles(db_session, campaign):
+    user = _user(db_session, campaign, "1")
+    result = await role_sync.sync_campaign(db_session, campaign, FakeDiscord().client())
+    assert result.skipped
+    assert user.is_active is True
+
+
+async def test_sync_raises_when_guild_is_unavailable(db_session, role_campaign):
+    client = FakeDiscord().client()
+    try:
+        with pytest.raises(role_sync.GuildFetchError):
+            await role_sync.sync_campaign(db_session, role_campaign, client)
+    finally:
+        await client.aclose()
+
+
+def test_admin_endpoint_runs_sync(client, db_session, role_campaign, admin_auth_headers):
+    fake = FakeDiscord()
+    fake.add_member(role_campaign.discord_guild_id, "admin_discord_456", roles=[DM_ROLE])
+    with patch.object(role_sync, "discord_client", fake.client()):
+        res = client.post("/api/admin/discord-role-sync", headers=admin_auth_headers)
+    assert res.status_code == 200, res.text
+    assert res.json()["members_seen"] == 1
+    assert res.json()["deactivated"] == 0
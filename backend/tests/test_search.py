@@ -0,0 +1,147 @@
+from app.modules.maps import models as map_models
+from app.modules.search import models as search_models, service as search_service
+
+
+def _search(client, headers, q, **params):
+    res = client.get("/api/search/", params={"q": q, **params}, headers=headers)
+    assert res.status_code == 200, res.text
+    return res.json()
+
+
+def test_mission_is_indexed_on_create_and_update(client, campaign, admin_auth_headers, player_auth_headers):
+    res = client.post(
+        "/api/missions/",
+        json={"name": "Derelict Beacon", "description": "A signal from the drift", "rewards": []},
+        headers=admin_auth_headers,
+    )
+    mission_id = res.json()["id"]
+
+    hits = _search(client, player_auth_headers, "beacon")
+    assert [(h["source_type"], h["source_id"]) for h in hits] == [("mission", mission_id)]
+    assert "<mark>" in hits[0]["snippet"]
+
+    client.put(
+        f"/api/missions/{mission_id}",
+        json={"name": "Silent Convoy", "description": "Nobody answers", "rewards": []},
+        headers=admin_auth_headers,
+    )
+    assert _search(client, player_auth_headers, "beacon") == []
+    assert _search(client, player_auth_headers, "convoy")[0]["source_id"] == mission_id
+
+
+def test_snippet_escapes_document_text(client, campaign, admin_auth_headers, player_auth_headers):
+    client.post(
+        "/api/items/",
+        json={"name": "Cursed Scroll", "description": "<script>alert(1)</script> & <mark>fake</mark> runes"},
+        headers=admin_auth_headers,
+    )
+
+    [hit] = _search(client, player_auth_headers, "runes")
+    assert "<script>" not in hit["snippet"] and "<mark>fake" not in hit["snippet"]
+    assert "&lt;script&gt;alert(1)&lt;/script&gt; &amp; &lt;mark&gt;fake&lt;/mark&gt;" in hit["snippet"]
+    assert "<mark>runes</mark>" in hit["snippet"]
+
+
+def test_prefix_match_and_title_ranks_first(client, campaign, admin_auth_headers, player_auth_headers):
+    client.post("/api/items/", json={"name": "Plain Rope", "description": "Good for the salvager"}, headers=admin_auth_headers)
+    client.post("/api/items/", json={"name": "Salvager's Kit", "description": "Tools"}, headers=admin_auth_headers)
+
+    hits = _search(client, player_auth_headers, "salvag")
+    assert [h["title"] for h in hits] == ["Salvager's Kit", "Plain Rope"]
+
+
+def test_hidden_missions_only_visible_to_admins(client, campaign, admin_auth_headers, player_auth_headers):
+    client.post(
+        "/api/missions/",
+        json={"name": "Secret Vault", "is_discoverable": False, "rewards": []},
+        headers=admin_auth_headers,
+    )
+    assert _search(client, player_auth_headers, "vault") == []
+    assert len(_search(client, admin_auth_headers, "vault")) == 1
+
+
+def test_hex_notes_and_ledger_are_indexed(client, db_session, campaign, admin_auth_headers, player_auth_headers):
+    m = client.post("/api/maps/", json={"name": "Map"}, headers=admin_auth_headers).json()
+    client.put(
+        f"/api/maps/{m['id']}/hexes/0/0",
+        json={"linked_location_name": "Rustwater Station", "notes": "Smugglers hide cargo here"},
+        headers=admin_auth_headers,
+    )
+    client.post(
+        "/api/ledger/",
+        json={"event_type": "AdminAdjustment", "description": "Refuelled at Rustwater"},
+        headers=admin_auth_headers,
+    )
+
+    player_types = {h["source_type"] for h in _search(client, player_auth_headers, "rustwater")}
+    assert player_types == {"hex", "ledger"}
+    assert _search(client, player_auth_headers, "smugglers") == []
+    assert _search(client, admin_auth_headers, "smugglers")[0]["source_type"] == "hex_dm_notes"
+
+    ledger_only = _search(client, player_auth_headers, "rustwater", types=["ledger"])
+    assert [h["source_type"] for h in ledger_only] == ["ledger"]
+
+
+def test_player_notes_are_indexed_one_document_each(client, campaign, player_auth_headers, admin_auth_headers):
+    map_id = client.get("/api/maps/", headers=player_auth_headers).json()[0]["id"]
+    note = client.post(
+        f"/api/maps/{map_id}/hexes/0/0/notes", json={"text": "Dockmaster takes bribes"}, headers=player_auth_headers
+    ).json()
+
+    [hit] = _search(client, player_auth_headers, "bribes")
+    assert (hit["source_type"], hit["source_id"], hit["title"]) == ("hex_note", note["id"], "Starting Camp")
+
+    client.post("/api/search/reindex", headers=admin_auth_headers)
+    assert [h["source_id"] for h in _search(client, player_auth_headers, "bribes")] == [note["id"]]
+
+
+def test_player_notes_follow_their_hex(client, campaign, player_auth_headers, admin_auth_headers):
+    map_id = client.get("/api/maps/", headers=player_auth_headers).json()[0]["id"]
+    note = client.post(
+        f"/api/maps/{map_id}/hexes/0/0/notes", json={"text": "Dockmaster takes bribes"}, headers=player_auth_headers
+    ).json()
+
+    client.put(
+        f"/api/maps/{map_id}/hexes/0/0",
+        json={"is_discovered": False, "linked_location_name": "Smugglers' Dock"},
+        headers=admin_auth_headers,
+    )
+    assert _search(client, player_auth_headers, "bribes") == []
+    [hit] = _search(client, admin_auth_headers, "bribes")
+    assert (hit["source_id"], hit["title"]) == (note["id"], "Smugglers' Dock")
+
+    # A rebuild gives the same answer as the incremental update.
+    client.post("/api/search/reindex", headers=admin_auth_headers)
+    assert _search(client, player_auth_headers, "bribes") == []
+
+    client.put(f"/api/maps/{map_id}/hexes/0/0", json={"is_discovered": True}, headers=admin_auth_headers)
+    assert [h["source_id"] for h in _search(client, player_auth_headers, "bribes")] == [note["id"]]
+
+
+def test_search_is_campaign_scoped(client, db_session, campaign, admin_auth_headers, player_auth_headers):
+    from conftest import _create_user_with_token
+    from app.modules.campaigns import models as campaign_models
+
+    other = campaign_models.Campaign(name="Other", discord_guild_id="other_search")
+    db_session.add(other)
+    db_session.commit()
+    _, token = _create_user_with_token(db_session, "other_search_admin", "Other", "admin", other.id)
+    client.post("/api/items/", json={"name": "Foreign Relic"}, headers={"Authorization": f"Bearer {token}"})
+
+    assert _search(client, player_auth_headers, "relic") == []
+
+
+def test_reindex_rebuilds_documents(client, db_session, campaign, admin_auth_headers, player_auth_headers):
+    client.post("/api/items/", json={"name": "Vinculum Shard"}, headers=admin_auth_headers)
+    db_session.query(search_models.SearchDocument).delete()
+    db_session.commit()
+    assert _search(client, player_auth_headers, "shard") == []
+
+    res = client.post("/api/search/reindex", headers=admin_auth_headers)
+    assert res.status_code == 200
+    assert res.json()["indexed"] >= 1
+    assert len(_search(client, player_auth_headers, "shard")) == 1
+
+
+def test_query_without_words_returns_nothing(db_session, campaign):
+    assert search_service.search(db_session, campaign.id, '"*') == []
@@ -1,6 +1,7 @@
 import { get } from 'svelte/store';
 import { auth } from '$lib/auth';
 import { API_BASE_URL } from '$lib/config';
+import type { Page } from '$lib/types';
 
 export async function api(method: string, path: string, body?: unknown): Promise<any> {
 	const token = get(auth).token;
@@ -22,3 +23,16 @@ export async function api(method: string, path: string, body?: unknown): Promise
 	const text = await res.text();
 	return text ? JSON.parse(text) : undefined;
 }
+
+/** Fetch every page of a keyset-paginated endpoint by following `next_cursor`. */
+export async function apiAll<T>(path: string): Promise<T[]> {
+	const sep = path.includes('?') ? '&' : '?';
+	const items: T[] = [];
+	let cursor: number | null = null;
+	do {
+		const page: Page<T> = await api('GET', cursor === null ? path : `${path}${sep}cursor=${cursor}`);
+		items.push(...page.items);
+		cursor = page.next_cursor;
+	} while (cursor !== null);
+	return items;
+}
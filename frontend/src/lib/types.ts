@@ -83,6 +83,11 @@ export interface Item {
     description?: string;
 }
 
+export interface ItemSummary {
+    id: number;
+    name: string;
+}
+
 export interface InventoryItem {
     id: number;
     quantity: number;
@@ -97,6 +102,14 @@ export interface StoreItem {
     quantity_available: number;
 }
 
+export interface StoreItemSummary {
+    id: number;
+    item_id: number;
+    name: string;
+    price: number;
+    quantity_available: number;
+}
+
 export interface Mission {
     id: number;
     name: string;
@@ -109,10 +122,35 @@ export interface Mission {
     is_retired: boolean;
     is_discoverable: boolean;
     prerequisite_id?: number;
+    oneshot_id?: number;
     rewards: MissionReward[];
     players: Character[];
 }
 
+// Board listing: counts instead of the nested rewards and players.
+export interface MissionSummary {
+    id: number;
+    name: string;
+    description?: string;
+    status: string;
+    tier?: string;
+    region?: string;
+    last_run_date?: string;
+    cooldown_days: number;
+    is_retired: boolean;
+    is_discoverable: boolean;
+    prerequisite_id?: number;
+    oneshot_id?: number;
+    player_count: number;
+    reward_count: number;
+}
+
+// A keyset page; pass next_cursor back as `cursor` for the next one.
+export interface Page<T> {
+    items: T[];
+    next_cursor: number | null;
+}
+
 export interface MissionReward {
     id: number;
     item_id?: number;